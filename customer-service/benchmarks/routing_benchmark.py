@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Routing accuracy and latency benchmark.
+
+Runs every routing cascade stage on its own, then the full cascade, over a
+labelled JSONL corpus ({"query": ..., "route": ...} per line) against a
+deterministic fake router model, and writes a JSON report:
+
+    python -m benchmarks.routing_benchmark --output routing_report.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import zlib
+from typing import Dict, Any, List, Optional, Sequence
+
+from customer_service.routing.guest_query_router import GuestQueryRouter
+from customer_service.routing.park_routes_config import PARK_AGENT_ROUTES
+from customer_service.routing.routing_cascade import MODEL_STAGE
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "data", "routing_queries.jsonl")
+DEFAULT_CONCURRENCY = (1, 4, 16, 64)
+
+# Label used in reports when a stage abstains
+ABSTAIN = "none"
+
+
+def load_corpus(path: str) -> List[Dict[str, str]]:
+    """
+    Load a labelled query corpus.
+
+    Args:
+        path: JSONL file with "query" and "route" keys per line
+
+    Returns:
+        Labelled queries in file order
+    """
+    corpus = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if item.get("route") not in PARK_AGENT_ROUTES:
+                raise ValueError(f"{path}:{line_number}: unknown route {item.get('route')!r}")
+            corpus.append({"query": item["query"], "route": item["route"]})
+    return corpus
+
+
+def percentiles(latencies_ms: Sequence[float]) -> Dict[str, float]:
+    """Return p50/p95/p99 and mean of a list of latencies in milliseconds."""
+    if not latencies_ms:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0}
+    ordered = sorted(latencies_ms)
+
+    def at(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 4)
+
+    return {
+        "p50": at(0.50),
+        "p95": at(0.95),
+        "p99": at(0.99),
+        "mean": round(sum(ordered) / len(ordered), 4),
+    }
+
+
+def classification_report(
+    expected: Sequence[str],
+    predicted: Sequence[Optional[str]],
+    routes: Sequence[str] = None
+) -> Dict[str, Any]:
+    """
+    Compute accuracy, coverage, per-route precision/recall and a confusion matrix.
+
+    Args:
+        expected: Correct route per query
+        predicted: Predicted route per query, None where the stage abstained
+        routes: Route names to report, defaults to every park route
+
+    Returns:
+        Report dictionary; abstentions count against recall but not precision
+    """
+    routes = list(routes or PARK_AGENT_ROUTES)
+    confusion = {route: {label: 0 for label in routes + [ABSTAIN]} for route in routes}
+    for truth, guess in zip(expected, predicted):
+        confusion[truth][guess or ABSTAIN] += 1
+
+    per_route = {}
+    for route in routes:
+        true_positives = confusion[route][route]
+        predicted_count = sum(confusion[truth][route] for truth in routes)
+        expected_count = sum(confusion[route].values())
+        precision = true_positives / predicted_count if predicted_count else 0.0
+        recall = true_positives / expected_count if expected_count else 0.0
+        per_route[route] = {
+            "precision": round(precision, 4),
+            "recall": round(recall, 4),
+            "f1": round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+            "support": expected_count,
+        }
+
+    decided = [(truth, guess) for truth, guess in zip(expected, predicted) if guess is not None]
+    return {
+        "queries": len(expected),
+        "coverage": round(len(decided) / len(expected), 4) if expected else 0.0,
+        "accuracy": round(sum(t == g for t, g in zip(expected, predicted)) / len(expected), 4) if expected else 0.0,
+        "precision_when_decided": round(
+            sum(t == g for t, g in decided) / len(decided), 4
+        ) if decided else 0.0,
+        "per_route": per_route,
+        "confusion_matrix": confusion,
+    }
+
+
+class FakeRouterModel:
+    """
+    Deterministic stand-in for the router model.
+
+    Answers with the labelled route for a fixed, hash-selected share of the
+    corpus and with another route otherwise, after a fixed delay, so results
+    are identical between runs and releases.
+    """
+
+    def __init__(self, labels: Dict[str, str], accuracy: float = 0.95, latency_ms: float = 20.0):
+        """
+        Create the fake model.
+
+        Args:
+            labels: Correct route per query text
+            accuracy: Share of queries answered with the correct route
+            latency_ms: Delay of every call in milliseconds
+        """
+        self.labels = labels
+        self.accuracy = accuracy
+        self.latency_ms = latency_ms
+        self.routes = sorted(PARK_AGENT_ROUTES)
+        self.calls = 0
+
+    def answer(self, prompt: str) -> str:
+        """Return the JSON route selection for a routing message."""
+        self.calls += 1
+        try:
+            query = json.loads(prompt)["query"]
+        except (ValueError, KeyError, TypeError):
+            query = prompt
+        bucket = zlib.crc32(query.encode())
+        route = self.labels.get(query, "guest_services")
+        if bucket % 1000 >= self.accuracy * 1000:
+            route = self.routes[(self.routes.index(route) + 1 + bucket % 5) % len(self.routes)]
+        return json.dumps({"route": route, "reason": "Fake router model", "confidence": 0.9})
+
+    def __call__(self, prompt: str) -> str:
+        time.sleep(self.latency_ms / 1000)
+        return self.answer(prompt)
+
+    async def call_async(self, prompt: str) -> str:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self.answer(prompt)
+
+
+def build_router(model: FakeRouterModel) -> GuestQueryRouter:
+    """Build a cold router whose model calls go to the fake model."""
+    router = GuestQueryRouter()
+    router.cache.clear()
+    if router.near_duplicate_index is not None:
+        router.near_duplicate_index.clear()
+    router._call_router_model = model
+    router._call_router_model_async = model.call_async
+    return router
+
+
+def benchmark_stages(corpus: List[Dict[str, str]], model: FakeRouterModel) -> Dict[str, Any]:
+    """
+    Run every cascade stage, and the model, on every query in isolation.
+
+    Each stage only counts a decision when it clears its confidence
+    threshold, as it would inside the cascade.
+    """
+    router = build_router(model)
+    expected = [item["route"] for item in corpus]
+    report = {}
+    for stage in router.cascade.stages:
+        predicted, latencies = [], []
+        for item in corpus:
+            started = time.perf_counter()
+            route_info = stage.predict(item["query"], None)
+            accepted = stage.accepts(route_info)
+            latencies.append((time.perf_counter() - started) * 1000)
+            predicted.append(route_info["route"] if accepted else None)
+        report[stage.name] = dict(
+            classification_report(expected, predicted), latency_ms=percentiles(latencies)
+        )
+
+    predicted, latencies = [], []
+    for item in corpus:
+        started = time.perf_counter()
+        response = model(router._build_routing_prompt(item["query"]))
+        latencies.append((time.perf_counter() - started) * 1000)
+        predicted.append(router._parse_route_response(response)["route"])
+    report[MODEL_STAGE] = dict(
+        classification_report(expected, predicted), latency_ms=percentiles(latencies)
+    )
+    return report
+
+
+def benchmark_cascade(corpus: List[Dict[str, str]], model: FakeRouterModel) -> Dict[str, Any]:
+    """Route every query once through a cold router and report the cascade outcome."""
+    router = build_router(model)
+    expected, predicted, latencies = [], [], []
+    decided_by: Dict[str, int] = {}
+    calls_before = model.calls
+    for item in corpus:
+        started = time.perf_counter()
+        route_info = router.route_query(item["query"])
+        latencies.append((time.perf_counter() - started) * 1000)
+        expected.append(item["route"])
+        predicted.append(route_info["route"])
+        decided_by[route_info.get("stage", "unknown")] = decided_by.get(route_info.get("stage", "unknown"), 0) + 1
+    return dict(
+        classification_report(expected, predicted),
+        latency_ms=percentiles(latencies),
+        decided_by_stage=dict(sorted(decided_by.items())),
+        model_calls=model.calls - calls_before,
+    )
+
+
+async def _route_concurrently(router: GuestQueryRouter, queries: List[str], concurrency: int) -> List[float]:
+    """Route queries with at most concurrency in flight and return per-query latencies."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def route(query: str) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await router.route_query_async(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(route(query) for query in queries))
+    return latencies
+
+
+def benchmark_throughput(
+    corpus: List[Dict[str, str]],
+    model: FakeRouterModel,
+    concurrency_levels: Sequence[int] = DEFAULT_CONCURRENCY
+) -> List[Dict[str, Any]]:
+    """Measure async routing throughput of a cold router at several concurrency levels."""
+    queries = [item["query"] for item in corpus]
+    results = []
+    for concurrency in concurrency_levels:
+        router = build_router(model)
+        started = time.perf_counter()
+        latencies = asyncio.run(_route_concurrently(router, queries, concurrency))
+        elapsed = time.perf_counter() - started
+        results.append({
+            "concurrency": concurrency,
+            "queries": len(queries),
+            "queries_per_second": round(len(queries) / elapsed, 2) if elapsed else 0.0,
+            "latency_ms": percentiles(latencies),
+        })
+    return results
+
+
+def run_benchmark(
+    corpus_path: str = DEFAULT_CORPUS,
+    model_accuracy: float = 0.95,
+    model_latency_ms: float = 20.0,
+    concurrency_levels: Sequence[int] = DEFAULT_CONCURRENCY
+) -> Dict[str, Any]:
+    """
+    Run the whole routing benchmark.
+
+    Args:
+        corpus_path: Labelled JSONL corpus
+        model_accuracy: Share of queries the fake model routes correctly
+        model_latency_ms: Delay of every fake model call
+        concurrency_levels: Concurrency levels of the throughput runs
+
+    Returns:
+        JSON-serializable benchmark report
+    """
+    corpus = load_corpus(corpus_path)
+    model = FakeRouterModel(
+        {item["query"]: item["route"] for item in corpus}, model_accuracy, model_latency_ms
+    )
+    return {
+        "corpus": {"path": os.path.relpath(corpus_path), "queries": len(corpus)},
+        "fake_model": {"accuracy": model_accuracy, "latency_ms": model_latency_ms},
+        "stages": benchmark_stages(corpus, model),
+        "cascade": benchmark_cascade(corpus, model),
+        "throughput": benchmark_throughput(corpus, model, concurrency_levels),
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Labelled JSONL query corpus")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--model-accuracy", type=float, default=0.95)
+    parser.add_argument("--model-latency-ms", type=float, default=20.0)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=list(DEFAULT_CONCURRENCY),
+        help="Concurrency levels of the throughput runs"
+    )
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    report = run_benchmark(
+        args.corpus, args.model_accuracy, args.model_latency_ms, args.concurrency
+    )
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,21 +19,25 @@ from google.adk import Agent
 from ..config import Config
 from ..tools.park_tools import (
     get_ride_wait_times,
+    forecast_wait_times,
     check_height_requirements,
     reserve_fast_pass,
+    reserve_fast_pass_for_party,
     get_attraction_recommendations
 )
 
 logger = logging.getLogger(__name__)
 configs = Config()
+MODEL_TIER = configs.agent_settings.tier_for("attraction_expert")
 
 ATTRACTION_EXPERT_INSTRUCTION = """
 You are the Attraction Expert for ThrillZone Adventure Park, specializing in all rides, attractions, and entertainment venues.
 
 Your expertise includes:
 - **Wait Times & Availability**: Provide real-time wait times, ride status, and operational updates
+- **Best Time to Ride**: Forecast wait times for the next few hours and suggest when lines will be shortest
 - **Height Requirements**: Check safety requirements and age restrictions for all attractions
-- **Fast Pass Management**: Help guests reserve and manage Fast Pass bookings for shorter wait times
+- **Fast Pass Management**: Help guests reserve and manage Fast Pass bookings for shorter wait times, booking a whole party together in one slot
 - **Attraction Recommendations**: Suggest rides based on guest preferences, thrill level, and party composition
 - **Ride Information**: Share details about attractions, including accessibility features and special accommodations
 
@@ -45,10 +49,10 @@ Your expertise includes:
 
 **Key Guidelines:**
 1. Always check height requirements when guests mention children or specific ages
-2. Suggest Fast Pass reservations for popular attractions with long wait times
+2. Suggest Fast Pass reservations for popular attractions with long wait times; when a slot is sold out, offer the alternative slots returned
 3. Consider party composition (ages, accessibility needs) when making recommendations
 4. Provide alternative suggestions if a guest's preferred attraction isn't available
-5. Share wait time information proactively to help guests plan their day
+5. Share wait time information proactively to help guests plan their day, using forecasts when guests ask when a line will be shorter
 6. Be enthusiastic about the park's attractions while prioritizing guest safety
 
 **Current Park Information:**
@@ -61,13 +65,16 @@ Use your tools to provide accurate, real-time information and help guests have t
 """
 
 attraction_expert_agent = Agent(
-    model=configs.agent_settings.specialist_model,
+    model=MODEL_TIER.model,
+    generate_content_config=MODEL_TIER.generate_content_config(),
     name="attraction_expert",
     instruction=ATTRACTION_EXPERT_INSTRUCTION,
     tools=[
         get_ride_wait_times,
+        forecast_wait_times,
         check_height_requirements,
         reserve_fast_pass,
+        reserve_fast_pass_for_party,
         get_attraction_recommendations,
     ]
 ) 
\ No newline at end of file
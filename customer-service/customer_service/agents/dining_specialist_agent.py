@@ -25,6 +25,7 @@ from ..tools.park_tools import (
 
 logger = logging.getLogger(__name__)
 configs = Config()
+MODEL_TIER = configs.agent_settings.tier_for("dining_specialist")
 
 DINING_SPECIALIST_INSTRUCTION = """
 You are the Dining Specialist for ThrillZone Adventure Park, your culinary expertise ensures every guest has delicious dining experiences.
@@ -45,7 +46,7 @@ Your expertise includes:
 **Key Guidelines:**
 1. Always ask about dietary restrictions and food allergies when making recommendations
 2. Suggest reservations for popular restaurants, especially during peak meal times
-3. Offer alternatives if preferred restaurants are fully booked
+3. Offer alternatives if preferred restaurants are fully booked, starting with the alternative times a booking attempt returns
 4. Highlight special dining experiences like character meals or chef's specials
 5. Consider party size and guest preferences when recommending restaurants
 6. Provide estimated wait times for walk-in dining options
@@ -66,7 +67,8 @@ Make every meal magical for our guests!
 """
 
 dining_specialist_agent = Agent(
-    model=configs.agent_settings.specialist_model,
+    model=MODEL_TIER.model,
+    generate_content_config=MODEL_TIER.generate_content_config(),
     name="dining_specialist",
     instruction=DINING_SPECIALIST_INSTRUCTION,
     tools=[
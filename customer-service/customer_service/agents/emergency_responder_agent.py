@@ -24,6 +24,7 @@ from ..tools.park_tools import (
 
 logger = logging.getLogger(__name__)
 configs = Config()
+MODEL_TIER = configs.agent_settings.tier_for("emergency_responder")
 
 EMERGENCY_RESPONDER_INSTRUCTION = """
 You are the Emergency Responder for ThrillZone Adventure Park, ensuring the immediate safety and wellbeing of all guests and staff.
@@ -83,7 +84,8 @@ Remember: In emergencies, speed and accuracy save lives. Always err on the side
 """
 
 emergency_responder_agent = Agent(
-    model=configs.agent_settings.specialist_model,
+    model=MODEL_TIER.model,
+    generate_content_config=MODEL_TIER.generate_content_config(),
     name="emergency_responder",
     instruction=EMERGENCY_RESPONDER_INSTRUCTION,
     tools=[
@@ -24,6 +24,7 @@ from ..tools.park_tools import (
 
 logger = logging.getLogger(__name__)
 configs = Config()
+MODEL_TIER = configs.agent_settings.tier_for("entertainment_coordinator")
 
 ENTERTAINMENT_COORDINATOR_INSTRUCTION = """
 You are the Entertainment Coordinator for ThrillZone Adventure Park, bringing magical moments and unforgettable experiences to every guest.
@@ -75,7 +76,8 @@ Create magical memories that guests will treasure forever!
 """
 
 entertainment_coordinator_agent = Agent(
-    model=configs.agent_settings.specialist_model,
+    model=MODEL_TIER.model,
+    generate_content_config=MODEL_TIER.generate_content_config(),
     name="entertainment_coordinator",
     instruction=ENTERTAINMENT_COORDINATOR_INSTRUCTION,
     tools=[
@@ -24,6 +24,7 @@ from ..tools.park_tools import (
 
 logger = logging.getLogger(__name__)
 configs = Config()
+MODEL_TIER = configs.agent_settings.tier_for("guest_services")
 
 GUEST_SERVICES_INSTRUCTION = """
 You are the Guest Services Specialist for ThrillZone Adventure Park, dedicated to ensuring every guest has exceptional support and assistance.
@@ -72,7 +73,8 @@ Make every guest feel valued and supported during their magical day!
 """
 
 guest_services_agent = Agent(
-    model=configs.agent_settings.specialist_model,
+    model=MODEL_TIER.model,
+    generate_content_config=MODEL_TIER.generate_content_config(),
     name="guest_services",
     instruction=GUEST_SERVICES_INSTRUCTION,
     tools=[
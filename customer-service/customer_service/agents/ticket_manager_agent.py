@@ -24,6 +24,7 @@ from ..tools.park_tools import (
 
 logger = logging.getLogger(__name__)
 configs = Config()
+MODEL_TIER = configs.agent_settings.tier_for("ticket_manager")
 
 TICKET_MANAGER_INSTRUCTION = """
 You are the Ticket Manager for ThrillZone Adventure Park, specializing in all admissions, passes, and ticketing services.
@@ -69,7 +70,8 @@ Help guests find the perfect ticket option for their magical day!
 """
 
 ticket_manager_agent = Agent(
-    model=configs.agent_settings.specialist_model,
+    model=MODEL_TIER.model,
+    generate_content_config=MODEL_TIER.generate_content_config(),
     name="ticket_manager",
     instruction=TICKET_MANAGER_INSTRUCTION,
     tools=[
@@ -0,0 +1,231 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Indexed in-memory park catalog.
+
+Attractions, restaurants, menus, shows and ticket prices are loaded once
+from a JSON data file into an immutable snapshot with lookup indexes. Tools
+read the current snapshot; reload() builds a new snapshot off to the side
+and swaps it in one step, so a tool call always sees one consistent catalog.
+The dictionaries handed out are shared by all callers and must not be
+modified.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from ..config import Config
+
+logger = logging.getLogger(__name__)
+configs = Config()
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "park_catalog.json")
+
+_ATTRACTION_WAIT_FIELDS = ("wait_minutes", "status", "fast_pass_available")
+_ATTRACTION_REQUIREMENT_FIELDS = ("min_height_inches", "max_age", "adult_supervision")
+_ATTRACTION_DETAIL_FIELDS = ("thrill_level", "type", "family_friendly")
+_RESTAURANT_INFO_FIELDS = ("cuisine", "capacity", "reservations")
+_SHOW_FIELDS = ("times", "location", "duration")
+
+
+def catalog_key(name: str) -> str:
+    """Normalize a name or section for case-insensitive lookups."""
+    return " ".join(name.split()).casefold()
+
+
+def dietary_tag(restriction: str) -> str:
+    """Normalize a dietary restriction like "Gluten-Free" to its catalog tag."""
+    return restriction.strip().replace("-", "_").replace(" ", "_").lower()
+
+
+class CatalogSnapshot:
+    """One immutable version of the park catalog and its indexes."""
+
+    def __init__(self, data: Dict[str, Any], version: int = 0):
+        """
+        Build the indexes of a catalog.
+
+        Args:
+            data: Parsed catalog data file
+            version: Number of the load that produced this snapshot
+
+        Raises:
+            ValueError: The data has duplicate or missing names
+        """
+        self.version = version
+        self.last_updated: str = data.get("last_updated", "")
+
+        # Attractions, in catalog order
+        self.wait_times: Dict[str, Dict[str, Any]] = {}
+        self.height_requirements: Dict[str, Dict[str, Any]] = {}
+        self.attraction_details: Dict[str, Dict[str, Any]] = {}
+        self.attraction_rank: Dict[str, int] = {}
+        self.fast_pass_capacity: Dict[str, int] = {}
+        self._attraction_names: Dict[str, str] = {}
+        by_section: Dict[str, List[str]] = {}
+        by_thrill: Dict[str, List[str]] = {}
+        for attraction in data.get("attractions", []):
+            name = attraction["name"]
+            self._add_name(self._attraction_names, name, "attraction")
+            self.attraction_rank[name] = len(self.attraction_rank)
+            if attraction.get("fast_pass_capacity"):
+                self.fast_pass_capacity[name] = attraction["fast_pass_capacity"]
+            self.wait_times[name] = {field: attraction.get(field) for field in _ATTRACTION_WAIT_FIELDS}
+            self.height_requirements[name] = {
+                field: attraction.get(field) for field in _ATTRACTION_REQUIREMENT_FIELDS
+            }
+            self.attraction_details[name] = {field: attraction.get(field) for field in _ATTRACTION_DETAIL_FIELDS}
+            if attraction.get("section"):
+                by_section.setdefault(catalog_key(attraction["section"]), []).append(name)
+            by_thrill.setdefault(attraction.get("thrill_level"), []).append(name)
+        self.attractions_by_section: Dict[str, Tuple[str, ...]] = {
+            section: tuple(names) for section, names in by_section.items()
+        }
+        self.attractions_by_thrill: Dict[str, Tuple[str, ...]] = {
+            thrill_level: tuple(names) for thrill_level, names in by_thrill.items()
+        }
+
+        # Restaurants
+        self.restaurant_info: Dict[str, Dict[str, Any]] = {}
+        self.restaurant_hours: Dict[str, Tuple[str, str]] = {}
+        self.restaurant_tables: Dict[str, Dict[int, int]] = {}
+        self._restaurant_names: Dict[str, str] = {}
+        restaurant_rank: Dict[str, int] = {}
+        for restaurant in data.get("restaurants", []):
+            name = restaurant["name"]
+            self._add_name(self._restaurant_names, name, "restaurant")
+            restaurant_rank[name] = len(restaurant_rank)
+            self.restaurant_info[name] = {field: restaurant.get(field) for field in _RESTAURANT_INFO_FIELDS}
+            if restaurant.get("hours"):
+                self.restaurant_hours[name] = tuple(restaurant["hours"])
+            tables = restaurant.get("tables") or {4: max(1, (restaurant.get("capacity") or 4) // 4)}
+            self.restaurant_tables[name] = {int(seats): int(count) for seats, count in tables.items()}
+
+        # Menu items per dietary tag, ordered by restaurant and then catalog order
+        by_tag: Dict[str, List[Tuple[int, int, str, str]]] = {}
+        for item_rank, menu_item in enumerate(data.get("menu_items", [])):
+            restaurant = menu_item["restaurant"]
+            if restaurant not in restaurant_rank:
+                restaurant_rank[restaurant] = len(restaurant_rank)
+            entry = (restaurant_rank[restaurant], item_rank, restaurant, menu_item["item"])
+            for tag in menu_item.get("dietary_tags", []):
+                by_tag.setdefault(dietary_tag(tag), []).append(entry)
+        self.menu_by_tag: Dict[str, Tuple[Tuple[int, int, str, str], ...]] = {
+            tag: tuple(sorted(entries)) for tag, entries in by_tag.items()
+        }
+
+        # Shows
+        self.shows: Dict[str, Dict[str, Any]] = {}
+        for show in data.get("shows", []):
+            self.shows[show["name"]] = {field: show.get(field) for field in _SHOW_FIELDS}
+        self._show_keys: Tuple[Tuple[str, str], ...] = tuple((name.lower(), name) for name in self.shows)
+
+        # Tickets
+        self.ticket_prices: Dict[str, float] = dict(data.get("ticket_prices", {}))
+        self.promo_codes: Dict[str, Dict[str, Any]] = dict(data.get("promo_codes", {}))
+
+    @staticmethod
+    def _add_name(index: Dict[str, str], name: str, kind: str) -> None:
+        key = catalog_key(name)
+        if key in index:
+            raise ValueError(f"Duplicate {kind} '{name}' in park catalog")
+        index[key] = name
+
+    def attraction_name(self, name: str) -> Optional[str]:
+        """Return the catalog name of an attraction, matched case-insensitively."""
+        return self._attraction_names.get(catalog_key(name)) if name else None
+
+    def restaurant_name(self, name: str) -> Optional[str]:
+        """Return the catalog name of a restaurant, matched case-insensitively."""
+        return self._restaurant_names.get(catalog_key(name)) if name else None
+
+    def attractions_in_section(self, section: str) -> Tuple[str, ...]:
+        """Return the attractions of a park section in catalog order."""
+        return self.attractions_by_section.get(catalog_key(section), ())
+
+    def shows_matching(self, show_type: str) -> List[str]:
+        """Return the names of shows whose name contains show_type."""
+        show_type = show_type.lower()
+        return [name for key, name in self._show_keys if show_type in key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of entries of each kind."""
+        return {
+            "version": self.version,
+            "attractions": len(self.wait_times),
+            "restaurants": len(self.restaurant_info),
+            "menu_items": len({entry[1] for entries in self.menu_by_tag.values() for entry in entries}),
+            "shows": len(self.shows),
+            "ticket_types": len(self.ticket_prices),
+        }
+
+
+class ParkCatalog:
+    """Loads the park catalog once and serves its current snapshot."""
+
+    def __init__(self, path: str = None):
+        """
+        Create a catalog; the data file is read on first use.
+
+        Args:
+            path: JSON catalog data file, defaults to the packaged catalog
+        """
+        self.path = path or DEFAULT_CATALOG_PATH
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._loads = 0
+        self._lock = threading.Lock()
+
+    def current(self) -> CatalogSnapshot:
+        """Return the current catalog snapshot, loading it on first use."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load(self.path)
+                snapshot = self._snapshot
+        return snapshot
+
+    def reload(self, path: str = None) -> CatalogSnapshot:
+        """
+        Load the catalog again and swap it in atomically.
+
+        The current snapshot keeps serving until the new one is fully built;
+        if the file cannot be read or indexed it stays in place.
+
+        Args:
+            path: New data file, defaults to the current one
+
+        Returns:
+            The new snapshot
+        """
+        with self._lock:
+            snapshot = self._load(path or self.path)
+            self.path = path or self.path
+            self._snapshot = snapshot
+        logger.info(f"Reloaded park catalog from {self.path}: {snapshot.stats()}")
+        return snapshot
+
+    def _load(self, path: str) -> CatalogSnapshot:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        self._loads += 1
+        return CatalogSnapshot(data, self._loads)
+
+
+# Catalog shared by the park tools
+park_catalog = ParkCatalog(configs.catalog_path)
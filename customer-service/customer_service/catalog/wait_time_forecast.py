@@ -0,0 +1,288 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Wait-time forecasting for "best time to ride" answers.
+
+Each attraction has a time-of-day profile: the average wait per slot of the
+day (15 minutes by default), kept as running sums in NumPy arrays. A
+forecast starts from the current wait, follows the profile of the coming
+slots and lets the current deviation from the profile fade out. Forecasts
+of all attractions are computed in one vectorized pass and cached; new
+samples update their profile slot in O(1) and only mark their attraction
+for recomputation.
+"""
+
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..config import Config
+from .wait_time_store import LiveWaitTimes, WaitTimeStore, live_wait_times
+
+logger = logging.getLogger(__name__)
+configs = Config()
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def _local_utc_offset() -> float:
+    return datetime.now().astimezone().utcoffset().total_seconds()
+
+
+class WaitTimeForecaster:
+    """Time-of-day wait profiles and cached forecasts for the attractions of one store."""
+
+    def __init__(
+        self,
+        store: WaitTimeStore,
+        slot_minutes: int = 15,
+        persistence: float = 0.8,
+        decay: float = 0.995,
+        utc_offset_seconds: float = None,
+        previous: "WaitTimeForecaster" = None
+    ):
+        """
+        Create a forecaster and subscribe it to the store's updates.
+
+        Args:
+            store: Live wait times the forecasts start from
+            slot_minutes: Length of a profile slot; must divide a day
+            persistence: Share of the current deviation from the profile kept per slot ahead
+            decay: Weight kept by a slot's earlier samples when it gets a new one,
+                so profiles follow seasonal changes
+            utc_offset_seconds: Park time zone offset, defaults to the local one
+            previous: Forecaster of an earlier store whose profiles are kept
+                for attractions still present
+        """
+        if SECONDS_PER_DAY % (slot_minutes * 60):
+            raise ValueError("Forecast slot length must divide a day")
+        self.store = store
+        self.slot_seconds = slot_minutes * 60
+        self.slots = SECONDS_PER_DAY // self.slot_seconds
+        self.persistence = persistence
+        self.decay = decay
+        self.utc_offset_seconds = _local_utc_offset() if utc_offset_seconds is None else utc_offset_seconds
+        self.attractions = list(store.attractions)
+        self._rows = {name: row for row, name in enumerate(self.attractions)}
+        self._sums = np.zeros((len(self.attractions), self.slots))
+        self._weights = np.zeros((len(self.attractions), self.slots))
+        if previous is not None:
+            self._copy_profiles(previous)
+
+        self._cached: Optional[np.ndarray] = None
+        self._cached_slot = -1
+        self._dirty = np.zeros(len(self.attractions), dtype=bool)
+        self.full_fits = 0
+        self.row_updates = 0
+        self._lock = threading.Lock()
+        store.add_listener(self.observe)
+
+    def _copy_profiles(self, previous: "WaitTimeForecaster") -> None:
+        if previous.slots != self.slots:
+            return
+        for name, row in self._rows.items():
+            source = previous._rows.get(name)
+            if source is not None:
+                self._sums[row] = previous._sums[source]
+                self._weights[row] = previous._weights[source]
+
+    def row_of(self, attraction_name: str) -> Optional[int]:
+        """Return the forecast row of an attraction."""
+        return self._rows.get(attraction_name)
+
+    def _slot_of(self, timestamps: np.ndarray) -> np.ndarray:
+        """Time-of-day slot of epoch timestamps."""
+        seconds = np.mod(np.asarray(timestamps, dtype=np.float64) + self.utc_offset_seconds, SECONDS_PER_DAY)
+        return (seconds // self.slot_seconds).astype(np.int64)
+
+    def fit(self, attraction_names: Sequence[str], timestamps: Sequence[float], waits: Sequence[float]) -> int:
+        """
+        Add historical samples to the profiles.
+
+        Args:
+            attraction_names: Attraction of each sample
+            timestamps: Epoch timestamp of each sample
+            waits: Wait in minutes of each sample
+
+        Returns:
+            Number of samples used; attractions outside the store are skipped
+        """
+        rows = np.array([self._rows.get(name, -1) for name in attraction_names], dtype=np.int64)
+        known = rows >= 0
+        rows = rows[known]
+        slots = self._slot_of(np.asarray(timestamps)[known])
+        values = np.asarray(waits, dtype=np.float64)[known]
+        with self._lock:
+            np.add.at(self._sums, (rows, slots), values)
+            np.add.at(self._weights, (rows, slots), 1.0)
+            self._cached = None
+        return int(known.sum())
+
+    def observe(self, samples: List[Tuple[int, float, float]]) -> None:
+        """Fold live (row, wait_minutes, timestamp) samples into their profile slots."""
+        with self._lock:
+            for row, value, timestamp in samples:
+                slot = int(self._slot_of(timestamp))
+                self._sums[row, slot] = self._sums[row, slot] * self.decay + value
+                self._weights[row, slot] = self._weights[row, slot] * self.decay + 1.0
+                self._dirty[row] = True
+
+    def _predict(self, rows: np.ndarray, current: np.ndarray, now_slot: int) -> np.ndarray:
+        """Forecast the given rows for every slot of the next day."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            profile = self._sums[rows] / self._weights[rows]
+        steps = np.arange(1, self.slots + 1)
+        base_now = profile[:, now_slot]
+        offset = np.where(np.isnan(base_now), 0.0, current - base_now)
+        future = profile[:, (now_slot + steps) % self.slots]
+        future = np.where(np.isnan(future), current[:, None], future)
+        return np.clip(future + offset[:, None] * self.persistence ** steps, 0.0, None)
+
+    def forecast(self, horizon_slots: int, now: float = None) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Forecast every attraction for the coming slots.
+
+        The cached forecast is reused within a slot; attractions with new
+        samples are recomputed alone, and all are recomputed when a new slot
+        starts.
+
+        Args:
+            horizon_slots: Number of slots ahead, at most one day
+            now: Epoch time of the forecast, defaults to now
+
+        Returns:
+            Current waits, forecast matrix of shape (attractions, horizon_slots)
+            and the current slot
+        """
+        horizon_slots = max(1, min(horizon_slots, self.slots))
+        now_slot = int(self._slot_of(time.time() if now is None else now))
+        current, _ = self.store.latest()
+        with self._lock:
+            if self._cached is None or self._cached_slot != now_slot:
+                self._cached = self._predict(np.arange(len(self.attractions)), current, now_slot)
+                self._cached_slot = now_slot
+                self._dirty[:] = False
+                self.full_fits += 1
+            elif self._dirty.any():
+                rows = np.flatnonzero(self._dirty)
+                self._cached[rows] = self._predict(rows, current[rows], now_slot)
+                self._dirty[rows] = False
+                self.row_updates += len(rows)
+            return current, self._cached[:, :horizon_slots].copy(), now_slot
+
+    def slot_start(self, now: float, slot: int, steps: int) -> datetime:
+        """Local start time of the slot steps after the given slot."""
+        local = datetime.fromtimestamp(now + self.utc_offset_seconds, tz=timezone.utc).replace(tzinfo=None)
+        midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        return midnight + timedelta(seconds=(slot + steps) * self.slot_seconds)
+
+    def save(self, path: str) -> None:
+        """Save the profiles to a NumPy .npz file."""
+        with self._lock:
+            np.savez(
+                path,
+                attractions=np.array(self.attractions),
+                sums=self._sums,
+                weights=self._weights,
+                slot_seconds=self.slot_seconds,
+            )
+
+    def load(self, path: str) -> int:
+        """
+        Load profiles saved by save() for the attractions of this store.
+
+        Returns:
+            Number of attraction profiles loaded
+        """
+        with np.load(path) as data:
+            if int(data["slot_seconds"]) != self.slot_seconds:
+                raise ValueError(f"Profiles in {path} use a different slot length")
+            loaded = 0
+            with self._lock:
+                for source, name in enumerate(data["attractions"].tolist()):
+                    row = self._rows.get(name)
+                    if row is not None:
+                        self._sums[row] = data["sums"][source]
+                        self._weights[row] = data["weights"][source]
+                        loaded += 1
+                self._cached = None
+        return loaded
+
+    def stats(self) -> Dict[str, int]:
+        """Return full forecast passes, incremental row updates and profiled slots."""
+        return {
+            "full_fits": self.full_fits,
+            "row_updates": self.row_updates,
+            "profiled_slots": int((self._weights > 0).sum()),
+        }
+
+
+class WaitTimeForecasts:
+    """Keeps a forecaster in step with the current wait-time store."""
+
+    def __init__(self, live: LiveWaitTimes, slot_minutes: int = 15, profiles_path: str = None):
+        """
+        Create the registry; every new store of live gets its forecaster
+        right away, so no sample pushed before the first forecast is missed.
+
+        Args:
+            live: Live wait times the forecasts are based on
+            slot_minutes: Length of a profile slot
+            profiles_path: Profiles saved by WaitTimeForecaster.save() to start from
+        """
+        self.live = live
+        self.slot_minutes = slot_minutes
+        self.profiles_path = profiles_path
+        self._forecaster: Optional[WaitTimeForecaster] = None
+        self._lock = threading.Lock()
+        live.add_store_listener(self.forecaster_for)
+
+    def forecaster_for(self, store: WaitTimeStore) -> WaitTimeForecaster:
+        """Return the forecaster of a store, keeping the profiles of the previous one."""
+        forecaster = self._forecaster
+        if forecaster is not None and forecaster.store is store:
+            return forecaster
+        with self._lock:
+            if self._forecaster is None or self._forecaster.store is not store:
+                forecaster = WaitTimeForecaster(store, self.slot_minutes, previous=self._forecaster)
+                if self._forecaster is None and self.profiles_path:
+                    try:
+                        forecaster.load(self.profiles_path)
+                    except (OSError, ValueError, KeyError) as e:
+                        logger.warning(f"Could not load wait-time profiles from {self.profiles_path}: {e}")
+                self._forecaster = forecaster
+            return self._forecaster
+
+    def current(self) -> WaitTimeForecaster:
+        """Return the forecaster of the current store."""
+        return self.forecaster_for(self.live.current())
+
+
+def horizon_slots(horizon_hours: float, slot_minutes: int) -> int:
+    """Number of slots covering a horizon in hours."""
+    return max(1, math.ceil(horizon_hours * 60 / slot_minutes))
+
+
+# Forecasts shared by the park tools
+wait_time_forecasts = WaitTimeForecasts(
+    live_wait_times,
+    configs.wait_time_forecast_slot_minutes,
+    configs.wait_time_profiles_path
+)
@@ -0,0 +1,477 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Live attraction wait times.
+
+Queue sensors, or the local simulator, push wait-time samples into a
+fixed-size ring buffer per attraction. The current value of an attraction
+is read in O(1), and the moving average and trend over the buffer window
+are maintained incrementally from running sums, which are re-based on the
+newest sample once per window to keep them numerically exact. The catalog
+wait an attraction starts from is reported until the first sample arrives
+but never enters the window, so a stale catalog value does not skew the
+average or the trend.
+"""
+
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import Config
+from .park_catalog import CatalogSnapshot, ParkCatalog, catalog_key, park_catalog
+
+logger = logging.getLogger(__name__)
+configs = Config()
+
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _format_timestamp(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime(_TIMESTAMP_FORMAT)
+
+
+def _parse_timestamp(value: str) -> Optional[float]:
+    try:
+        return datetime.strptime(value, _TIMESTAMP_FORMAT).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class WaitTimeStore:
+    """
+    Ring-buffer wait-time history of a fixed set of attractions.
+
+    Writers and readers share one lock; every read is O(1) per attraction.
+    Whole-park and per-section snapshots are built once per update and
+    shared by readers until the next update, and must not be modified.
+    """
+
+    def __init__(
+        self,
+        attractions: List[str],
+        sections: Dict[str, Tuple[str, ...]] = None,
+        fast_pass: Dict[str, bool] = None,
+        window: int = 60
+    ):
+        """
+        Create an empty store.
+
+        Args:
+            attractions: Attraction names, in reporting order
+            sections: Prebuilt section index, attraction names per catalog_key() of the section
+            fast_pass: Whether each attraction offers Fast Pass
+            window: Samples kept per attraction for the windowed statistics
+        """
+        if window < 2:
+            raise ValueError("Wait-time window must hold at least two samples")
+        count = len(attractions)
+        self.window = window
+        self.attractions = list(attractions)
+        self._rows = {name: row for row, name in enumerate(self.attractions)}
+        self._section_rows = {
+            section: tuple(self._rows[name] for name in names if name in self._rows)
+            for section, names in (sections or {}).items()
+        }
+        self._fast_pass = [bool((fast_pass or {}).get(name)) for name in self.attractions]
+        self._statuses = ["open"] * count
+
+        self._values = np.zeros((count, window))
+        self._times = np.zeros((count, window))
+        self._head = np.zeros(count, dtype=np.int64)
+        self._count = np.zeros(count, dtype=np.int64)
+        self._latest = np.zeros(count)
+        self._latest_time = np.zeros(count)
+        # Running sums over the window, with times relative to _base
+        self._base = np.zeros(count)
+        self._sum_y = np.zeros(count)
+        self._sum_t = np.zeros(count)
+        self._sum_tt = np.zeros(count)
+        self._sum_ty = np.zeros(count)
+        self._since_rebase = np.zeros(count, dtype=np.int64)
+
+        self.updates = 0
+        self._listeners: List[Callable[[List[Tuple[int, float, float]]], None]] = []
+        self._snapshots: Dict[Optional[str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_catalog(
+        cls,
+        catalog: CatalogSnapshot,
+        window: int = 60,
+        previous: "WaitTimeStore" = None
+    ) -> "WaitTimeStore":
+        """
+        Create a store for the attractions of a catalog.
+
+        Attractions also present in previous keep their history; the others
+        report the catalog's wait time and status until their first sample.
+
+        Args:
+            catalog: Catalog snapshot listing the attractions
+            window: Samples kept per attraction
+            previous: Store of an earlier catalog version
+
+        Returns:
+            The new store
+        """
+        store = cls(
+            list(catalog.wait_times),
+            catalog.attractions_by_section,
+            {name: info.get("fast_pass_available") for name, info in catalog.wait_times.items()},
+            window
+        )
+        seeded_at = _parse_timestamp(catalog.last_updated) or time.time()
+        for name, info in catalog.wait_times.items():
+            if previous is not None and previous._copy_to(store, name):
+                continue
+            store._seed(name, info.get("wait_minutes") or 0, info.get("status") or "open", seeded_at)
+        return store
+
+    def _seed(self, name: str, wait_minutes: float, status: str, timestamp: float) -> None:
+        """Set the wait reported before the first sample, outside the window."""
+        row = self._rows[name]
+        with self._lock:
+            self._latest[row] = wait_minutes
+            self._latest_time[row] = timestamp
+            self._statuses[row] = status
+            self._snapshots = {}
+
+    def _copy_to(self, store: "WaitTimeStore", name: str) -> bool:
+        """Copy one attraction's history into another store with the same window."""
+        src = self._rows.get(name)
+        if src is None or store.window != self.window:
+            return False
+        dst = store._rows[name]
+        with self._lock:
+            for field in (
+                "_values", "_times", "_head", "_count", "_latest", "_latest_time",
+                "_base", "_sum_y", "_sum_t", "_sum_tt", "_sum_ty", "_since_rebase"
+            ):
+                getattr(store, field)[dst] = getattr(self, field)[src]
+            store._statuses[dst] = self._statuses[src]
+        return True
+
+    def update(
+        self,
+        attraction_name: str,
+        wait_minutes: float,
+        status: str = None,
+        timestamp: float = None
+    ) -> None:
+        """
+        Record a wait-time sample.
+
+        Args:
+            attraction_name: Catalog name of the attraction
+            wait_minutes: Measured wait in minutes
+            status: New operating status, unchanged when None
+            timestamp: Sample time in seconds since the epoch, defaults to now
+
+        Raises:
+            ValueError: The attraction is not in the store
+        """
+        self.update_many([(attraction_name, wait_minutes, status, timestamp)])
+
+    def update_many(self, samples: Iterable[Tuple[str, float, Optional[str], Optional[float]]]) -> None:
+        """
+        Record a batch of (attraction_name, wait_minutes, status, timestamp) samples.
+
+        Raises:
+            ValueError: An attraction is not in the store; earlier samples are kept
+        """
+        now = time.time()
+        recorded = []
+        try:
+            with self._lock:
+                for attraction_name, wait_minutes, status, timestamp in samples:
+                    row = self._rows.get(attraction_name)
+                    if row is None:
+                        raise ValueError(f"Attraction '{attraction_name}' not found")
+                    sample = (row, float(wait_minutes), now if timestamp is None else timestamp)
+                    self._push(*sample)
+                    recorded.append(sample)
+                    if status is not None:
+                        self._statuses[row] = status
+                    self.updates += 1
+                self._snapshots = {}
+        finally:
+            if recorded:
+                for listener in self._listeners:
+                    listener(recorded)
+
+    def add_listener(self, listener: Callable[[List[Tuple[int, float, float]]], None]) -> None:
+        """Call listener with the (row, wait_minutes, timestamp) samples of every update."""
+        self._listeners.append(listener)
+
+    def latest(self) -> Tuple[np.ndarray, List[str]]:
+        """Return a copy of every attraction's current wait, in row order, and their statuses."""
+        with self._lock:
+            return self._latest.copy(), list(self._statuses)
+
+    def _push(self, row: int, value: float, timestamp: float) -> None:
+        """Write a sample into the ring buffer and update the running sums."""
+        if self._count[row] == 0:
+            self._base[row] = timestamp
+        base = self._base[row]
+        position = self._head[row]
+        if self._count[row] == self.window:
+            old_value = self._values[row, position]
+            old_t = self._times[row, position] - base
+            self._sum_y[row] -= old_value
+            self._sum_t[row] -= old_t
+            self._sum_tt[row] -= old_t * old_t
+            self._sum_ty[row] -= old_t * old_value
+        else:
+            self._count[row] += 1
+
+        t = timestamp - base
+        self._values[row, position] = value
+        self._times[row, position] = timestamp
+        self._sum_y[row] += value
+        self._sum_t[row] += t
+        self._sum_tt[row] += t * t
+        self._sum_ty[row] += t * value
+        self._head[row] = (position + 1) % self.window
+        self._latest[row] = value
+        self._latest_time[row] = timestamp
+
+        self._since_rebase[row] += 1
+        if self._since_rebase[row] >= self.window:
+            self._rebase(row)
+
+    def _rebase(self, row: int) -> None:
+        """Recompute the running sums exactly, relative to the newest sample."""
+        count = self._count[row]
+        base = self._latest_time[row]
+        values = self._values[row, :count]
+        t = self._times[row, :count] - base
+        self._base[row] = base
+        self._sum_y[row] = values.sum()
+        self._sum_t[row] = t.sum()
+        self._sum_tt[row] = (t * t).sum()
+        self._sum_ty[row] = (t * values).sum()
+        self._since_rebase[row] = 0
+
+    def _trend(self, row: int) -> float:
+        """Least-squares slope of the window in minutes of wait per hour."""
+        count = self._count[row]
+        denominator = count * self._sum_tt[row] - self._sum_t[row] ** 2
+        if count < 2 or denominator <= 1e-9:
+            return 0.0
+        slope = (count * self._sum_ty[row] - self._sum_t[row] * self._sum_y[row]) / denominator
+        return float(slope * 3600)
+
+    def _row_info(self, row: int) -> Dict[str, Any]:
+        count = self._count[row]
+        return {
+            "wait_minutes": int(round(self._latest[row])),
+            "status": self._statuses[row],
+            "fast_pass_available": self._fast_pass[row],
+            "average_wait_minutes": round(float(self._sum_y[row] / count if count else self._latest[row]), 1),
+            "trend_minutes_per_hour": round(self._trend(row), 1),
+        }
+
+    def current(self, attraction_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Return an attraction's current wait, status, moving average and trend.
+
+        Args:
+            attraction_name: Catalog name of the attraction
+
+        Returns:
+            Wait-time information, or None for an unknown attraction
+        """
+        row = self._rows.get(attraction_name)
+        if row is None:
+            return None
+        with self._lock:
+            info = self._row_info(row)
+            info["last_updated"] = _format_timestamp(self._latest_time[row])
+        return info
+
+    def snapshot(self, section: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the wait times of the whole park or of one section.
+
+        Args:
+            section: Park section, matched case-insensitively, or None for
+                every attraction
+
+        Returns:
+            Wait times per attraction and the time of the newest sample, or
+            None for an unknown section
+        """
+        section = catalog_key(section) if section else None
+        with self._lock:
+            snapshot = self._snapshots.get(section)
+            if snapshot is not None:
+                return snapshot
+            if section is None:
+                rows = range(len(self.attractions))
+            else:
+                rows = self._section_rows.get(section)
+                if rows is None:
+                    return None
+            wait_times = {self.attractions[row]: self._row_info(row) for row in rows}
+            newest = max((self._latest_time[row] for row in rows), default=0.0)
+            snapshot = {
+                "wait_times": wait_times,
+                "last_updated": _format_timestamp(newest) if newest else "",
+            }
+            self._snapshots[section] = snapshot
+            return snapshot
+
+    def history(self, attraction_name: str) -> List[Tuple[float, float]]:
+        """Return an attraction's (timestamp, wait_minutes) samples in the window, oldest first."""
+        row = self._rows.get(attraction_name)
+        if row is None:
+            return []
+        with self._lock:
+            count, head = self._count[row], self._head[row]
+            order = np.arange(count) if count < self.window else (np.arange(count) + head) % self.window
+            return list(zip(self._times[row, order].tolist(), self._values[row, order].tolist()))
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of attractions and recorded samples."""
+        return {"attractions": len(self.attractions), "updates": self.updates, "window": self.window}
+
+
+class LiveWaitTimes:
+    """Keeps a wait-time store in step with the current park catalog."""
+
+    def __init__(self, catalog: ParkCatalog, window: int = 60):
+        """
+        Create the registry; the store is built on first use.
+
+        Args:
+            catalog: Park catalog listing the attractions
+            window: Samples kept per attraction
+        """
+        self.catalog = catalog
+        self.window = window
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._store: Optional[WaitTimeStore] = None
+        self._store_listeners: List[Callable[[WaitTimeStore], None]] = []
+        self._lock = threading.Lock()
+
+    def add_store_listener(self, listener: Callable[[WaitTimeStore], None]) -> None:
+        """
+        Call listener with every new store before it is handed out.
+
+        A store that already exists is passed right away, so the listener
+        sees every sample pushed after it was added.
+        """
+        with self._lock:
+            self._store_listeners.append(listener)
+            if self._store is not None:
+                listener(self._store)
+
+    def store_for(self, snapshot: CatalogSnapshot) -> WaitTimeStore:
+        """
+        Return the store for a catalog snapshot.
+
+        A new catalog version gets a new store that keeps the history of the
+        attractions it still lists.
+        """
+        if self._snapshot is snapshot:
+            return self._store
+        with self._lock:
+            if self._snapshot is not snapshot:
+                store = WaitTimeStore.from_catalog(snapshot, self.window, self._store)
+                for listener in self._store_listeners:
+                    listener(store)
+                self._store = store
+                self._snapshot = snapshot
+            return self._store
+
+    def current(self) -> WaitTimeStore:
+        """Return the store for the current catalog."""
+        return self.store_for(self.catalog.current())
+
+
+class WaitTimeSimulator:
+    """Background random walk of wait times for demos and local development."""
+
+    def __init__(
+        self,
+        live: LiveWaitTimes,
+        interval_seconds: float = 30.0,
+        step_minutes: float = 5.0,
+        max_wait_minutes: float = 180.0,
+        seed: int = None
+    ):
+        """
+        Create the simulator.
+
+        Args:
+            live: Registry whose current store receives the samples
+            interval_seconds: Seconds between simulated sensor readings
+            step_minutes: Largest change of a wait between readings
+            max_wait_minutes: Upper bound of simulated waits
+            seed: Random seed for reproducible runs
+        """
+        self.live = live
+        self.interval_seconds = interval_seconds
+        self.step_minutes = step_minutes
+        self.max_wait_minutes = max_wait_minutes
+        self._random = random.Random(seed)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def tick(self) -> None:
+        """Push one simulated reading for every open attraction."""
+        store = self.live.current()
+        # Walk from the unrounded waits, so steps below half a minute add up
+        waits, statuses = store.latest()
+        now = time.time()
+        samples = []
+        for row, name in enumerate(store.attractions):
+            if statuses[row] != "open":
+                continue
+            change = self._random.uniform(-self.step_minutes, self.step_minutes)
+            samples.append((name, min(self.max_wait_minutes, max(0.0, float(waits[row]) + change)), None, now))
+        store.update_many(samples)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Wait-time simulation failed: {e}")
+
+    def start(self) -> None:
+        """Start simulating in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="wait-time-simulator", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+# Wait times shared by the park tools
+live_wait_times = LiveWaitTimes(park_catalog, configs.wait_time_window)
@@ -16,13 +16,32 @@
 import os
 import logging
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Dict, Optional
 from pydantic import BaseModel, Field
+from google.genai import types
 
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
+class ModelTier(BaseModel):
+    """Model and output budget shared by a group of specialist agents."""
+
+    model: Optional[str] = Field(default=None)  # Defaults to the specialist model
+    max_output_tokens: Optional[int] = Field(default=None)
+    temperature: Optional[float] = Field(default=None)
+    priority: bool = Field(default=False)  # Dispatched without waiting for a specialist slot
+
+    def generate_content_config(self) -> Optional[types.GenerateContentConfig]:
+        """Return the generation settings of the tier, or None to use the model defaults."""
+        if self.max_output_tokens is None and self.temperature is None:
+            return None
+        return types.GenerateContentConfig(
+            max_output_tokens=self.max_output_tokens, temperature=self.temperature
+        )
+
+
 class AgentModel(BaseModel):
     """Agent model settings."""
 
@@ -30,6 +49,78 @@ class AgentModel(BaseModel):
     model: str = Field(default="gemini-2.0-flash-001")
     router_model: str = Field(default="gemini-2.0-flash-001")  # Fast model for routing
     specialist_model: str = Field(default="gemini-2.0-flash-001")  # More capable for specialists
+    model_tiers: Dict[str, ModelTier] = Field(default_factory=lambda: {
+        "standard": ModelTier(),  # Uncapped: itineraries and policy answers run long
+        "fast": ModelTier(model="gemini-2.0-flash-lite-001", max_output_tokens=256),
+        "priority": ModelTier(max_output_tokens=512, temperature=0.2, priority=True),
+    })
+    route_tiers: Dict[str, str] = Field(default_factory=lambda: {
+        "entertainment_coordinator": "fast",
+        "emergency_responder": "priority",
+    })
+    default_tier: str = Field(default="standard")
+    max_concurrent_specialist_runs: int = Field(default=16)  # In-flight non-priority specialist runs per event loop
+    stream_buffer_events: int = Field(default=32)  # Stream events held for a slow client before the specialist is paused
+
+    def tier_name_for(self, route: str) -> str:
+        """Return the name of the model tier serving a route."""
+        return self.route_tiers.get(route, self.default_tier)
+
+    def tier_for(self, route: str) -> ModelTier:
+        """Return the model tier serving a route, with its model resolved."""
+        tier = self.model_tiers[self.tier_name_for(route)]
+        return tier.model_copy(update={"model": tier.model or self.specialist_model})
+
+
+class RoutingSettings(BaseModel):
+    """Guest query routing settings."""
+
+    keyword_margin_threshold: float = Field(default=1.0)  # Keyword score lead needed to skip the router model
+    keyword_confidence_threshold: float = Field(default=0.7)
+    cache_max_entries: int = Field(default=1024)
+    cache_ttl_seconds: float = Field(default=300.0)
+    batch_max_queries: int = Field(default=20)  # Guest queries packed into one router prompt
+    max_concurrent_model_calls: int = Field(default=32)  # In-flight async router model calls per event loop
+    route_timeout_seconds: float = Field(default=10.0)
+    classifier_enabled: bool = Field(default=True)
+    classifier_confidence_threshold: float = Field(default=0.97)  # Local classifier confidence needed to skip the router model
+    classifier_temperature: float = Field(default=0.011)  # Softmax temperature fitted by CentroidRouteClassifier.calibrate() on the routing benchmark corpus
+    classifier_calibration_path: Optional[str] = Field(default=None)  # Labelled JSONL queries the temperature is refitted on at startup
+    classifier_fallback_min_confidence: float = Field(default=0.35)  # Classifier guess used when the router model fails
+    emergency_confidence_threshold: float = Field(default=0.4)  # Recall-biased threshold for emergency_responder
+    emergency_slo_ms: float = Field(default=500.0)  # Receipt-to-dispatch objective for the emergency fast lane
+    multi_intent_max_routes: int = Field(default=3)  # Specialists consulted concurrently for one guest message
+    near_duplicate_enabled: bool = Field(default=True)
+    near_duplicate_threshold: float = Field(default=0.6)  # Estimated Jaccard similarity needed to reuse a routing decision
+    near_duplicate_max_entries: int = Field(default=4096)
+    near_duplicate_ttl_seconds: float = Field(default=3600.0)
+    near_duplicate_index_path: Optional[str] = Field(default=None)  # JSON file the index is loaded from and saved to
+    near_duplicate_save_every: int = Field(default=100)  # Model decisions between index saves
+    speculation_enabled: bool = Field(default=True)
+    speculation_min_confidence: float = Field(default=0.6)  # Keyword confidence needed to start a specialist before routing finishes
+    sidecar_socket_path: Optional[str] = Field(default=None)  # Routing sidecar socket; workers become sidecar clients when set
+    sidecar_timeout_seconds: float = Field(default=0.05)
+    sidecar_max_batch: int = Field(default=64)
+    sidecar_max_wait_ms: float = Field(default=2.0)  # Longest a query waits for its sidecar batch to fill
+    feedback_log_path: Optional[str] = Field(default=None)  # Append-only JSONL routing outcome log, disabled when unset
+    feedback_retune_interval_seconds: float = Field(default=300.0)
+    feedback_min_records: int = Field(default=50)  # Outcomes needed before keyword weights are retuned
+    feedback_smoothing: float = Field(default=2.0)
+    route_confidence_thresholds: Dict[str, Dict[str, float]] = Field(default_factory=dict)  # Per stage, per route overrides
+
+
+class ReservationSettings(BaseModel):
+    """Settings for capacity-tracked reservations."""
+
+    park_open: str = Field(default="09:00")
+    park_close: str = Field(default="22:00")
+    fast_pass_slot_minutes: int = Field(default=60)
+    fast_pass_capacity_per_slot: int = Field(default=200)  # Fast Passes per attraction and slot unless the catalog sets one
+    lock_shards: int = Field(default=64)  # Locks guarding the inventory counters and request keys
+    dining_slot_minutes: int = Field(default=15)
+    dining_duration_minutes: int = Field(default=90)  # Table time held by a dining reservation
+    dining_max_empty_seats: int = Field(default=2)  # Extra seats a party may leave empty beyond the smallest fitting table
+    dining_times_offered: int = Field(default=8)  # Start times returned by an availability check
 
 
 class Config(BaseSettings):
@@ -43,8 +134,16 @@ class Config(BaseSettings):
         case_sensitive=True,
     )
     agent_settings: AgentModel = Field(default=AgentModel())
+    routing_settings: RoutingSettings = Field(default=RoutingSettings())
+    reservation_settings: ReservationSettings = Field(default=ReservationSettings())
     app_name: str = "thrillzone_park_service"
     park_name: str = "ThrillZone Adventure Park"
+    catalog_path: Optional[str] = Field(default=None)  # Park catalog JSON file, defaults to the packaged catalog
+    wait_time_window: int = Field(default=60)  # Wait-time samples kept per attraction for moving average and trend
+    wait_time_simulator_enabled: bool = Field(default=False)  # Random-walk wait times when no queue sensors feed the store
+    wait_time_simulator_interval_seconds: float = Field(default=30.0)
+    wait_time_forecast_slot_minutes: int = Field(default=15)  # Time-of-day resolution of the wait forecasts
+    wait_time_profiles_path: Optional[str] = Field(default=None)  # Historical wait profiles (.npz) the forecasts start from
     CLOUD_PROJECT: str = Field(default="my_project")
     CLOUD_LOCATION: str = Field(default="us-central1")
     GENAI_USE_VERTEXAI: str = Field(default="1")
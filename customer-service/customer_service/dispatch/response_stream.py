@@ -0,0 +1,168 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Streamed specialist answers: progress events, client buffering and time to first byte."""
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, AsyncIterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Stream event types
+ROUTING_DECIDED = "routing_decided"
+TOOL_CALL_STARTED = "tool_call_started"
+TOOL_CALL_FINISHED = "tool_call_finished"
+TEXT = "text"
+DONE = "done"
+ERROR = "error"
+
+_END = object()
+
+
+class StreamEvent:
+    """One progress or text event sent to the guest channel."""
+
+    def __init__(self, type: str, text: str = "", data: Dict[str, Any] = None):
+        """
+        Create a stream event.
+
+        Args:
+            type: One of the stream event types
+            text: Answer text carried by text events
+            data: Event details, e.g. the route or the tool name
+        """
+        self.type = type
+        self.text = text
+        self.data = data or {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the event as a JSON-serializable dictionary."""
+        event = {"type": self.type}
+        if self.text:
+            event["text"] = self.text
+        if self.data:
+            event["data"] = self.data
+        return event
+
+    def __repr__(self) -> str:
+        return f"StreamEvent(type={self.type!r}, text={self.text!r}, data={self.data!r})"
+
+
+class TimeToFirstByteStats:
+    """Recent time-to-first-byte measurements of streamed answers."""
+
+    def __init__(self, window: int = 1024):
+        """
+        Initialize empty statistics.
+
+        Args:
+            window: Number of recent measurements kept for percentile reporting
+        """
+        self.streams = 0
+        self.without_text = 0
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms: Optional[float]) -> None:
+        """Record the time from receiving a query to its first answer text, None if none was sent."""
+        with self._lock:
+            self.streams += 1
+            if elapsed_ms is None:
+                self.without_text += 1
+            else:
+                self._latencies.append(elapsed_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return stream counts and time-to-first-byte percentiles."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            streams, without_text = self.streams, self.without_text
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+        return {
+            "streams": streams,
+            "without_text": without_text,
+            "ttfb_p50_ms": percentile(0.50),
+            "ttfb_p95_ms": percentile(0.95),
+            "ttfb_max_ms": latencies[-1] if latencies else 0.0,
+        }
+
+
+async def buffered_events(
+    source: AsyncIterator[StreamEvent],
+    max_buffered: int = 32
+) -> AsyncIterator[StreamEvent]:
+    """
+    Relay stream events to a possibly slow client through a bounded buffer.
+
+    The source is consumed by a separate task so the specialist keeps
+    generating while the client reads. When the client falls behind, the text
+    events waiting in the buffer are merged into one, and once max_buffered
+    events are waiting the source is paused until the client catches up.
+    Closing the returned generator cancels the source.
+
+    Args:
+        source: Events produced by the specialist run
+        max_buffered: Maximum events held for the client
+
+    Yields:
+        The source events, with queued text events coalesced
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered)
+
+    async def produce() -> None:
+        try:
+            async for event in source:
+                await queue.put(event)
+            await queue.put(_END)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            if hasattr(source, "aclose"):
+                await source.aclose()
+
+    producer = asyncio.ensure_future(produce())
+    held = None
+    try:
+        while True:
+            item = held if held is not None else await queue.get()
+            held = None
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            if item.type == TEXT:
+                parts = [item.text]
+                while not queue.empty():
+                    following = queue.get_nowait()
+                    if isinstance(following, StreamEvent) and following.type == TEXT:
+                        parts.append(following.text)
+                    else:
+                        held = following
+                        break
+                if len(parts) > 1:
+                    item = StreamEvent(TEXT, "".join(parts), item.data)
+            yield item
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
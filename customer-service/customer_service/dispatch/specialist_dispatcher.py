@@ -0,0 +1,570 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Direct invocation of specialist agents for routed guest queries."""
+
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+import uuid
+import weakref
+from typing import Dict, Any, AsyncIterator, Iterable, List, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.apps import App
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from ..agents import (
+    attraction_expert_agent,
+    dining_specialist_agent,
+    emergency_responder_agent,
+    entertainment_coordinator_agent,
+    guest_services_agent,
+    ticket_manager_agent
+)
+from ..config import Config
+from ..tools.park_tools import SIDE_EFFECT_TOOLS
+from .response_stream import StreamEvent, TEXT, TOOL_CALL_FINISHED, TOOL_CALL_STARTED
+
+logger = logging.getLogger(__name__)
+configs = Config()
+
+# Specialist agent per route
+SPECIALIST_AGENTS: Dict[str, BaseAgent] = {
+    "attraction_expert": attraction_expert_agent,
+    "dining_specialist": dining_specialist_agent,
+    "ticket_manager": ticket_manager_agent,
+    "guest_services": guest_services_agent,
+    "entertainment_coordinator": entertainment_coordinator_agent,
+    "emergency_responder": emergency_responder_agent,
+}
+
+# Session state flag set on the throwaway sessions speculative runs use
+SPECULATIVE_STATE_KEY = "speculative_run"
+
+
+class SpeculationDeferred(Exception):
+    """Raised when a speculative run reaches a tool with side effects."""
+
+
+class SpeculationGuard(BasePlugin):
+    """
+    Stops speculative specialist runs before a side-effecting tool executes.
+
+    A speculative run may still be cancelled because the router picked
+    another route, so it must not book, charge or report anything. When
+    such a tool is called in a speculative session the run is aborted with
+    SpeculationDeferred; the confirmed specialist then makes the call.
+    """
+
+    def __init__(self, side_effect_tools: Iterable[str] = SIDE_EFFECT_TOOLS):
+        """
+        Initialize the guard.
+
+        Args:
+            side_effect_tools: Names of tools speculative runs must not call
+        """
+        super().__init__(name="speculation_guard")
+        self.side_effect_tools = frozenset(side_effect_tools)
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context) -> Optional[Dict[str, Any]]:
+        """Abort the run when a speculative session calls a side-effecting tool."""
+        if tool.name in self.side_effect_tools and tool_context.state.get(SPECULATIVE_STATE_KEY):
+            raise SpeculationDeferred(f"Speculative run stopped before {tool.name}")
+        return None
+
+
+def _is_deferred(error: BaseException) -> bool:
+    """Check whether an error, or one it was raised from, is a SpeculationDeferred."""
+    while error is not None:
+        if isinstance(error, SpeculationDeferred):
+            return True
+        error = error.__cause__
+    return False
+
+
+class SpecialistResponse:
+    """Answer produced by a specialist agent."""
+
+    def __init__(
+        self,
+        route: str,
+        text: str,
+        latency_ms: float,
+        total_tokens: int = 0,
+        tier: str = None,
+        handled_by: str = None
+    ):
+        """
+        Create a specialist response.
+
+        Args:
+            route: Route of the specialist that answered
+            text: Final answer text
+            latency_ms: Wall time of the specialist run in milliseconds
+            total_tokens: Model tokens reported by the specialist's model calls
+            tier: Model tier that served the route
+            handled_by: Route of the agent that gave the final answer, which
+                differs from route when the specialist transferred the guest
+        """
+        self.route = route
+        self.text = text
+        self.latency_ms = latency_ms
+        self.total_tokens = total_tokens
+        self.tier = tier
+        self.handled_by = handled_by or route
+
+    def __repr__(self) -> str:
+        return (
+            f"SpecialistResponse(route={self.route!r}, tier={self.tier!r}, "
+            f"latency_ms={self.latency_ms:.1f}, total_tokens={self.total_tokens})"
+        )
+
+
+class SpeculativeRun:
+    """A specialist run started before the route was confirmed."""
+
+    def __init__(self, route: str, guest_id: str, session_id: str, usage: Dict[str, int]):
+        """
+        Track a speculative specialist run.
+
+        Args:
+            route: Route the specialist was started for
+            guest_id: Guest identifier
+            session_id: Throwaway session the run uses, forked from the
+                guest's session with the route
+            usage: Token usage updated by the run as model events arrive
+        """
+        self.route = route
+        self.guest_id = guest_id
+        self.session_id = session_id
+        self.usage = usage
+        self.task: Optional[asyncio.Task] = None
+        self.forked_events = 0
+        self.started_at = time.perf_counter()
+
+
+class SpecialistDispatcher:
+    """
+    Runs specialist agents directly through ADK runners sharing one session service.
+
+    Each route is served by the model tier configured for it. Runs of
+    priority tiers start immediately; the others share a bounded number of
+    concurrent runs per event loop. Latency and token totals are kept per tier.
+    Speculative runs use throwaway sessions and are stopped before any tool
+    with side effects, so a cancelled speculation leaves no trace.
+    """
+
+    def __init__(self, agents: Dict[str, BaseAgent] = None):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            agents: Specialist agent per route, defaults to SPECIALIST_AGENTS
+        """
+        self.agents = agents or SPECIALIST_AGENTS
+        self.session_service = InMemorySessionService()
+        self._runners: Dict[str, Runner] = {}
+        self._run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+        self._speculation_guard = SpeculationGuard()
+        self._speculation = {
+            "started": 0, "committed": 0, "cancelled": 0, "deferred": 0, "failed": 0,
+            "wasted_tokens": 0, "wasted_ms": 0.0,
+        }
+        self._tier_stats: Dict[str, Dict[str, float]] = {}
+        self._run_semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _get_runner(self, route: str) -> Runner:
+        """Return the runner for a route's specialist, creating it on first use."""
+        runner = self._runners.get(route)
+        if runner is None:
+            if route not in self.agents:
+                raise ValueError(f"No specialist agent for route '{route}'")
+            runner = Runner(
+                app=App(
+                    name=configs.app_name,
+                    root_agent=self.agents[route],
+                    plugins=[self._speculation_guard]
+                ),
+                session_service=self.session_service
+            )
+            self._runners[route] = runner
+        return runner
+
+    async def _get_session_id(self, route: str, guest_id: str) -> str:
+        """Return the guest's session with a specialist, creating it on first use."""
+        session_id = f"{guest_id}:{route}"
+        session = await self.session_service.get_session(
+            app_name=configs.app_name, user_id=guest_id, session_id=session_id
+        )
+        if session is None:
+            await self.session_service.create_session(
+                app_name=configs.app_name, user_id=guest_id, session_id=session_id
+            )
+        return session_id
+
+    async def stream_events_async(
+        self,
+        route: str,
+        guest_query: str,
+        guest_id: str,
+        usage: Dict[str, Any] = None,
+        session_id: str = None
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Ask a specialist agent to answer a guest query, yielding progress as it happens.
+
+        The specialist runs in the guest's own session with that route, so
+        follow-up questions keep their conversation history.
+
+        Args:
+            route: Route of the specialist to run
+            guest_query: The guest's question or request
+            guest_id: Guest identifier
+            usage: Optional dictionary whose "total_tokens" is kept up to date
+                while the run is in progress; "text", "handled_by", "tier" and
+                "latency_ms" are filled in when the run completes
+            session_id: Existing session to run in instead of the guest's
+                session with the route
+
+        Yields:
+            Text chunks of the final answer as they are generated, and tool
+            call started and finished events
+        """
+        usage = {} if usage is None else usage
+        started = time.perf_counter()
+        tier_name = configs.agent_settings.tier_name_for(route)
+        runner = self._get_runner(route)
+        if session_id is None:
+            session_id = await self._get_session_id(route, guest_id)
+        message = types.Content(role="user", parts=[types.Part(text=guest_query)])
+
+        text = ""
+        streamed = False
+        handled_by = route
+        total_tokens = 0
+        usage["total_tokens"] = 0
+        async with self._run_slot(tier_name):
+            async for event in runner.run_async(
+                user_id=guest_id,
+                session_id=session_id,
+                new_message=message,
+                run_config=self._run_config
+            ):
+                if event.usage_metadata and event.usage_metadata.total_token_count:
+                    total_tokens += event.usage_metadata.total_token_count
+                    usage["total_tokens"] = total_tokens
+                if not event.content or not event.content.parts:
+                    continue
+                chunk = "".join(part.text or "" for part in event.content.parts)
+                if event.partial:
+                    if chunk:
+                        streamed = True
+                        yield StreamEvent(TEXT, chunk, {"agent": event.author})
+                    continue
+
+                for part in event.content.parts:
+                    if part.function_call:
+                        yield StreamEvent(
+                            TOOL_CALL_STARTED,
+                            data={"agent": event.author, "tool": part.function_call.name}
+                        )
+                    if part.function_response:
+                        yield StreamEvent(
+                            TOOL_CALL_FINISHED,
+                            data={"agent": event.author, "tool": part.function_response.name}
+                        )
+                if event.is_final_response():
+                    text = chunk
+                    if event.author in self.agents:
+                        handled_by = event.author
+                    if not streamed and chunk:
+                        yield StreamEvent(TEXT, chunk, {"agent": event.author})
+                    streamed = False
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        self._record_tier(tier_name, latency_ms, total_tokens)
+        usage.update(text=text, handled_by=handled_by, tier=tier_name, latency_ms=latency_ms)
+
+    async def stream_async(
+        self,
+        route: str,
+        guest_query: str,
+        guest_id: str,
+        usage: Dict[str, Any] = None,
+        session_id: str = None
+    ) -> AsyncIterator[str]:
+        """
+        Ask a specialist agent to answer a guest query, yielding the answer text as it is generated.
+
+        Args:
+            route: Route of the specialist to run
+            guest_query: The guest's question or request
+            guest_id: Guest identifier
+            usage: Optional dictionary filled in as by stream_events_async()
+            session_id: Existing session to run in instead of the guest's
+                session with the route
+
+        Yields:
+            Chunks of the final answer text
+        """
+        async for event in self.stream_events_async(route, guest_query, guest_id, usage, session_id):
+            if event.type == TEXT:
+                yield event.text
+
+    async def run_async(
+        self,
+        route: str,
+        guest_query: str,
+        guest_id: str,
+        usage: Dict[str, Any] = None,
+        session_id: str = None
+    ) -> SpecialistResponse:
+        """
+        Ask a specialist agent to answer a guest query.
+
+        Args:
+            route: Route of the specialist to run
+            guest_query: The guest's question or request
+            guest_id: Guest identifier
+            usage: Optional counter whose "total_tokens" is kept up to date
+                while the run is in progress
+            session_id: Existing session to run in instead of the guest's
+                session with the route
+
+        Returns:
+            The specialist's final answer
+        """
+        usage = {} if usage is None else usage
+        async for _ in self.stream_async(route, guest_query, guest_id, usage, session_id):
+            pass
+        return SpecialistResponse(
+            route,
+            usage["text"],
+            usage["latency_ms"],
+            usage["total_tokens"],
+            usage["tier"],
+            usage["handled_by"]
+        )
+
+    def _run_slot(self, tier_name: str):
+        """Return the concurrency slot a run of the tier must hold."""
+        if configs.agent_settings.model_tiers[tier_name].priority:
+            return contextlib.nullcontext()
+        loop = asyncio.get_running_loop()
+        semaphore = self._run_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.BoundedSemaphore(
+                configs.agent_settings.max_concurrent_specialist_runs
+            )
+            self._run_semaphores[loop] = semaphore
+        return semaphore
+
+    def _record_tier(self, tier_name: str, latency_ms: float, total_tokens: int) -> None:
+        """Add one completed run to the tier statistics."""
+        with self._lock:
+            stats = self._tier_stats.setdefault(
+                tier_name, {"runs": 0, "total_ms": 0.0, "total_tokens": 0}
+            )
+            stats["runs"] += 1
+            stats["total_ms"] += latency_ms
+            stats["total_tokens"] += total_tokens
+
+    def tier_stats(self) -> Dict[str, Dict[str, float]]:
+        """Return per-tier run counts, average latency and token cost."""
+        with self._lock:
+            return {
+                tier_name: dict(
+                    stats,
+                    avg_ms=stats["total_ms"] / stats["runs"],
+                    avg_tokens=stats["total_tokens"] / stats["runs"],
+                )
+                for tier_name, stats in self._tier_stats.items()
+            }
+
+    async def fan_out_async(
+        self,
+        routes: List[Dict[str, str]],
+        guest_id: str
+    ) -> List[SpecialistResponse]:
+        """
+        Run several specialists concurrently, one per routed sub-query.
+
+        Args:
+            routes: Items with "route" and "sub_query" keys
+            guest_id: Guest identifier
+
+        Returns:
+            Successful specialist responses in the order of routes; failed
+            specialists are logged and left out
+        """
+        outcomes = await asyncio.gather(
+            *(self.run_async(item["route"], item["sub_query"], guest_id) for item in routes),
+            return_exceptions=True
+        )
+        responses = []
+        for item, outcome in zip(routes, outcomes):
+            if isinstance(outcome, BaseException):
+                if isinstance(outcome, asyncio.CancelledError):
+                    raise outcome
+                logger.error(f"Specialist {item['route']} failed: {outcome}")
+                continue
+            responses.append(outcome)
+        return responses
+
+    def speculate(self, route: str, guest_query: str, guest_id: str) -> SpeculativeRun:
+        """
+        Start a specialist before the router has confirmed its route.
+
+        The specialist runs in a throwaway copy of the guest's session with
+        the route. Its turn is copied into the real session only when the
+        speculation is committed, and the run stops before any tool with side
+        effects, leaving that call to the confirmed specialist.
+
+        Args:
+            route: Predicted route
+            guest_query: The guest's question or request
+            guest_id: Guest identifier
+
+        Returns:
+            The running speculation, to be passed to resolve_speculation()
+        """
+        run = SpeculativeRun(
+            route,
+            guest_id,
+            f"{guest_id}:{route}:speculative:{uuid.uuid4().hex}",
+            {"total_tokens": 0}
+        )
+        run.task = asyncio.ensure_future(self._run_speculative(run, guest_query))
+        with self._lock:
+            self._speculation["started"] += 1
+        return run
+
+    async def _run_speculative(self, run: SpeculativeRun, guest_query: str) -> SpecialistResponse:
+        """Fork the guest's session and run the predicted specialist in the fork."""
+        real_session_id = await self._get_session_id(run.route, run.guest_id)
+        real_session = await self.session_service.get_session(
+            app_name=configs.app_name, user_id=run.guest_id, session_id=real_session_id
+        )
+        fork = await self.session_service.create_session(
+            app_name=configs.app_name,
+            user_id=run.guest_id,
+            session_id=run.session_id,
+            state={SPECULATIVE_STATE_KEY: True}
+        )
+        for event in real_session.events:
+            await self.session_service.append_event(fork, event.model_copy(deep=True))
+        run.forked_events = len(real_session.events)
+        return await self.run_async(
+            run.route, guest_query, run.guest_id, run.usage, session_id=run.session_id
+        )
+
+    async def _commit_speculative_session(self, run: SpeculativeRun) -> None:
+        """Copy the speculative turn into the guest's real session and drop the fork."""
+        fork = await self.session_service.get_session(
+            app_name=configs.app_name, user_id=run.guest_id, session_id=run.session_id
+        )
+        if fork is not None:
+            real_session_id = await self._get_session_id(run.route, run.guest_id)
+            real_session = await self.session_service.get_session(
+                app_name=configs.app_name, user_id=run.guest_id, session_id=real_session_id
+            )
+            for event in fork.events[run.forked_events:]:
+                await self.session_service.append_event(real_session, event.model_copy(deep=True))
+        await self._drop_speculative_session(run)
+
+    async def _drop_speculative_session(self, run: SpeculativeRun) -> None:
+        """Delete the throwaway session of a speculative run."""
+        await self.session_service.delete_session(
+            app_name=configs.app_name, user_id=run.guest_id, session_id=run.session_id
+        )
+
+    async def resolve_speculation(
+        self,
+        run: SpeculativeRun,
+        route: str
+    ) -> Optional[SpecialistResponse]:
+        """
+        Commit or cancel a speculative run once the route is known.
+
+        Args:
+            run: Speculation returned by speculate()
+            route: Route selected by the router
+
+        Returns:
+            The speculative answer when the router agreed and the run
+            succeeded, otherwise None and the caller runs the right specialist
+        """
+        if run.route == route:
+            try:
+                response = await run.task
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self._drop_speculative_session(run)
+                if _is_deferred(e):
+                    logger.info(f"Speculative {run.route} run reached a side-effecting tool, rerunning")
+                    self._record_waste(run, "deferred")
+                else:
+                    logger.error(f"Speculative {run.route} run failed: {e}")
+                    self._record_waste(run, "failed")
+                return None
+            await self._commit_speculative_session(run)
+            with self._lock:
+                self._speculation["committed"] += 1
+            return response
+
+        await self.cancel_speculation(run)
+        logger.info(f"Speculation on {run.route} cancelled, router chose {route}")
+        return None
+
+    async def cancel_speculation(self, run: SpeculativeRun) -> None:
+        """Cancel a speculative run and account for the work it wasted."""
+        run.task.cancel()
+        await asyncio.gather(run.task, return_exceptions=True)
+        await self._drop_speculative_session(run)
+        self._record_waste(run, "cancelled")
+
+    def _record_waste(self, run: SpeculativeRun, outcome: str) -> None:
+        """Count a speculation that did not produce the answer."""
+        with self._lock:
+            self._speculation[outcome] += 1
+            self._speculation["wasted_tokens"] += run.usage["total_tokens"]
+            self._speculation["wasted_ms"] += (time.perf_counter() - run.started_at) * 1000
+
+    def speculation_stats(self) -> Dict[str, Any]:
+        """Return speculation counts, hit rate and wasted tokens and time."""
+        with self._lock:
+            stats = dict(self._speculation)
+        resolved = stats["committed"] + stats["cancelled"] + stats["deferred"] + stats["failed"]
+        stats["hit_rate"] = stats["committed"] / resolved if resolved else 0.0
+        return stats
+
+
+def merge_specialist_responses(responses: List[SpecialistResponse]) -> str:
+    """Merge several specialist answers into one reply for the guest."""
+    if len(responses) == 1:
+        return responses[0].text
+    sections = []
+    for response in responses:
+        title = response.route.replace("_", " ").title()
+        sections.append(f"**{title}**\n{response.text.strip()}")
+    return "\n\n".join(sections)
@@ -13,10 +13,49 @@
 # limitations under the License.
 """Guest entity module for amusement park."""
 
+import threading
 from typing import List, Dict, Optional, Any
 from pydantic import BaseModel, Field, ConfigDict
 
 
+class GuestProfileVersions:
+    """
+    Current profile version of every guest.
+
+    Code that changes a guest profile bumps the guest's version here, so
+    values derived from the profile, such as routing context fingerprints,
+    can tell they are stale without reloading it.
+    """
+
+    def __init__(self):
+        """Initialize with every guest at version 0."""
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, guest_id: str) -> int:
+        """Return the guest's current profile version."""
+        return self._versions.get(guest_id, 0)
+
+    def bump(self, guest_id: str) -> int:
+        """
+        Record a change to a guest's profile.
+
+        Args:
+            guest_id: Guest identifier
+
+        Returns:
+            The guest's new profile version
+        """
+        with self._lock:
+            version = self._versions.get(guest_id, 0) + 1
+            self._versions[guest_id] = version
+            return version
+
+
+# Shared profile versions instance
+guest_profile_versions = GuestProfileVersions()
+
+
 class Address(BaseModel):
     """Represents a guest's address."""
     street: str
@@ -121,6 +160,7 @@ class Guest(BaseModel):
     current_visit: Optional[CurrentVisit] = None
     emergency_contact: Dict[str, str] = Field(default_factory=dict)
     scheduled_reservations: Dict = Field(default_factory=dict)
+    profile_version: int = 0  # Incremented whenever the profile is changed
     model_config = ConfigDict(from_attributes=True)
 
     def to_json(self) -> str:
@@ -216,5 +256,6 @@ class Guest(BaseModel):
                 "relationship": "Spouse",
                 "phone": "+1-555-EMERGENCY"
             },
-            scheduled_reservations={}
+            scheduled_reservations={},
+            profile_version=guest_profile_versions.get(guest_id)
         ) 
\ No newline at end of file
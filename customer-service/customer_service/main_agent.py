@@ -14,13 +14,34 @@
 
 """Main orchestrator agent for ThrillZone Adventure Park with routing pattern."""
 
+import asyncio
 import logging
-from typing import Dict, Any
+import time
+from typing import Dict, Any, AsyncIterator, Optional
 from google.adk import Agent
 
+from .catalog.wait_time_store import WaitTimeSimulator, live_wait_times
 from .config import Config
-from .entities.guest import Guest
-from .routing.guest_query_router import GuestQueryRouter
+from .dispatch.response_stream import (
+    StreamEvent,
+    TimeToFirstByteStats,
+    buffered_events,
+    DONE,
+    ERROR,
+    ROUTING_DECIDED,
+    TEXT
+)
+from .dispatch.specialist_dispatcher import SpecialistDispatcher, merge_specialist_responses
+from .entities.guest import guest_profile_versions
+from .routing.guest_query_router import router_registry
+from .routing.routing_context import RoutingContext, RoutingContextStore
+from .routing.routing_feedback import FeedbackRetuner, RoutingFeedbackLog
+from .routing.request_queue import (
+    GuestRequest,
+    GuestRequestQueue,
+    EMERGENCY_PRIORITY,
+    NORMAL_PRIORITY
+)
 
 logger = logging.getLogger(__name__)
 configs = Config()
@@ -31,31 +52,332 @@ class ThrillZoneParkService:
     
     def __init__(self):
         """Initialize the park service with router and specialist agents."""
-        self.router = GuestQueryRouter()
+        router_registry.warm_up()
+        self.router = router_registry.get()
+        self.request_queue = GuestRequestQueue()
+        self.dispatcher = SpecialistDispatcher()
+        self.stream_ttfb = TimeToFirstByteStats()
+        self.routing_contexts = RoutingContextStore()
+        self.feedback_log = None
+        self.feedback_retuner = None
+        settings = configs.routing_settings
+        if settings.feedback_log_path:
+            self.feedback_log = RoutingFeedbackLog(settings.feedback_log_path)
+            self.feedback_retuner = FeedbackRetuner(
+                self.router,
+                self.feedback_log,
+                interval_seconds=settings.feedback_retune_interval_seconds,
+                min_records=settings.feedback_min_records,
+                smoothing=settings.feedback_smoothing
+            )
+            self.feedback_retuner.start()
+            if self.router.sidecar is not None:
+                logger.info(
+                    "Routing sidecar retunes the stages it serves; "
+                    "feedback retuning here only updates the local fallback"
+                )
+        self.wait_time_simulator = None
+        if configs.wait_time_simulator_enabled:
+            self.wait_time_simulator = WaitTimeSimulator(
+                live_wait_times, interval_seconds=configs.wait_time_simulator_interval_seconds
+            )
+            self.wait_time_simulator.start()
         logger.info("ThrillZone Park Service initialized with routing pattern")
     
     def handle_guest_query(self, guest_query: str, guest_id: str = "123") -> str:
-        """Process a guest query using the routing pattern."""
+        """
+        Answer a guest query by routing it and running the selected specialist directly.
+
+        Must not be called from a running event loop; use
+        handle_guest_query_async() there.
+
+        Args:
+            guest_query: The guest's question or request
+            guest_id: Guest identifier
+
+        Returns:
+            The specialist's answer
+        """
         try:
-            # Get guest context for routing
-            guest = Guest.get_guest(guest_id)
-            guest_context = {
-                "membership_type": guest.membership_type,
-                "preferences": guest.park_preferences.model_dump(),
-                "party_size": guest.current_visit.party_size if guest.current_visit else 1
-            }
-            
-            # Route the query
-            routing_result = self.router.route_query(guest_query, guest_context)
-            selected_route = routing_result.get("route")
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(
+                self._handle_guest_query_async(guest_query, guest_id, time.perf_counter())
+            )
+        raise RuntimeError("handle_guest_query() cannot run inside an event loop, use handle_guest_query_async()")
+    
+    async def handle_guest_query_async(
+        self,
+        guest_query: str,
+        guest_id: str = "123",
+        timeout: float = None
+    ) -> str:
+        """
+        Answer a guest query without blocking the event loop.
+        
+        Args:
+            guest_query: The guest's question or request
+            guest_id: Guest identifier
+            timeout: Deadline in seconds for the routing model call
             
-            logger.info(f"Query routed to {selected_route}")
+        Returns:
+            The specialist's answer
+        """
+        return await self._handle_guest_query_async(
+            guest_query, guest_id, time.perf_counter(), timeout
+        )
+    
+    async def _handle_guest_query_async(
+        self,
+        guest_query: str,
+        guest_id: str,
+        received_at: float,
+        timeout: float = None,
+        precomputed: Dict[str, Optional[Dict[str, Any]]] = None
+    ) -> str:
+        """
+        Route a guest query received at received_at (a perf_counter timestamp) and answer it.
+
+        precomputed carries cascade stage results the caller already has, by
+        stage name, so checks made when the query was queued are not repeated.
+
+        The routed specialist is run directly with the guest's session instead
+        of through the root agent, so the guest does not pay for a root agent
+        model call that only transfers to the specialist.
+
+        When the keywords strongly suggest a route, that specialist starts
+        right away, concurrently with routing. If the router agrees, its answer
+        is used and the guest saves a full model round trip; otherwise the
+        speculative run is cancelled and the routed specialist is asked. The
+        speculative run works in a throwaway session and never calls tools
+        with side effects, so a wrong guess changes nothing for the guest.
+        """
+        speculation = None
+        try:
+            predicted_route = self.router.predict_route_early(guest_query)
+            if predicted_route is not None:
+                speculation = self.dispatcher.speculate(predicted_route, guest_query, guest_id)
+
+            routing_result = await self.router.route_query_async(
+                guest_query, self._get_guest_context(guest_id), timeout=timeout,
+                precomputed=precomputed
+            )
+            self._record_routing_result(routing_result, received_at)
+            selected_route = routing_result["route"]
+
+            response = None
+            if speculation is not None:
+                response = await self.dispatcher.resolve_speculation(speculation, selected_route)
+                speculation = None
+            if response is None:
+                response = await self.dispatcher.run_async(selected_route, guest_query, guest_id)
+            self.record_routing_outcome(guest_query, routing_result, response.handled_by)
+            return response.text
+
+        except Exception as e:
+            logger.error(f"Error handling guest query: {e}")
+            return f"I apologize for any difficulties. How can I help you today?"
+        finally:
+            if speculation is not None:
+                await self.dispatcher.cancel_speculation(speculation)
+
+    async def stream_guest_events_async(
+        self,
+        guest_query: str,
+        guest_id: str = "123",
+        timeout: float = None
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Route a guest query and stream the selected specialist's progress and answer.
+
+        The guest channel first receives a routing_decided event, then
+        tool_call_started / tool_call_finished and text events as the
+        specialist works, and finally a done event, or an error event with
+        an apology. Events are relayed through a bounded buffer, so a slow
+        client gets larger text chunks and eventually pauses the specialist
+        instead of buffering without limit. The time until the first text
+        event is handed to the client is recorded in stream_ttfb.
+
+        Args:
+            guest_query: The guest's question or request
+            guest_id: Guest identifier
+            timeout: Deadline in seconds for the routing model call
+
+        Yields:
+            Stream events for the guest channel
+        """
+        received_at = time.perf_counter()
+        first_text_ms = None
+        try:
+            routing_result = await self.router.route_query_async(
+                guest_query, self._get_guest_context(guest_id), timeout=timeout
+            )
+            self._record_routing_result(routing_result, received_at)
+            selected_route = routing_result["route"]
+            yield StreamEvent(ROUTING_DECIDED, data={
+                "route": selected_route,
+                "reason": routing_result.get("reason", ""),
+                "confidence": routing_result.get("confidence"),
+            })
+
+            usage: Dict[str, Any] = {}
+            events = buffered_events(
+                self.dispatcher.stream_events_async(selected_route, guest_query, guest_id, usage),
+                configs.agent_settings.stream_buffer_events
+            )
+            try:
+                async for event in events:
+                    if event.type == TEXT and first_text_ms is None:
+                        first_text_ms = (time.perf_counter() - received_at) * 1000
+                    yield event
+            finally:
+                await events.aclose()
+
+            self.record_routing_outcome(guest_query, routing_result, usage["handled_by"])
+            yield StreamEvent(DONE, data={
+                "route": selected_route,
+                "handled_by": usage["handled_by"],
+                "latency_ms": round((time.perf_counter() - received_at) * 1000, 1),
+                "ttfb_ms": round(first_text_ms, 1) if first_text_ms is not None else None,
+            })
+
+        except Exception as e:
+            logger.error(f"Error streaming guest query: {e}")
+            yield StreamEvent(ERROR, "I apologize for any difficulties. How can I help you today?")
+        finally:
+            self.stream_ttfb.record(first_text_ms)
+
+    async def stream_guest_query_async(
+        self,
+        guest_query: str,
+        guest_id: str = "123",
+        timeout: float = None
+    ) -> AsyncIterator[str]:
+        """
+        Route a guest query and stream only the text of the selected specialist's answer.
+
+        Args:
+            guest_query: The guest's question or request
+            guest_id: Guest identifier
+            timeout: Deadline in seconds for the routing model call
+
+        Yields:
+            Chunks of the specialist's answer as they are generated
+        """
+        events = self.stream_guest_events_async(guest_query, guest_id, timeout)
+        try:
+            async for event in events:
+                if event.type in (TEXT, ERROR):
+                    yield event.text
+        finally:
+            await events.aclose()
+
+    def record_routing_outcome(
+        self,
+        guest_query: str,
+        routing_result: Dict[str, Any],
+        final_route: str
+    ) -> None:
+        """
+        Log which specialist finally handled a routed query.
+
+        Args:
+            guest_query: The guest's question or request
+            routing_result: The router's decision
+            final_route: Route of the specialist that gave the final answer
+        """
+        if self.feedback_log is None:
+            return
+        try:
+            self.feedback_log.append(
+                guest_query, routing_result["route"], final_route, routing_result.get("stage")
+            )
+        except OSError as e:
+            logger.error(f"Could not record routing feedback: {e}")
+
+    async def handle_multi_intent_query_async(self, guest_query: str, guest_id: str = "123") -> str:
+        """
+        Answer a guest message that may carry several intents.
+        
+        Each routed intent is sent to its specialist concurrently, so the guest
+        waits for the slowest specialist rather than the sum of them, and the
+        answers are merged into one reply.
+        
+        Args:
+            guest_query: The guest's question or request
+            guest_id: Guest identifier
             
-            return f"Routing to {selected_route}: {routing_result.get('reason', '')}"
+        Returns:
+            Merged specialist answers
+        """
+        try:
+            routes = await asyncio.to_thread(
+                self.router.route_query_multi, guest_query, self._get_guest_context(guest_id)
+            )
+            logger.info(f"Fanning out to {[item['route'] for item in routes]}")
+            responses = await self.dispatcher.fan_out_async(routes, guest_id)
+            if not responses:
+                raise RuntimeError("No specialist answered")
+            return merge_specialist_responses(responses)
             
         except Exception as e:
-            logger.error(f"Error handling guest query: {e}")
+            logger.error(f"Error handling multi-intent guest query: {e}")
             return f"I apologize for any difficulties. How can I help you today?"
+    
+    async def submit_guest_query(self, guest_query: str, guest_id: str = "123") -> asyncio.Future:
+        """
+        Queue a guest query for the request workers.
+        
+        Queries caught by the emergency fast lane are queued ahead of all
+        other pending work. The fast lane result travels with the request,
+        so the worker does not check the query a second time.
+        
+        Args:
+            guest_query: The guest's question or request
+            guest_id: Guest identifier
+            
+        Returns:
+            Future resolved with the response once a worker handles the query
+        """
+        emergency_route = self.router.emergency_lane.check(guest_query)
+        request = GuestRequest(
+            guest_query,
+            guest_id,
+            EMERGENCY_PRIORITY if emergency_route is not None else NORMAL_PRIORITY,
+            asyncio.get_running_loop().create_future(),
+            emergency_route
+        )
+        await self.request_queue.put(request)
+        return request.future
+    
+    async def process_requests(self) -> None:
+        """Worker loop that handles queued guest queries, most urgent first."""
+        while True:
+            request = await self.request_queue.get()
+            try:
+                response = await self._handle_guest_query_async(
+                    request.guest_query, request.guest_id, request.enqueued_at,
+                    precomputed={"emergency_fast_lane": request.emergency_route}
+                )
+                if not request.future.done():
+                    request.future.set_result(response)
+            except asyncio.CancelledError:
+                if not request.future.done():
+                    request.future.cancel()
+                raise
+            finally:
+                self.request_queue.task_done()
+    
+    def _get_guest_context(self, guest_id: str) -> RoutingContext:
+        """Get the guest's routing context fingerprint, computed once per profile version."""
+        return self.routing_contexts.get(guest_id, guest_profile_versions.get(guest_id))
+    
+    def _record_routing_result(self, routing_result: Dict[str, Any], received_at: float) -> None:
+        """Log the selected route and track emergency dispatch latency."""
+        selected_route = routing_result.get("route")
+        if routing_result.get("stage") == "emergency_fast_lane":
+            self.router.emergency_lane.record_latency((time.perf_counter() - received_at) * 1000)
+        logger.info(f"Query routed to {selected_route}")
 
 
 # Main service instance
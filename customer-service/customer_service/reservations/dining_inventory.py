@@ -0,0 +1,382 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Restaurant seat inventory.
+
+Each table's day is a bitmap with one bit per 15-minute slot, held in a
+Python integer. The start slots where a party fits are found with a few
+shift-and-AND operations over the bitmaps of the suitable tables, and the
+first N start times are read off the lowest set bits, so availability
+costs microseconds per restaurant. A reservation re-checks and sets the
+bits of one table under the restaurant's lock. Restaurants added by a
+catalog reload get an empty timeline; the others keep their bookings.
+"""
+
+import logging
+import threading
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+
+from ..catalog.park_catalog import CatalogSnapshot, park_catalog
+from ..config import Config
+from .time_slots import clock_minutes, format_clock
+
+logger = logging.getLogger(__name__)
+configs = Config()
+
+
+class RestaurantTimeline:
+    """Slot bitmaps of one restaurant's tables."""
+
+    def __init__(
+        self,
+        name: str,
+        tables: Dict[int, int],
+        opens: str = "11:00",
+        closes: str = "21:00",
+        slot_minutes: int = 15,
+        max_empty_seats: int = 2
+    ):
+        """
+        Create an empty timeline.
+
+        Args:
+            name: Restaurant name
+            tables: Number of tables per seat count
+            opens: First seating time, "HH:MM"
+            closes: Time every table must be free again, "HH:MM"
+            slot_minutes: Length of a slot
+            max_empty_seats: Extra seats a party may leave empty beyond the
+                smallest table that fits it
+        """
+        self.name = name
+        self.opens = clock_minutes(opens)
+        self.slot_minutes = slot_minutes
+        self.slots = (clock_minutes(closes) - self.opens) // slot_minutes
+        self.max_empty_seats = max_empty_seats
+        self.table_seats: List[int] = []
+        self._tables_by_size: Dict[int, List[int]] = {}
+        for seats in sorted(tables):
+            for _ in range(tables[seats]):
+                self._tables_by_size.setdefault(seats, []).append(len(self.table_seats))
+                self.table_seats.append(seats)
+        self.sizes = sorted(self._tables_by_size)
+        self._candidates: Dict[int, List[int]] = {}
+        self._occupied = [0] * len(self.table_seats)
+        self._all_slots = (1 << self.slots) - 1
+        self.lock = threading.Lock()
+
+    def slot_of(self, clock: str) -> Optional[int]:
+        """Return the first slot starting at or after a time, or None outside opening hours."""
+        try:
+            minutes = clock_minutes(clock)
+        except ValueError:
+            return None
+        slot = -(-(minutes - self.opens) // self.slot_minutes)
+        return slot if 0 <= slot < self.slots else None
+
+    def first_slot_from(self, clock: str) -> int:
+        """
+        Return the first slot starting at or after a time.
+
+        Times before opening, or not in "HH:MM" form, give the first slot;
+        times after the last slot give self.slots, where nothing starts.
+        """
+        try:
+            minutes = clock_minutes(clock)
+        except ValueError:
+            return 0
+        return min(max(0, -(-(minutes - self.opens) // self.slot_minutes)), self.slots)
+
+    def slot_time(self, slot: int) -> str:
+        """Return the "HH:MM" start time of a slot."""
+        return format_clock(self.opens + slot * self.slot_minutes)
+
+    def candidate_tables(self, party_size: int) -> List[int]:
+        """Tables that seat the party without too many empty seats, smallest first."""
+        candidates = self._candidates.get(party_size)
+        if candidates is None:
+            fitting = [seats for seats in self.sizes if seats >= party_size]
+            limit = max(fitting[0], party_size + self.max_empty_seats) if fitting else 0
+            candidates = [table for seats in fitting if seats <= limit for table in self._tables_by_size[seats]]
+            self._candidates[party_size] = candidates
+        return candidates
+
+    def _starts(self, occupied: int, duration_slots: int) -> int:
+        """Bitmap of the start slots where a table is free for duration_slots."""
+        free = ~occupied & self._all_slots
+        starts = free
+        for offset in range(1, duration_slots):
+            starts &= free >> offset
+        return starts & ((1 << max(0, self.slots - duration_slots + 1)) - 1)
+
+    def feasible_starts(self, party_size: int, duration_slots: int) -> int:
+        """Bitmap of the start slots where some suitable table is free."""
+        starts = 0
+        occupied = self._occupied
+        for table in self.candidate_tables(party_size):
+            starts |= self._starts(occupied[table], duration_slots)
+        return starts
+
+    def first_starts(self, party_size: int, duration_slots: int, from_slot: int = 0, limit: int = 8) -> List[int]:
+        """Return up to limit feasible start slots at or after from_slot."""
+        starts = self.feasible_starts(party_size, duration_slots) >> from_slot
+        found = []
+        while starts and len(found) < limit:
+            lowest = starts & -starts
+            found.append(from_slot + lowest.bit_length() - 1)
+            starts ^= lowest
+        return found
+
+    def book(self, party_size: int, start: int, duration_slots: int) -> Optional[Tuple[int, int]]:
+        """
+        Take the smallest suitable table free for the interval; the caller holds lock.
+
+        Returns:
+            The table index and the bits it now holds, or None when no table is free
+        """
+        if start + duration_slots > self.slots:
+            return None
+        interval = ((1 << duration_slots) - 1) << start
+        for table in self.candidate_tables(party_size):
+            if not self._occupied[table] & interval:
+                self._occupied[table] |= interval
+                return table, interval
+        return None
+
+    def release(self, table: int, interval: int) -> None:
+        """Free the bits of a cancelled reservation; the caller holds lock."""
+        self._occupied[table] &= ~interval
+
+
+class DiningInventory:
+    """Seat timelines of all restaurants with idempotent reservations."""
+
+    def __init__(
+        self,
+        timelines: Dict[str, RestaurantTimeline],
+        reservable: Dict[str, bool] = None,
+        duration_minutes: int = 90
+    ):
+        """
+        Create the inventory.
+
+        Args:
+            timelines: Timeline per restaurant name
+            reservable: Whether each restaurant takes reservations
+            duration_minutes: Table time held by a reservation
+        """
+        self.timelines = timelines
+        self.reservable = reservable or {name: True for name in timelines}
+        self.duration_minutes = duration_minutes
+        self._requests: Dict[str, Dict[str, Any]] = {}
+        self._reservations: Dict[str, Tuple[str, int, int]] = {}
+        self._lock = threading.Lock()
+        self._catalog: Optional[CatalogSnapshot] = None
+        self._catalog_lock = threading.Lock()
+
+    @staticmethod
+    def _catalog_timelines(
+        catalog: CatalogSnapshot,
+        settings: Any,
+        existing: Dict[str, RestaurantTimeline] = None
+    ) -> Dict[str, RestaurantTimeline]:
+        timelines = {}
+        for name, tables in catalog.restaurant_tables.items():
+            if existing and name in existing:
+                continue
+            opens, closes = catalog.restaurant_hours.get(name, (settings.park_open, settings.park_close))
+            timelines[name] = RestaurantTimeline(
+                name, tables, opens, closes, settings.dining_slot_minutes, settings.dining_max_empty_seats
+            )
+        return timelines
+
+    @staticmethod
+    def _catalog_reservable(catalog: CatalogSnapshot) -> Dict[str, bool]:
+        return {name: bool(info.get("reservations")) for name, info in catalog.restaurant_info.items()}
+
+    @classmethod
+    def from_catalog(cls, catalog: CatalogSnapshot, settings: Any = None) -> "DiningInventory":
+        """
+        Create the inventory of the catalog restaurants.
+
+        Args:
+            catalog: Catalog snapshot
+            settings: ReservationSettings, defaults to the configured ones
+
+        Returns:
+            The inventory
+        """
+        settings = settings or configs.reservation_settings
+        inventory = cls(
+            cls._catalog_timelines(catalog, settings),
+            cls._catalog_reservable(catalog),
+            settings.dining_duration_minutes
+        )
+        inventory._catalog = catalog
+        return inventory
+
+    def sync(self, catalog: CatalogSnapshot, settings: Any = None) -> None:
+        """
+        Follow a catalog snapshot; a no-op when it is the one already followed.
+
+        Restaurants new to the catalog get an empty timeline. Restaurants
+        already tracked keep their timeline and bookings.
+
+        Args:
+            catalog: Catalog snapshot
+            settings: ReservationSettings, defaults to the configured ones
+        """
+        if self._catalog is catalog:
+            return
+        with self._catalog_lock:
+            if self._catalog is catalog:
+                return
+            added = self._catalog_timelines(catalog, settings or configs.reservation_settings, self.timelines)
+            # Swap in new dictionaries so lock-free readers never see one change size
+            self.timelines = {**self.timelines, **added}
+            self.reservable = {**self.reservable, **self._catalog_reservable(catalog)}
+            self._catalog = catalog
+
+    def _duration_slots(self, timeline: RestaurantTimeline, duration_minutes: int = None) -> int:
+        return -(-(duration_minutes or self.duration_minutes) // timeline.slot_minutes)
+
+    def available_times(
+        self,
+        restaurant_name: str,
+        party_size: int,
+        preferred_time: str = None,
+        limit: int = 8,
+        duration_minutes: int = None
+    ) -> Optional[List[str]]:
+        """
+        Return the first start times where the party can be seated.
+
+        Reads are lock-free and may miss a reservation committed at the
+        same moment; reserve() re-checks under the lock.
+
+        Args:
+            restaurant_name: Catalog name of the restaurant
+            party_size: Number of guests
+            preferred_time: Earliest time wanted, "HH:MM"; opening time when
+                missing, unreadable or before opening
+            limit: Maximum number of times returned
+            duration_minutes: Table time needed, defaults to the standard duration
+
+        Returns:
+            "HH:MM" start times in order, empty when none remain after
+            preferred_time, or None for an unknown restaurant
+        """
+        timeline = self.timelines.get(restaurant_name)
+        if timeline is None:
+            return None
+        from_slot = timeline.first_slot_from(preferred_time) if preferred_time else 0
+        starts = timeline.first_starts(
+            party_size, self._duration_slots(timeline, duration_minutes), from_slot, limit
+        )
+        return [timeline.slot_time(slot) for slot in starts]
+
+    def reserve(
+        self,
+        request_key: str,
+        restaurant_name: str,
+        party_size: int,
+        time: str,
+        duration_minutes: int = None
+    ) -> Dict[str, Any]:
+        """
+        Reserve a table, or return the outcome of an earlier request with the same key.
+
+        Args:
+            request_key: Identifies the request; retries return the first outcome
+            restaurant_name: Catalog name of the restaurant
+            party_size: Number of guests
+            time: Start time, "HH:MM"; must fall on a slot boundary
+            duration_minutes: Table time needed, defaults to the standard duration
+
+        Returns:
+            Dictionary with status "confirmed" and the table, "unavailable"
+            with alternative times, or an error
+        """
+        timeline = self.timelines.get(restaurant_name)
+        if timeline is None:
+            return {"error": f"Restaurant '{restaurant_name}' not found"}
+        if not self.reservable.get(restaurant_name, True):
+            return {"error": f"{restaurant_name} does not take reservations, walk-ins are welcome"}
+        if party_size < 1 or party_size > max(timeline.sizes):
+            return {"error": f"{restaurant_name} cannot seat a party of {party_size}"}
+        start = timeline.slot_of(time)
+        if start is None or timeline.slot_time(start) != time.strip().zfill(5):
+            return {"error": f"{time} is not a seating time at {restaurant_name}"}
+        duration_slots = self._duration_slots(timeline, duration_minutes)
+
+        with self._lock:
+            previous = self._requests.get(request_key)
+        if previous is not None:
+            return previous
+
+        with timeline.lock:
+            with self._lock:
+                previous = self._requests.get(request_key)
+            if previous is not None:
+                return previous
+            booked = timeline.book(party_size, start, duration_slots)
+            if booked is None:
+                return {
+                    "status": "unavailable",
+                    "restaurant": restaurant_name,
+                    "time": time,
+                    "alternative_times": self.available_times(
+                        restaurant_name, party_size, time, 3, duration_minutes
+                    ),
+                }
+            table, interval = booked
+            reservation_id = f"RES{uuid.uuid4().hex[:8].upper()}"
+            result = {
+                "status": "confirmed",
+                "reservation_id": reservation_id,
+                "restaurant": restaurant_name,
+                "time": time,
+                "party_size": party_size,
+                "table_seats": timeline.table_seats[table],
+                "until": timeline.slot_time(start + duration_slots),
+            }
+            with self._lock:
+                self._requests[request_key] = result
+                self._reservations[reservation_id] = (restaurant_name, table, interval)
+        return result
+
+    def cancel(self, reservation_id: str) -> bool:
+        """
+        Free the table of a reservation.
+
+        Returns:
+            True when the reservation existed and was released
+        """
+        with self._lock:
+            entry = self._reservations.pop(reservation_id, None)
+        if entry is None:
+            return False
+        restaurant_name, table, interval = entry
+        timeline = self.timelines.get(restaurant_name)
+        if timeline is None:
+            return False
+        with timeline.lock:
+            timeline.release(table, interval)
+        return True
+
+
+# Dining inventory shared by the park tools
+dining_inventory = DiningInventory.from_catalog(park_catalog.current())
@@ -0,0 +1,290 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Fast Pass inventory.
+
+Remaining passes are counted per attraction and time slot in one flat
+array. A reservation checks and decrements its counter under one of a fixed
+number of lock shards, so guests booking different slots do not contend and
+a flash crowd on one slot is serialized only on that slot's shard. Every
+reservation carries a request key; a retried request returns the original
+outcome instead of booking again. The inventory follows catalog reloads:
+attractions that start offering Fast Pass are appended with full slots,
+so the counters and reservations already handed out keep their places.
+"""
+
+import array
+import logging
+import threading
+import uuid
+import zlib
+from typing import Dict, Any, List, Optional
+
+from ..catalog.park_catalog import CatalogSnapshot, park_catalog
+from ..config import Config
+from .time_slots import clock_minutes, format_clock
+
+logger = logging.getLogger(__name__)
+configs = Config()
+
+
+class FastPassInventory:
+    """Per attraction, per slot Fast Pass counters with idempotent reservations."""
+
+    def __init__(
+        self,
+        capacities: Dict[str, int],
+        park_open: str = "09:00",
+        park_close: str = "22:00",
+        slot_minutes: int = 60,
+        shards: int = 64
+    ):
+        """
+        Create a full inventory for one park day.
+
+        Args:
+            capacities: Fast Passes per slot of each attraction offering them
+            park_open: First slot start, "HH:MM"
+            park_close: End of the last slot, "HH:MM"
+            slot_minutes: Length of a slot
+            shards: Number of locks guarding the counters and request keys
+        """
+        first, last = clock_minutes(park_open), clock_minutes(park_close)
+        self.slot_minutes = slot_minutes
+        self.slot_starts = list(range(first, last - slot_minutes + 1, slot_minutes))
+        self.attractions = list(capacities)
+        self._rows = {name: row for row, name in enumerate(self.attractions)}
+        self._capacity = array.array("l", [
+            capacities[name] for name in self.attractions for _ in self.slot_starts
+        ])
+        self._remaining = array.array("l", self._capacity)
+        self._counter_locks = [threading.Lock() for _ in range(shards)]
+        self._key_locks = [threading.Lock() for _ in range(shards)]
+        self._requests: List[Dict[str, Dict[str, Any]]] = [{} for _ in range(shards)]
+        self._id_locks = [threading.Lock() for _ in range(shards)]
+        self._reservations: List[Dict[str, int]] = [{} for _ in range(shards)]
+        self._stats = {"confirmed": 0, "cancelled": 0, "sold_out": 0, "replayed": 0}
+        self._stats_lock = threading.Lock()
+        self._offered = frozenset(self.attractions)
+        self._catalog: Optional[CatalogSnapshot] = None
+        self._catalog_lock = threading.Lock()
+
+    @staticmethod
+    def _catalog_capacities(catalog: CatalogSnapshot, settings: Any) -> Dict[str, int]:
+        return {
+            name: catalog.fast_pass_capacity.get(name) or settings.fast_pass_capacity_per_slot
+            for name, info in catalog.wait_times.items()
+            if info.get("fast_pass_available")
+        }
+
+    @classmethod
+    def from_catalog(cls, catalog: CatalogSnapshot, settings: Any = None) -> "FastPassInventory":
+        """
+        Create the inventory of the catalog attractions that offer Fast Pass.
+
+        Args:
+            catalog: Catalog snapshot
+            settings: ReservationSettings, defaults to the configured ones
+
+        Returns:
+            The inventory
+        """
+        settings = settings or configs.reservation_settings
+        inventory = cls(
+            cls._catalog_capacities(catalog, settings),
+            settings.park_open,
+            settings.park_close,
+            settings.fast_pass_slot_minutes,
+            settings.lock_shards
+        )
+        inventory._catalog = catalog
+        return inventory
+
+    def sync(self, catalog: CatalogSnapshot, settings: Any = None) -> None:
+        """
+        Follow a catalog snapshot; a no-op when it is the one already followed.
+
+        Attractions that newly offer Fast Pass get full slots, and attractions
+        that stopped offering it take no new reservations. Remaining passes
+        and reservations of the other attractions are kept.
+
+        Args:
+            catalog: Catalog snapshot
+            settings: ReservationSettings, defaults to the configured ones
+        """
+        if self._catalog is catalog:
+            return
+        with self._catalog_lock:
+            if self._catalog is catalog:
+                return
+            capacities = self._catalog_capacities(catalog, settings or configs.reservation_settings)
+            slots = len(self.slot_starts)
+            for name, capacity in capacities.items():
+                if name in self._rows:
+                    continue
+                # New rows go last, so the flat index of every existing counter stays valid
+                self._capacity.extend([capacity] * slots)
+                self._remaining.extend([capacity] * slots)
+                self.attractions.append(name)
+                self._rows[name] = len(self.attractions) - 1
+            self._offered = frozenset(capacities)
+            self._catalog = catalog
+
+    def slot_label(self, slot: int) -> str:
+        """Return the "HH:MM-HH:MM" label of a slot."""
+        start = self.slot_starts[slot]
+        return f"{format_clock(start)}-{format_clock(start + self.slot_minutes)}"
+
+    def slot_index(self, time_slot: str) -> Optional[int]:
+        """
+        Find the slot containing a time such as "14:00", "14:30" or "14:00-15:00".
+
+        Returns:
+            The slot index, or None outside park hours
+        """
+        try:
+            start = clock_minutes(time_slot.split("-")[0])
+        except ValueError:
+            return None
+        for slot, slot_start in enumerate(self.slot_starts):
+            if slot_start <= start < slot_start + self.slot_minutes:
+                return slot
+        return None
+
+    def _shard_of(self, key: str) -> int:
+        return zlib.crc32(key.encode()) % len(self._key_locks)
+
+    def _count(self, outcome: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[outcome] += amount
+
+    def remaining(self, attraction_name: str, slot: int) -> int:
+        """Return the passes left in a slot; reads are unlocked and may be momentarily stale."""
+        return self._remaining[self._rows[attraction_name] * len(self.slot_starts) + slot]
+
+    def available_slots(self, attraction_name: str, party_size: int = 1) -> List[str]:
+        """Return the labels of slots with room for a party."""
+        base = self._rows[attraction_name] * len(self.slot_starts)
+        return [
+            self.slot_label(slot)
+            for slot in range(len(self.slot_starts))
+            if self._remaining[base + slot] >= party_size
+        ]
+
+    def reserve(
+        self,
+        request_key: str,
+        attraction_name: str,
+        time_slot: str,
+        guest_ids: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Reserve one Fast Pass per guest in one slot, all or nothing.
+
+        Args:
+            request_key: Identifies the request; a retry with the same key
+                returns the first outcome without booking again
+            attraction_name: Catalog name of the attraction
+            time_slot: Requested time or slot, e.g. "14:00-15:00"
+            guest_ids: Guests of the party
+
+        Returns:
+            Dictionary with status "confirmed" and one reservation per guest,
+            "sold_out" with alternative slots, or an error
+        """
+        row = self._rows.get(attraction_name)
+        if row is None or attraction_name not in self._offered:
+            return {"error": f"Fast Pass is not offered for '{attraction_name}'"}
+        slot = self.slot_index(time_slot)
+        if slot is None:
+            return {"error": f"Time slot '{time_slot}' is outside park hours"}
+        party_size = len(guest_ids)
+        if party_size == 0:
+            return {"error": "No guests to reserve for"}
+
+        key_shard = self._shard_of(request_key)
+        index = row * len(self.slot_starts) + slot
+        counter_lock = self._counter_locks[index % len(self._counter_locks)]
+        # Lock order is always request key shard, then counter shard
+        with self._key_locks[key_shard]:
+            previous = self._requests[key_shard].get(request_key)
+            if previous is not None:
+                self._count("replayed")
+                return previous
+
+            with counter_lock:
+                remaining = self._remaining[index]
+                booked = remaining >= party_size
+                if booked:
+                    remaining -= party_size
+                    self._remaining[index] = remaining
+
+            if booked:
+                reservations = []
+                for guest_id in guest_ids:
+                    reservation_id = f"FP{uuid.uuid4().hex[:8].upper()}"
+                    id_shard = self._shard_of(reservation_id)
+                    with self._id_locks[id_shard]:
+                        self._reservations[id_shard][reservation_id] = index
+                    reservations.append({"guest_id": guest_id, "reservation_id": reservation_id})
+                result = {
+                    "status": "confirmed",
+                    "attraction": attraction_name,
+                    "time_slot": self.slot_label(slot),
+                    "reservations": reservations,
+                    "remaining": remaining,
+                    "request_key": request_key,
+                }
+                self._requests[key_shard][request_key] = result
+                self._count("confirmed", party_size)
+                return result
+
+        # Sold out outcomes are not remembered, so a retry can succeed once
+        # passes are released
+        self._count("sold_out")
+        return {
+            "status": "sold_out",
+            "attraction": attraction_name,
+            "time_slot": self.slot_label(slot),
+            "alternative_slots": self.available_slots(attraction_name, party_size)[:3],
+        }
+
+    def cancel(self, reservation_id: str) -> bool:
+        """
+        Release the pass of a reservation.
+
+        A retry of the original request still returns its first outcome.
+
+        Returns:
+            True when the reservation existed and was released
+        """
+        id_shard = self._shard_of(reservation_id)
+        with self._id_locks[id_shard]:
+            index = self._reservations[id_shard].pop(reservation_id, None)
+        if index is None:
+            return False
+        with self._counter_locks[index % len(self._counter_locks)]:
+            self._remaining[index] += 1
+        self._count("cancelled")
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Return confirmed and cancelled passes, sold-out answers and replayed retries."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+
+# Fast Pass inventory shared by the park tools
+fast_pass_inventory = FastPassInventory.from_catalog(park_catalog.current())
@@ -0,0 +1,265 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local nearest-centroid route classifier over hashed TF-IDF vectors."""
+
+import json
+import logging
+import re
+import zlib
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from .park_routes_config import PARK_AGENT_ROUTES, ROUTE_KEYWORDS
+from .routing_cache import STOPWORDS
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+
+def _features(text: str) -> List[str]:
+    """Split text into word unigram and bigram features, ignoring stopwords."""
+    words = [word for word in _WORD.findall(text.casefold()) if word not in STOPWORDS]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+class CentroidRouteClassifier:
+    """
+    Nearest-centroid classifier built from the route descriptions and keywords.
+
+    Each route description plus its keywords is turned into a hashed TF-IDF
+    vector and L2-normalized, giving one centroid row per route. A query is
+    scored against every centroid with a single matrix-vector product and the
+    cosine scores are turned into confidences with a temperature softmax. The
+    temperature is fitted to labelled queries with calibrate(), so that
+    confidences are on the probability scale of RouteSelection.confidence.
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, str] = None,
+        route_keywords: Dict[str, List[str]] = None,
+        n_features: int = 16384,
+        temperature: float = 0.05,
+        confidence_threshold: float = 0.6,
+        keyword_weights: Dict[str, Dict[str, float]] = None,
+    ):
+        """
+        Build the route centroids.
+
+        Args:
+            routes: Route descriptions, defaults to PARK_AGENT_ROUTES
+            route_keywords: Route keywords, defaults to ROUTE_KEYWORDS
+            n_features: Size of the hashed feature space
+            temperature: Softmax temperature applied to cosine scores; the
+                routing settings hold one fitted with calibrate()
+            confidence_threshold: Minimum confidence for classify() to return a decision
+            keyword_weights: Optional per-route keyword weights, keywords count twice by default
+        """
+        routes = routes or PARK_AGENT_ROUTES
+        route_keywords = route_keywords or ROUTE_KEYWORDS
+        self.routes = list(routes.keys())
+        self.n_features = n_features
+        self.temperature = temperature
+        self.confidence_threshold = confidence_threshold
+
+        counts = np.zeros((len(self.routes), n_features), dtype=np.float32)
+        for row, route_name in enumerate(self.routes):
+            self._accumulate(counts[row], routes[route_name])
+            overrides = (keyword_weights or {}).get(route_name, {})
+            for keyword in route_keywords.get(route_name, []):
+                self._accumulate(counts[row], keyword, overrides.get(keyword.casefold(), 2.0))
+
+        document_frequency = np.count_nonzero(counts > 0, axis=0)
+        # Terms shared by every route carry no signal and get zero weight
+        self.idf = np.log(
+            (1.0 + len(self.routes)) / (1.0 + document_frequency)
+        ).astype(np.float32)
+        self.centroids = self._normalize(counts * self.idf)
+
+    def _index(self, feature: str) -> int:
+        """Map a feature to its hashed column."""
+        return zlib.crc32(feature.encode()) % self.n_features
+
+    def _accumulate(self, vector: np.ndarray, text: str, weight: float = 1.0) -> None:
+        """Add the hashed term counts of text into vector."""
+        for feature in _features(text):
+            vector[self._index(feature)] += weight
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        """L2-normalize the rows of a matrix, leaving zero rows untouched."""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+    def vectorize(self, queries: Sequence[str]) -> np.ndarray:
+        """
+        Turn queries into a matrix of normalized TF-IDF rows.
+
+        Args:
+            queries: Guest questions or requests
+
+        Returns:
+            Array of shape (len(queries), n_features)
+        """
+        matrix = np.zeros((len(queries), self.n_features), dtype=np.float32)
+        for row, query in enumerate(queries):
+            self._accumulate(matrix[row], query)
+        return self._normalize(matrix * self.idf)
+
+    def score_batch(self, queries: Sequence[str]) -> np.ndarray:
+        """
+        Score a batch of queries against all centroids in one product.
+
+        Args:
+            queries: Guest questions or requests
+
+        Returns:
+            Cosine similarity matrix of shape (len(queries), len(routes))
+        """
+        return self.vectorize(queries) @ self.centroids.T
+
+    def predict_proba(self, queries: Sequence[str]) -> np.ndarray:
+        """Return calibrated route probabilities for a batch of queries."""
+        return self._softmax(self.score_batch(queries), self.temperature)
+
+    @staticmethod
+    def _softmax(scores: np.ndarray, temperature: float) -> np.ndarray:
+        """Row-wise softmax of scores divided by temperature."""
+        logits = scores / temperature
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def calibrate(self, queries: Sequence[str], routes: Sequence[str]) -> float:
+        """
+        Fit the softmax temperature to labelled queries by minimizing log loss.
+
+        Args:
+            queries: Labelled guest queries
+            routes: Correct route for each query
+
+        Returns:
+            The fitted temperature
+        """
+        scores = self.score_batch(queries)
+        labels = np.array([self.routes.index(route) for route in routes])
+        best_temperature, best_loss = self.temperature, np.inf
+        for temperature in np.geomspace(0.005, 1.0, 60):
+            probabilities = self._softmax(scores, temperature)
+            loss = -np.mean(np.log(probabilities[np.arange(len(labels)), labels] + 1e-12))
+            if loss < best_loss:
+                best_temperature, best_loss = float(temperature), loss
+        self.temperature = best_temperature
+        logger.info(f"Calibrated classifier temperature to {best_temperature:.4f}")
+        return best_temperature
+
+    def calibrate_file(self, path: str) -> float:
+        """
+        Fit the softmax temperature to a labelled JSONL file.
+
+        Lines hold {"query": ..., "route": ...}; lines for unknown routes are
+        skipped. The temperature is kept when the file cannot be read.
+
+        Args:
+            path: Labelled query file, such as the routing benchmark corpus
+
+        Returns:
+            The temperature in use afterwards
+        """
+        queries, routes = [], []
+        try:
+            with open(path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                    if item.get("route") in self.routes:
+                        queries.append(item["query"])
+                        routes.append(item["route"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not calibrate classifier from {path}: {e}")
+            return self.temperature
+        if not queries:
+            return self.temperature
+        return self.calibrate(queries, routes)
+
+    def _to_route(self, scores: np.ndarray, probabilities: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Build a route selection from one row of scores and probabilities."""
+        if not scores.any():
+            return None
+        best = int(np.argmax(probabilities))
+        return {
+            "route": self.routes[best],
+            "reason": f"Closest route description (similarity {scores[best]:.2f})",
+            "confidence": round(float(probabilities[best]), 2),
+        }
+
+    def predict(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the best route for a query regardless of the threshold.
+
+        Args:
+            query: The guest's question or request
+
+        Returns:
+            Route selection dictionary, or None when the query shares no
+            features with any route
+        """
+        scores = self.score_batch([query])
+        return self._to_route(scores[0], self._softmax(scores, self.temperature)[0])
+
+    def classify(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Classify a query when the classifier is confident enough.
+
+        Args:
+            query: The guest's question or request
+
+        Returns:
+            Route selection dictionary, or None below the confidence threshold
+        """
+        return self.classify_batch([query])[0]
+
+    def classify_batch(self, queries: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Classify a batch of queries with one matrix product.
+
+        Args:
+            queries: Guest questions or requests
+
+        Returns:
+            Route selection or None per query, in input order
+        """
+        return [
+            route_info if route_info is not None
+            and route_info["confidence"] >= self.confidence_threshold else None
+            for route_info in self.predict_batch(queries)
+        ]
+
+    def predict_batch(self, queries: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Return the best route per query regardless of the threshold.
+
+        Args:
+            queries: Guest questions or requests
+
+        Returns:
+            Route selection or None per query, in input order
+        """
+        scores = self.score_batch(queries)
+        probabilities = self._softmax(scores, self.temperature)
+        return [self._to_route(scores[row], probabilities[row]) for row in range(len(queries))]
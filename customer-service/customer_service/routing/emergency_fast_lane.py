@@ -0,0 +1,117 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Emergency fast lane that routes urgent guest messages before any model call."""
+
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from .keyword_matcher import KeywordRouteMatcher
+
+logger = logging.getLogger(__name__)
+
+EMERGENCY_ROUTE = "emergency_responder"
+
+# High-precision phrases only; ambiguous words such as "help" or "closed" are
+# left to the routing cascade, and words that also name rides, shows or park
+# facilities ("fire", "first aid") only count inside a distress phrase.
+EMERGENCY_PHRASES = [
+    "emergency", "medical", "hurt", "injured", "injury", "urgent", "accident",
+    "bleeding", "unconscious", "not breathing", "can't breathe", "cannot breathe",
+    "chest pain", "heart attack", "seizure", "fainted", "passed out", "choking",
+    "allergic reaction", "ambulance", "need first aid", "needs first aid",
+    "call 911", "lost child", "missing child", "lost my child", "lost my son",
+    "lost my daughter", "evacuation", "there's a fire", "there is a fire",
+    "caught fire", "smell smoke", "someone is in danger", "we are in danger",
+    "we're in danger"
+]
+
+
+class EmergencyFastLane:
+    """
+    Pre-compiled emergency matcher with a latency SLO metric.
+
+    A match routes straight to emergency_responder without consulting the
+    router model. Callers report how long each emergency took to reach the
+    responder so the lane can be monitored against its latency objective.
+    """
+
+    def __init__(self, phrases: List[str] = None, slo_ms: float = 500.0, window: int = 1024):
+        """
+        Compile the emergency phrases.
+
+        Args:
+            phrases: Emergency phrases, defaults to EMERGENCY_PHRASES
+            slo_ms: Latency objective in milliseconds from receipt to dispatch
+            window: Number of recent latencies kept for percentile reporting
+        """
+        self.matcher = KeywordRouteMatcher(
+            route_keywords={EMERGENCY_ROUTE: phrases or EMERGENCY_PHRASES},
+            margin_threshold=1.0
+        )
+        self.slo_ms = slo_ms
+        self.fired = 0
+        self.slo_violations = 0
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def check(self, guest_query: str) -> Optional[Dict[str, Any]]:
+        """
+        Check the raw guest text for an emergency.
+
+        Args:
+            guest_query: The guest's question or request
+
+        Returns:
+            Emergency route selection, or None when no emergency phrase matches
+        """
+        route_info = self.matcher.classify(guest_query)
+        if route_info is None:
+            return None
+        with self._lock:
+            self.fired += 1
+        logger.warning(f"Emergency fast lane fired: {', '.join(route_info['matched_keywords'])}")
+        route_info["reason"] = f"Emergency fast lane: {', '.join(route_info['matched_keywords'])}"
+        route_info["priority"] = "emergency"
+        return route_info
+
+    def record_latency(self, elapsed_ms: float) -> None:
+        """Record the time an emergency took from receipt to dispatch."""
+        with self._lock:
+            self._latencies.append(elapsed_ms)
+            if elapsed_ms > self.slo_ms:
+                self.slo_violations += 1
+                logger.error(f"Emergency fast lane SLO missed: {elapsed_ms:.1f}ms > {self.slo_ms}ms")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return fired count, latency percentiles and SLO violations."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            fired, violations = self.fired, self.slo_violations
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+        return {
+            "fired": fired,
+            "latency_p50_ms": percentile(0.50),
+            "latency_p95_ms": percentile(0.95),
+            "latency_max_ms": latencies[-1] if latencies else 0.0,
+            "slo_ms": self.slo_ms,
+            "slo_violations": violations,
+        }
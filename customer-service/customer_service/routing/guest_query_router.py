@@ -14,18 +14,53 @@
 
 """Guest query router implementation for ThrillZone Adventure Park."""
 
+import asyncio
+import functools
+import json
 import logging
-from typing import Dict, Any, Literal
-from pydantic import BaseModel, Field
+import os
+import re
+import threading
+import time
+import weakref
+from typing import Dict, Any, Iterable, List, Literal, Optional, Tuple
+from pydantic import BaseModel, Field, ValidationError
 from google.adk import Agent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
 from google.adk.tools import ToolContext
+from google.genai import types
 
 from .park_routes_config import PARK_AGENT_ROUTES, DEFAULT_ROUTE
+from .keyword_matcher import KeywordRouteMatcher
+from .centroid_classifier import CentroidRouteClassifier
+from .emergency_fast_lane import EmergencyFastLane
+from .near_duplicate_index import NearDuplicateRouteIndex
+from .routing_cache import RoutingCache, routes_version
+from .routing_cascade import CascadeStage, RoutingCascade, MODEL_STAGE
+from .routing_sidecar import RoutingSidecarClient
+from .router_prompt import router_instruction, routing_message, batch_routing_message
 from ..config import Config
 
 logger = logging.getLogger(__name__)
 configs = Config()
 
+# Longest router response that is parsed as JSON or scanned by the fallback extractor
+MAX_ROUTE_RESPONSE_CHARS = 2048
+
+# Clause boundaries used to split a guest message into separate intents
+_INTENT_SEPARATOR = re.compile(r"[?;!]|\.\s|\b(?:and also|and|also|plus|then)\b", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=8)
+def _route_name_pattern(route_names: Tuple[str, ...]) -> re.Pattern:
+    """Compile one alternation matching any route name written with underscores, spaces or hyphens."""
+    alternatives = [
+        r"[\s_-]+".join(re.escape(part) for part in route_name.split("_"))
+        for route_name in route_names
+    ]
+    return re.compile(r"\b(?:" + "|".join(alternatives) + r")\b", re.IGNORECASE)
+
 
 class RouteSelection(BaseModel):
     """Schema for route selection response."""
@@ -47,127 +82,727 @@ class RouteSelection(BaseModel):
     )
 
 
+class BatchRouteSelection(RouteSelection):
+    """Schema for one item of a batch route selection response."""
+    index: int = Field(
+        description="Position of the guest query in the batch message.",
+        ge=0
+    )
+
+
 class GuestQueryRouter:
     """Router for directing guest queries to appropriate specialist agents."""
     
-    def __init__(self):
-        """Initialize the router with a lightweight model for fast classification."""
+    def __init__(
+        self,
+        keyword_margin_threshold: float = None,
+        cache: RoutingCache = None,
+        model: str = None,
+        classifier: CentroidRouteClassifier = None,
+        near_duplicate_index: NearDuplicateRouteIndex = None,
+        use_sidecar: bool = None
+    ):
+        """
+        Initialize the router with a lightweight model for fast classification.
+        
+        Args:
+            keyword_margin_threshold: Keyword score margin needed to route without
+                the model, defaults to the configured routing setting
+            cache: Routing decision cache, a new one sized from the routing settings by default
+            model: Router model name, defaults to the configured router model
+            classifier: Local classifier stage exposing predict and predict_batch;
+                a CentroidRouteClassifier is built when enabled in the settings
+            near_duplicate_index: Index of earlier model decisions matched by
+                query similarity; built, and loaded from the configured path,
+                when enabled in the settings
+            use_sidecar: Serve the keyword and classifier stages from the
+                routing sidecar, keeping the local ones only as a fallback
+                while it is unreachable; defaults to whether a sidecar socket
+                is configured
+        """
+        settings = configs.routing_settings
+        if use_sidecar is None:
+            use_sidecar = bool(settings.sidecar_socket_path)
+        self.sidecar = None
+        if use_sidecar:
+            self.sidecar = RoutingSidecarClient(
+                settings.sidecar_socket_path, settings.sidecar_timeout_seconds, fallback=self._route_locally
+            )
+        if keyword_margin_threshold is None:
+            keyword_margin_threshold = configs.routing_settings.keyword_margin_threshold
+        self.keyword_matcher = KeywordRouteMatcher(margin_threshold=keyword_margin_threshold)
+        if cache is None:
+            cache = RoutingCache(
+                max_entries=configs.routing_settings.cache_max_entries,
+                ttl_seconds=configs.routing_settings.cache_ttl_seconds
+            )
+        self.cache = cache
+        if classifier is None and settings.classifier_enabled:
+            classifier = CentroidRouteClassifier(
+                temperature=settings.classifier_temperature,
+                confidence_threshold=settings.classifier_confidence_threshold
+            )
+            if settings.classifier_calibration_path:
+                classifier.calibrate_file(settings.classifier_calibration_path)
+        self.classifier = classifier
+        if near_duplicate_index is None and settings.near_duplicate_enabled:
+            near_duplicate_index = NearDuplicateRouteIndex(
+                threshold=settings.near_duplicate_threshold,
+                max_entries=settings.near_duplicate_max_entries,
+                ttl_seconds=settings.near_duplicate_ttl_seconds
+            )
+            if settings.near_duplicate_index_path and os.path.exists(settings.near_duplicate_index_path):
+                near_duplicate_index.load(settings.near_duplicate_index_path)
+        self.near_duplicate_index = near_duplicate_index
+        self._model_decisions = 0
+        self._save_thread: Optional[threading.Thread] = None
+        self.emergency_lane = EmergencyFastLane(slo_ms=configs.routing_settings.emergency_slo_ms)
+        self.cascade = self._build_cascade()
+        self.model = model or configs.agent_settings.router_model
         self.router_agent = Agent(
-            model=configs.agent_settings.router_model,
+            model=self.model,
             name="thrillzone_query_router",
-            instruction=self._get_router_instruction()
+            instruction=self._get_router_instruction(),
+            output_schema=RouteSelection,
+            disallow_transfer_to_parent=True,
+            disallow_transfer_to_peers=True
+        )
+        # Batch prompts need their own agent: the output schema constrains the
+        # model to a single RouteSelection object on the per-query agent
+        self.batch_router_agent = Agent(
+            model=self.model,
+            name="thrillzone_batch_query_router",
+            instruction=router_instruction(batch=True),
+            output_schema=list[BatchRouteSelection],
+            disallow_transfer_to_parent=True,
+            disallow_transfer_to_peers=True
         )
+        self._session_service = InMemorySessionService()
+        self._runners: Dict[str, Runner] = {}
+        self._lock = threading.Lock()
+        self._model_semaphores = weakref.WeakKeyDictionary()
     
-    def _get_router_instruction(self) -> str:
-        """Get the instruction prompt for the router agent."""
-        return f"""
-        You are a query classification agent for ThrillZone Adventure Park customer service.
+    def _build_cascade(self) -> RoutingCascade:
+        """
+        Build the local stages that run before the router model.
+        
+        Emergency fast lane, keyword matcher, local classifier, cached model
+        decisions, then model decisions for near-duplicate queries. In
+        sidecar mode a single sidecar stage replaces the keyword matcher and
+        classifier, which stay in local_fallback for the sidecar client to
+        use while the sidecar is unreachable. Each stage decides only when its confidence reaches the
+        stage threshold for the predicted route; emergency_responder uses a
+        lower, recall-biased threshold unless overridden per route in the
+        settings.
+        """
+        settings = configs.routing_settings
+        
+        def route_thresholds(stage_name: str) -> Dict[str, float]:
+            thresholds = {"emergency_responder": settings.emergency_confidence_threshold}
+            thresholds.update(settings.route_confidence_thresholds.get(stage_name, {}))
+            return thresholds
         
-        Your job is to analyze guest queries and select the most appropriate specialist agent to handle them.
+        local_stages = [
+            CascadeStage(
+                "keyword",
+                lambda query, context: self.keyword_matcher.classify(query),
+                threshold=settings.keyword_confidence_threshold,
+                route_thresholds=route_thresholds("keyword")
+            ),
+        ]
+        if self.classifier is not None:
+            local_stages.append(CascadeStage(
+                "classifier",
+                lambda query, context: self.classifier.predict(query),
+                threshold=settings.classifier_confidence_threshold,
+                route_thresholds=route_thresholds("classifier"),
+                predict_batch=lambda queries, contexts: self.classifier.predict_batch(queries)
+            ))
         
-        Available specialist agents and their capabilities:
-        {self._format_routes_for_prompt()}
+        stages = [
+            CascadeStage(
+                "emergency_fast_lane",
+                lambda query, context: self.emergency_lane.check(query)
+            ),
+        ]
+        self.local_fallback = None
+        if self.sidecar is not None:
+            # The sidecar applies the keyword and classifier thresholds itself
+            self.local_fallback = RoutingCascade(local_stages)
+            stages.append(CascadeStage(
+                "sidecar", self.sidecar.predict, predict_async=self.sidecar.predict_async
+            ))
+        else:
+            stages.extend(local_stages)
+        stages.append(CascadeStage("cache", self._get_cached_route))
+        if self.near_duplicate_index is not None:
+            stages.append(CascadeStage("near_duplicate", self.near_duplicate_index.get))
+        return RoutingCascade(stages)
+    
+    def _route_locally(
+        self,
+        guest_query: str,
+        guest_context: Dict[str, Any] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Route with the local keyword and classifier stages while the sidecar is unreachable."""
+        route_info, _ = self.local_fallback.run(guest_query, guest_context)
+        if route_info is None:
+            return None
+        route_info.pop("stage_timings_ms")
+        route_info["fallback_stage"] = route_info.pop("stage")
+        return route_info
+    
+    def retune_local_stages(
+        self,
+        keyword_weights: Dict[str, Dict[str, float]],
+        classifier_keyword_weights: Dict[str, Dict[str, float]] = None
+    ) -> None:
+        """
+        Replace the keyword matcher and classifier with reweighted copies.
         
-        Classification Guidelines:
-        1. Analyze the guest's query for key topics, intent, and urgency
-        2. Consider multiple aspects - a query might have secondary topics
-        3. Choose the MOST RELEVANT specialist based on the primary intent
-        4. For emergency or safety-related queries, ALWAYS route to emergency_responder
-        5. When uncertain, route to guest_services as the general support agent
-        6. Provide a confidence score: 0.9+ for clear matches, 0.7+ for likely matches, below 0.7 for uncertain
+        The new stages are built before being swapped in, and the cascade
+        looks them up on every query, so workers pick them up without a
+        restart while in-flight queries finish on the old ones.
         
-        Respond ONLY with a valid JSON object matching the RouteSelection schema.
+        Args:
+            keyword_weights: Keyword matcher weights per route and keyword
+            classifier_keyword_weights: Classifier keyword weights per route and
+                keyword; a custom classifier is left unchanged
         """
+        keyword_matcher = KeywordRouteMatcher(
+            route_keywords=self.keyword_matcher.route_keywords,
+            margin_threshold=self.keyword_matcher.margin_threshold,
+            keyword_weights=keyword_weights
+        )
+        classifier = self.classifier
+        if isinstance(classifier, CentroidRouteClassifier) and classifier_keyword_weights is not None:
+            classifier = CentroidRouteClassifier(
+                temperature=classifier.temperature,
+                confidence_threshold=classifier.confidence_threshold,
+                keyword_weights=classifier_keyword_weights
+            )
+        with self._lock:
+            self.keyword_matcher, self.classifier = keyword_matcher, classifier
     
-    def _format_routes_for_prompt(self) -> str:
-        """Format the routes configuration for the prompt."""
-        formatted = []
-        for route_name, description in PARK_AGENT_ROUTES.items():
-            formatted.append(f"**{route_name}**: {description.strip()}")
-        return "\n\n".join(formatted)
+    def _get_router_instruction(self) -> str:
+        """Get the precompiled instruction prompt for the router agent."""
+        return router_instruction()
     
-    def route_query(self, guest_query: str, guest_context: Dict[str, Any] = None) -> Dict[str, Any]:
+    def route_query(
+        self,
+        guest_query: str,
+        guest_context: Dict[str, Any] = None,
+        precomputed: Dict[str, Optional[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
         """
         Route a guest query to the appropriate specialist agent.
         
         Args:
             guest_query: The guest's question or request
             guest_context: Optional context about the guest (preferences, current visit, etc.)
+            precomputed: Cascade stage results the caller already has, by stage
+                name, such as an earlier emergency fast lane check
             
         Returns:
             Dictionary containing route selection and metadata
         """
+        timings: Dict[str, float] = {}
         try:
-            # Prepare the routing prompt
-            context_info = ""
-            if guest_context:
-                context_info = f"\n\nGuest Context: {guest_context}"
-            
-            routing_prompt = f"""
-            Guest Query: "{guest_query}"{context_info}
-            
-            Select the best specialist agent to handle this query and provide your reasoning.
-            """
+            local_route, timings = self.cascade.run(guest_query, guest_context, precomputed)
+            if local_route is not None:
+                return local_route
             
             # Get route selection from router agent
-            response = self.router_agent.run(routing_prompt)
+            started = time.perf_counter()
+            response = self._call_router_model(
+                self._build_routing_prompt(guest_query, guest_context)
+            )
+            return self._finish_model_route(guest_query, guest_context, response, timings, started)
             
-            # Parse the response - assuming it returns JSON-like structure
-            # In a real implementation, you'd use structured output or JSON parsing
-            route_info = self._parse_route_response(response)
+        except Exception as e:
+            logger.error(f"Error during routing: {e}")
+            return self._fallback_route(e, guest_query, timings)
+    
+    async def route_query_async(
+        self,
+        guest_query: str,
+        guest_context: Dict[str, Any] = None,
+        timeout: float = None,
+        precomputed: Dict[str, Optional[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Route a guest query without blocking the event loop.
+        
+        Cascade stages that wait on I/O, such as the routing sidecar, are
+        awaited. The model call is awaited under a per-loop semaphore that
+        bounds the number of in-flight router model calls. Cancelling the calling task
+        cancels the model call; exceeding the deadline falls back to the
+        default route.
+        
+        Args:
+            guest_query: The guest's question or request
+            guest_context: Optional context about the guest (preferences, current visit, etc.)
+            timeout: Deadline in seconds for the model call, defaults to the routing setting
+            precomputed: Cascade stage results the caller already has, by stage
+                name, such as an earlier emergency fast lane check
             
-            logger.info(
-                f"Routed query to {route_info['route']} "
-                f"(confidence: {route_info.get('confidence', 'unknown')}): {route_info.get('reason', '')}"
-            )
+        Returns:
+            Dictionary containing route selection and metadata
+        """
+        if timeout is None:
+            timeout = configs.routing_settings.route_timeout_seconds
+        timings: Dict[str, float] = {}
+        try:
+            local_route, timings = await self.cascade.run_async(guest_query, guest_context, precomputed)
+            if local_route is not None:
+                return local_route
             
-            return route_info
+            routing_prompt = self._build_routing_prompt(guest_query, guest_context)
+            started = time.perf_counter()
+            async with asyncio.timeout(timeout):
+                async with self._get_model_semaphore():
+                    response = await self._call_router_model_async(routing_prompt)
+            return self._finish_model_route(guest_query, guest_context, response, timings, started)
             
+        except TimeoutError:
+            logger.error(f"Routing deadline of {timeout}s exceeded")
+            return self._fallback_route(
+                TimeoutError(f"Routing deadline of {timeout}s exceeded"), guest_query, timings
+            )
         except Exception as e:
             logger.error(f"Error during routing: {e}")
-            # Fallback to default route
-            return {
-                "route": DEFAULT_ROUTE,
-                "reason": "Routing failed, using default agent",
-                "confidence": 0.5,
-                "error": str(e)
-            }
+            return self._fallback_route(e, guest_query, timings)
     
-    def _parse_route_response(self, response: str) -> Dict[str, Any]:
+    def predict_route_early(self, guest_query: str) -> Optional[str]:
         """
-        Parse the router agent response into structured data.
+        Predict the route from keywords alone, before the cascade or model runs.
+        
+        Used to start a specialist speculatively while routing is still in
+        progress; the prediction is only returned when the keyword evidence is
+        strong enough for that to usually pay off.
+        
+        Args:
+            guest_query: The guest's question or request
+            
+        Returns:
+            Predicted route name, or None when the keyword signal is too weak
+        """
+        settings = configs.routing_settings
+        if not settings.speculation_enabled:
+            return None
+        route_info = self.keyword_matcher.classify(guest_query)
+        if route_info is None or route_info["confidence"] < settings.speculation_min_confidence:
+            return None
+        return route_info["route"]
+    
+    def route_query_multi(
+        self,
+        guest_query: str,
+        guest_context: Dict[str, Any] = None,
+        max_routes: int = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Route a guest message that may carry several intents.
+        
+        The message is split into clauses; clauses without any local routing
+        signal are folded into the preceding clause. The clauses are routed
+        together with route_queries, so at most one model call is made, and
+        the distinct routes are returned ranked by confidence. Emergencies
+        short-circuit to the emergency route alone.
+        
+        Args:
+            guest_query: The guest's question or request
+            guest_context: Optional context about the guest
+            max_routes: Maximum number of routes to return, defaults to the routing setting
+            
+        Returns:
+            Ranked route selections, each with the "sub_query" it should answer
+        """
+        max_routes = max_routes or configs.routing_settings.multi_intent_max_routes
+        emergency_route = self.emergency_lane.check(guest_query)
+        if emergency_route is not None:
+            self.cascade.tag(emergency_route, "emergency_fast_lane", {})
+            return [dict(emergency_route, sub_query=guest_query)]
+        
+        segments = self._split_intents(guest_query)
+        if len(segments) == 1:
+            route_info = self.route_query(
+                guest_query, guest_context, {"emergency_fast_lane": None}
+            )
+            return [dict(route_info, sub_query=guest_query)]
+        
+        ranked: Dict[str, Dict[str, Any]] = {}
+        for segment, route_info in zip(
+            segments, self.route_queries(segments, [guest_context] * len(segments))
+        ):
+            route_name = route_info["route"]
+            if route_name in ranked:
+                ranked[route_name]["sub_query"] += f" {segment}"
+                ranked[route_name]["confidence"] = max(
+                    ranked[route_name]["confidence"], route_info["confidence"]
+                )
+            else:
+                ranked[route_name] = dict(route_info, sub_query=segment)
+        
+        routes = sorted(ranked.values(), key=lambda item: item["confidence"], reverse=True)
+        logger.info(f"Multi-intent query routed to {[item['route'] for item in routes[:max_routes]]}")
+        return routes[:max_routes]
+    
+    def _split_intents(self, guest_query: str) -> List[str]:
+        """Split a message into clauses that each carry a routing signal."""
+        segments: List[str] = []
+        carry = ""
+        for clause in _INTENT_SEPARATOR.split(guest_query):
+            clause = clause.strip(" ,.")
+            if not clause:
+                continue
+            has_signal = bool(self.keyword_matcher.find_matches(clause)) or (
+                self.classifier is not None and self.classifier.predict(clause) is not None
+            )
+            if has_signal:
+                segments.append(f"{carry} {clause}".strip())
+                carry = ""
+            elif segments:
+                segments[-1] = f"{segments[-1]} {clause}"
+            else:
+                carry = f"{carry} {clause}".strip()
+        if carry or not segments:
+            segments.append(carry or guest_query)
+        return segments
+    
+    def _build_routing_prompt(self, guest_query: str, guest_context: Dict[str, Any] = None) -> str:
+        """Build the compact per-query message sent after the precompiled instruction."""
+        return routing_message(guest_query, guest_context)
+    
+    def _finish_model_route(
+        self,
+        guest_query: str,
+        guest_context: Dict[str, Any],
+        response: str,
+        timings: Dict[str, float],
+        started: float
+    ) -> Dict[str, Any]:
+        """Parse a model routing response, cache it, record the model stage and log the decision."""
+        route_info = self._parse_route_response(response)
+        self._remember_model_route(guest_query, guest_context, route_info)
+        
+        timings[MODEL_STAGE] = (time.perf_counter() - started) * 1000
+        self.cascade.record(MODEL_STAGE, timings[MODEL_STAGE], decided=True)
+        self.cascade.tag(route_info, MODEL_STAGE, timings)
+        
+        logger.info(
+            f"Routed query to {route_info['route']} "
+            f"(confidence: {route_info.get('confidence', 'unknown')}): {route_info.get('reason', '')}"
+        )
+        
+        return route_info
+    
+    def route_queries(
+        self,
+        queries: List[str],
+        contexts: List[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Route a burst of guest queries with as few model calls as possible.
+        
+        Queries settled by the local cascade stages never reach the model; the
+        classifier stage scores all remaining queries in one matrix product.
+        The rest are packed several per prompt, up to the configured batch
+        size, and the model answers with one JSON item per query. A query that
+        is invalid or missing from the model answer falls back without
+        affecting the others.
         
-        This is a simplified implementation - in production you'd want
-        more robust JSON parsing or use structured output capabilities.
+        Args:
+            queries: Guest questions or requests
+            contexts: Optional guest context per query, aligned with queries
+            
+        Returns:
+            Routing results in the same order as the queries
+        """
+        contexts = contexts or [None] * len(queries)
+        if len(contexts) != len(queries):
+            raise ValueError("contexts must be aligned with queries")
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        valid = []
+        for index, guest_query in enumerate(queries):
+            if isinstance(guest_query, str) and guest_query.strip():
+                valid.append(index)
+            else:
+                results[index] = self._fallback_route(
+                    ValueError(f"Invalid guest query at batch index {index}")
+                )
+        
+        local_routes, timings = self.cascade.run_batch(
+            [queries[i] for i in valid], [contexts[i] for i in valid]
+        )
+        pending: List[int] = []
+        for index, route_info in zip(valid, local_routes):
+            results[index] = route_info
+            if route_info is None:
+                pending.append(index)
+        query_timings = dict(zip(valid, timings))
+        
+        batch_size = configs.routing_settings.batch_max_queries
+        model_calls = 0
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            batch_routes = {}
+            chunk_error = ValueError("Missing or invalid item in batch routing response")
+            started = time.perf_counter()
+            try:
+                model_calls += 1
+                response = self._call_router_model(
+                    self._build_batch_prompt([(queries[i], contexts[i]) for i in chunk]),
+                    self.batch_router_agent
+                )
+                batch_routes = self._parse_batch_response(response, len(chunk))
+            except Exception as e:
+                logger.error(f"Error during batch routing: {e}")
+                chunk_error = e
+            elapsed_ms = (time.perf_counter() - started) * 1000 / len(chunk)
+            
+            for position, index in enumerate(chunk):
+                route_info = batch_routes.get(position)
+                query_timings[index][MODEL_STAGE] = elapsed_ms
+                if route_info is None:
+                    results[index] = self._fallback_route(
+                        chunk_error, queries[index], query_timings[index]
+                    )
+                    continue
+                self._remember_model_route(queries[index], contexts[index], route_info)
+                self.cascade.record(MODEL_STAGE, elapsed_ms, decided=True)
+                results[index] = self.cascade.tag(route_info, MODEL_STAGE, query_timings[index])
+        
+        logger.info(f"Batch routed {len(queries)} queries with {model_calls} model calls")
+        return results
+    
+    def _remember_model_route(
+        self,
+        guest_query: str,
+        guest_context: Dict[str, Any],
+        route_info: Dict[str, Any]
+    ) -> None:
+        """Store a model decision in the exact and near-duplicate caches."""
+        self.cache.put(guest_query, guest_context, route_info)
+        if self.near_duplicate_index is None:
+            return
+        self.near_duplicate_index.put(guest_query, guest_context, route_info)
+        
+        settings = configs.routing_settings
+        with self._lock:
+            self._model_decisions += 1
+            save_now = self._model_decisions % settings.near_duplicate_save_every == 0
+        if save_now and settings.near_duplicate_index_path:
+            self._save_near_duplicate_index_in_background()
+    
+    def _save_near_duplicate_index_in_background(self) -> None:
+        """
+        Persist the near-duplicate index on a background thread.
+        
+        Saving serializes the whole index, so it is kept off the request path.
+        A save requested while the previous one is still writing is skipped;
+        the next periodic save picks up the newer entries.
+        """
+        with self._lock:
+            if self._save_thread is not None and self._save_thread.is_alive():
+                return
+            self._save_thread = threading.Thread(
+                target=self.save_near_duplicate_index,
+                name="near-duplicate-index-save",
+                daemon=True
+            )
+            self._save_thread.start()
+    
+    def save_near_duplicate_index(self, path: str = None) -> None:
+        """Persist the near-duplicate index so a restarted worker starts warm."""
+        path = path or configs.routing_settings.near_duplicate_index_path
+        if self.near_duplicate_index is None or not path:
+            return
+        try:
+            self.near_duplicate_index.save(path)
+        except OSError as e:
+            logger.error(f"Could not save near-duplicate index to {path}: {e}")
+    
+    def _get_cached_route(self, guest_query: str, guest_context: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Return a cached model decision for the query, if any."""
+        cached_route = self.cache.get(guest_query, guest_context)
+        if cached_route is not None:
+            cached_route["cache_hit"] = True
+        return cached_route
+    
+    def _call_router_model(self, prompt: str, agent: Agent = None) -> str:
+        """
+        Send a prompt to a router agent and return its text response.
+        
+        Must not be called from a running event loop; use
+        _call_router_model_async() there.
+        
+        Args:
+            prompt: Routing message for the agent
+            agent: Router agent to ask, defaults to the single-query router agent
+            
+        Returns:
+            The agent's final text response
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._call_router_model_async(prompt, agent))
+        raise RuntimeError("_call_router_model() cannot run inside an event loop, use _call_router_model_async()")
+    
+    async def _call_router_model_async(self, prompt: str, agent: Agent = None) -> str:
+        """
+        Send a prompt to a router agent through an ADK runner and await its text response.
+        
+        Every call runs in its own short-lived session, deleted afterwards even
+        when the call fails or is cancelled, so routing state never accumulates
+        in a long-running worker.
+        
+        Args:
+            prompt: Routing message for the agent
+            agent: Router agent to ask, defaults to the single-query router agent
+            
+        Returns:
+            The agent's final text response
+        """
+        runner = self._get_runner(agent or self.router_agent)
+        session = await self._session_service.create_session(
+            app_name=configs.app_name, user_id="router"
+        )
+        message = types.Content(role="user", parts=[types.Part(text=prompt)])
+        
+        response = ""
+        try:
+            async for event in runner.run_async(
+                user_id="router", session_id=session.id, new_message=message
+            ):
+                if event.is_final_response() and event.content and event.content.parts:
+                    response = "".join(part.text or "" for part in event.content.parts)
+        finally:
+            await self._session_service.delete_session(
+                app_name=configs.app_name, user_id="router", session_id=session.id
+            )
+        return response
+    
+    def _get_runner(self, agent: Agent) -> Runner:
+        """Return the ADK runner for a router agent, building it on first use."""
+        runner = self._runners.get(agent.name)
+        if runner is None:
+            with self._lock:
+                runner = self._runners.get(agent.name)
+                if runner is None:
+                    runner = Runner(
+                        app_name=configs.app_name,
+                        agent=agent,
+                        session_service=self._session_service
+                    )
+                    self._runners[agent.name] = runner
+        return runner
+    
+    def _get_model_semaphore(self) -> asyncio.BoundedSemaphore:
+        """Return the in-flight model call semaphore for the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._model_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.BoundedSemaphore(
+                configs.routing_settings.max_concurrent_model_calls
+            )
+            self._model_semaphores[loop] = semaphore
+        return semaphore
+    
+    def _build_batch_prompt(self, items: List[Tuple[str, Dict[str, Any]]]) -> str:
+        """Build one routing message covering several guest queries."""
+        return batch_routing_message(items)
+    
+    def _parse_batch_response(self, response: str, expected: int) -> Dict[int, Dict[str, Any]]:
         """
-        # For now, we'll use a simple heuristic-based approach
-        # In a real implementation, you'd parse JSON or use structured output
+        Parse a batch routing response into per-item route selections.
         
-        response_lower = response.lower()
+        Items that are malformed, out of range or fail RouteSelection validation
+        are skipped so the caller can fall back for them individually.
+        """
+        start, end = response.find("["), response.rfind("]")
+        if start == -1 or end < start:
+            raise ValueError("Batch routing response contains no JSON array")
         
-        # Check for route keywords in the response
-        best_route = DEFAULT_ROUTE
-        confidence = 0.6
-        reason = "Default routing"
+        parsed = {}
+        for item in json.loads(response[start:end + 1]):
+            try:
+                position = int(item["index"])
+                selection = RouteSelection.model_validate(item)
+            except Exception as e:
+                logger.warning(f"Skipping invalid batch routing item {item!r}: {e}")
+                continue
+            if 0 <= position < expected:
+                parsed[position] = selection.model_dump()
+        return parsed
+    
+    def _fallback_route(
+        self,
+        error: Exception,
+        guest_query: str = None,
+        timings: Dict[str, float] = None
+    ) -> Dict[str, Any]:
+        """
+        Route used when the model cannot answer.
         
-        for route_name in PARK_AGENT_ROUTES.keys():
-            if route_name.replace("_", " ") in response_lower:
-                best_route = route_name
-                confidence = 0.8
-                reason = f"Matched {route_name} in response"
-                break
+        The local classifier's best guess is used when its confidence reaches
+        the configured fallback floor, otherwise the default route.
+        """
+        if self.classifier is not None and isinstance(guest_query, str):
+            predicted = self.classifier.predict(guest_query)
+            min_confidence = configs.routing_settings.classifier_fallback_min_confidence
+            if predicted is not None and predicted["confidence"] >= min_confidence:
+                predicted["reason"] = "Router model unavailable, using local classifier"
+                predicted["error"] = str(error)
+                return self.cascade.tag(predicted, "fallback", timings or {})
+        return self.cascade.tag({
+            "route": DEFAULT_ROUTE,
+            "reason": "Routing failed, using default agent",
+            "confidence": 0.5,
+            "error": str(error)
+        }, "fallback", timings or {})
+    
+    def _parse_route_response(self, response: str) -> Dict[str, Any]:
+        """
+        Parse the router agent response into structured data.
+        
+        The router model is asked for schema-constrained JSON, which is
+        validated against RouteSelection in one pass. Malformed output goes
+        to a cheap extractor that only looks at the head of the response, so
+        parse time does not grow with response length.
+        """
+        text = response.strip()
+        if text.startswith("```"):
+            text = text.strip("`").removeprefix("json").strip()
         
-        # Emergency detection
-        emergency_keywords = ["emergency", "urgent", "medical", "safety", "help", "hurt"]
-        if any(keyword in response_lower for keyword in emergency_keywords):
-            best_route = "emergency_responder"
-            confidence = 0.95
-            reason = "Emergency keywords detected"
+        if len(text) <= MAX_ROUTE_RESPONSE_CHARS:
+            try:
+                selection = RouteSelection.model_validate_json(text)
+                return {**selection.model_dump(), "full_response": response}
+            except ValidationError as e:
+                logger.warning(f"Router response failed RouteSelection validation: {e.error_count()} errors")
+        
+        return self._extract_route_fallback(response)
+    
+    def _extract_route_fallback(self, response: str) -> Dict[str, Any]:
+        """Extract a route from malformed router output by scanning its head."""
+        head = response[:MAX_ROUTE_RESPONSE_CHARS]
+        match = _route_name_pattern(tuple(PARK_AGENT_ROUTES)).search(head)
+        if match is None:
+            return {
+                "route": DEFAULT_ROUTE,
+                "reason": "Default routing",
+                "confidence": 0.6,
+                "full_response": response
+            }
         
+        route_name = re.sub(r"[\s-]+", "_", match.group(0).lower())
         return {
-            "route": best_route,
-            "reason": reason,
-            "confidence": confidence,
+            "route": route_name,
+            "reason": f"Matched {route_name} in response",
+            "confidence": 0.8,
             "full_response": response
         }
     
@@ -176,6 +811,64 @@ class GuestQueryRouter:
         return PARK_AGENT_ROUTES.copy()
 
 
+class RouterRegistry:
+    """Process-wide registry that builds each router once per model and routes version."""
+    
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._routers: Dict[Tuple[str, str], GuestQueryRouter] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, model: str = None) -> GuestQueryRouter:
+        """
+        Get the shared router for a model, building it on first use.
+        
+        Routers are keyed by (model, routes version) so a change to
+        PARK_AGENT_ROUTES yields a freshly built router. Building happens
+        under a lock without awaiting, so concurrent threads and asyncio
+        tasks always receive the same instance.
+        
+        Args:
+            model: Router model name, defaults to the configured router model
+            
+        Returns:
+            Shared GuestQueryRouter instance
+        """
+        key = (model or configs.agent_settings.router_model, routes_version())
+        router = self._routers.get(key)
+        if router is not None:
+            return router
+        
+        with self._lock:
+            router = self._routers.get(key)
+            if router is None:
+                logger.info(f"Building router for model {key[0]}")
+                router = GuestQueryRouter(model=key[0])
+                self._routers[key] = router
+            return router
+    
+    def warm_up(self, models: Iterable[str] = None) -> List[GuestQueryRouter]:
+        """
+        Build routers ahead of traffic, typically at service start.
+        
+        Args:
+            models: Router model names to build, defaults to the configured router model
+            
+        Returns:
+            The warmed router instances
+        """
+        return [self.get(model) for model in (models or [None])]
+    
+    def clear(self) -> None:
+        """Drop all registered routers."""
+        with self._lock:
+            self._routers.clear()
+
+
+# Shared registry instance
+router_registry = RouterRegistry()
+
+
 # Utility function for easy routing
 def route_guest_query(query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
     """
@@ -188,5 +881,5 @@ def route_guest_query(query: str, context: Dict[str, Any] = None) -> Dict[str, A
     Returns:
         Routing result with selected agent and metadata
     """
-    router = GuestQueryRouter()
+    router = router_registry.get()
     return router.route_query(query, context) 
\ No newline at end of file
@@ -0,0 +1,210 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic keyword pre-classifier for guest query routing."""
+
+import logging
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+from .park_routes_config import GENERIC_KEYWORDS, ROUTE_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+# Matched keyword weight at which a route decision reaches full confidence
+FULL_EVIDENCE_WEIGHT = 2.0
+
+
+def default_keyword_weight(keyword: str) -> float:
+    """Weight of a keyword without overrides: one per word, half for a generic keyword."""
+    return 0.5 if keyword.casefold() in GENERIC_KEYWORDS else float(len(keyword.split()))
+
+
+class KeywordRouteMatcher:
+    """
+    Aho-Corasick automaton compiled from the route keyword table.
+
+    All keywords of all routes are matched in a single left-to-right pass
+    over the case-folded query. Matches must sit on word boundaries (a
+    trailing plural "s" is allowed) and a keyword contained in a longer
+    matched phrase is discarded, so "wait time" does not also count as
+    "time".
+    """
+
+    def __init__(
+        self,
+        route_keywords: Dict[str, List[str]] = None,
+        margin_threshold: float = 1.0,
+        keyword_weights: Dict[str, Dict[str, float]] = None,
+    ):
+        """
+        Compile the keyword table into a matching automaton.
+
+        Args:
+            route_keywords: Mapping of route name to keywords, defaults to ROUTE_KEYWORDS
+            margin_threshold: Minimum score margin of the best route over the
+                runner-up for classify() to return a decision
+            keyword_weights: Optional per-route keyword weights; a keyword
+                weighs default_keyword_weight() unless overridden here
+        """
+        self.route_keywords = route_keywords or ROUTE_KEYWORDS
+        self.margin_threshold = margin_threshold
+        self.routes = list(self.route_keywords.keys())
+
+        # Each pattern id maps to its text and the (route, weight) pairs it feeds.
+        self._patterns: List[str] = []
+        self._pattern_routes: List[List[Tuple[str, float]]] = []
+        pattern_ids: Dict[str, int] = {}
+        for route_name, keywords in self.route_keywords.items():
+            overrides = (keyword_weights or {}).get(route_name, {})
+            for keyword in dict.fromkeys(k.casefold() for k in keywords):
+                if keyword not in pattern_ids:
+                    pattern_ids[keyword] = len(self._patterns)
+                    self._patterns.append(keyword)
+                    self._pattern_routes.append([])
+                weight = overrides.get(keyword, default_keyword_weight(keyword))
+                self._pattern_routes[pattern_ids[keyword]].append((route_name, weight))
+
+        self._build_automaton()
+
+    def _build_automaton(self) -> None:
+        """Build goto, failure and output tables for all patterns."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[List[int]] = [[]]
+        for pattern_id, pattern in enumerate(self._patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(pattern_id)
+
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[self._fail[next_state]]
+                )
+
+    @staticmethod
+    def _is_boundary(text: str, start: int, end: int) -> bool:
+        """Check that text[start:end] is a whole word, allowing a plural 's'."""
+        if start > 0 and text[start - 1].isalnum():
+            return False
+        if end < len(text) and text[end].isalnum():
+            if text[end] != "s" or (end + 1 < len(text) and text[end + 1].isalnum()):
+                return False
+        return True
+
+    def find_matches(self, query: str) -> List[Tuple[int, int, int]]:
+        """
+        Find keyword occurrences in a query.
+
+        Args:
+            query: The guest's question or request
+
+        Returns:
+            List of (start, end, pattern_id) tuples, excluding matches nested
+            inside a longer match
+        """
+        text = query.casefold()
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in output[state]:
+                end = index + 1
+                start = end - len(self._patterns[pattern_id])
+                if self._is_boundary(text, start, end):
+                    matches.append((start, end, pattern_id))
+
+        return [
+            (start, end, pattern_id)
+            for start, end, pattern_id in matches
+            if not any(
+                other_start <= start and end <= other_end
+                and (other_end - other_start) > (end - start)
+                for other_start, other_end, _ in matches
+            )
+        ]
+
+    def score(self, query: str) -> Dict[str, Any]:
+        """
+        Score every route against a query in one pass.
+
+        Args:
+            query: The guest's question or request
+
+        Returns:
+            Dictionary with per-route "scores" and the "matched_keywords" per route
+        """
+        scores = dict.fromkeys(self.routes, 0.0)
+        matched: Dict[str, List[str]] = {}
+        for _, _, pattern_id in self.find_matches(query):
+            for route_name, weight in self._pattern_routes[pattern_id]:
+                scores[route_name] += weight
+                matched.setdefault(route_name, []).append(self._patterns[pattern_id])
+        return {"scores": scores, "matched_keywords": matched}
+
+    def classify(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Classify a query when the keyword evidence is unambiguous.
+
+        Confidence grows with the matched weight of the best route, reaching
+        0.95 at FULL_EVIDENCE_WEIGHT (a two-word phrase or two keywords), and
+        is scaled by the share of the best score the runner-up does not match.
+        A single one-word keyword stays at 0.65, below the default cascade
+        gate, so it only hints at the route the model will confirm.
+
+        Args:
+            query: The guest's question or request
+
+        Returns:
+            Route selection dictionary, or None when the margin of the best
+            route over the runner-up is below the threshold
+        """
+        result = self.score(query)
+        ranked = sorted(result["scores"].items(), key=lambda item: item[1], reverse=True)
+        best_route, best_score = ranked[0]
+        runner_up_score = ranked[1][1] if len(ranked) > 1 else 0.0
+        margin = best_score - runner_up_score
+
+        if best_score <= 0 or margin < self.margin_threshold:
+            return None
+
+        matched_keywords = list(dict.fromkeys(result["matched_keywords"][best_route]))
+        return {
+            "route": best_route,
+            "reason": f"Keyword match: {', '.join(matched_keywords)}",
+            "confidence": round(
+                min(0.95, 0.35 + 0.6 * best_score / FULL_EVIDENCE_WEIGHT) * margin / best_score, 2
+            ),
+            "matched_keywords": matched_keywords,
+        }
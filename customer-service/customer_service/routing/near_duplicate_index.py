@@ -0,0 +1,348 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Near-duplicate index of routing decisions using MinHash and banded LSH."""
+
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .routing_cache import CONTEXT_KEY_FIELDS, _freeze, normalize_query, routes_version
+
+logger = logging.getLogger(__name__)
+
+# Changes whenever tokens or hashing change, so saved signatures from an
+# older release are not compared with new ones
+SIGNATURE_VERSION = 2
+
+
+# Question words and fillers that the cache key keeps but that say nothing
+# about the route; dropping them lets short paraphrases match long ones
+_FILLER_WORDS = frozenset([
+    "how", "what", "whats", "when", "which", "who", "get", "near", "right",
+    "now", "today", "tell", "know", "want", "need", "like"
+])
+
+# Words folded into one token so paraphrases share it, e.g. "how long is the
+# line for Splash Safari" and "Splash Safari wait?"
+_CANONICAL_WORDS = {
+    "line": "wait", "queue": "wait", "long": "wait", "minute": "wait",
+    "eat": "food", "hungry": "food", "meal": "food",
+    "toilet": "restroom", "bathroom": "restroom",
+}
+
+
+def _tokens(guest_query: str) -> List[str]:
+    """
+    Split a query into its normalized words for similarity.
+
+    A trailing plural "s" is removed, fillers are dropped and synonyms are
+    folded into one word.
+    """
+    tokens = set()
+    for word in normalize_query(guest_query).split():
+        if len(word) > 3 and word.endswith("s"):
+            word = word[:-1]
+        if word not in _FILLER_WORDS:
+            tokens.add(_CANONICAL_WORDS.get(word, word))
+    return sorted(tokens)
+
+
+class NearDuplicateRouteIndex:
+    """
+    Routing decisions looked up by Jaccard similarity of the query words.
+
+    Each query gets a MinHash signature split into bands. Decisions are
+    bucketed by every band, so a lookup only compares the query with the
+    entries sharing at least one band, and at most max_bucket_size entries are
+    kept per bucket, which bounds lookup cost independently of the index
+    size. Candidates are accepted when their estimated Jaccard similarity
+    reaches the threshold. Entries expire after a time-to-live, the least
+    recently used entries are evicted first and the index can be saved to
+    and loaded from a JSON file.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.6,
+        max_entries: int = 4096,
+        ttl_seconds: float = 3600.0,
+        max_bucket_size: int = 8,
+        context_fields: Tuple[str, ...] = CONTEXT_KEY_FIELDS,
+        seed: int = 1,
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            num_perm: Number of MinHash permutations in a signature
+            bands: Number of LSH bands, must divide num_perm
+            threshold: Minimum estimated Jaccard similarity for a match
+            max_entries: Maximum number of decisions before LRU eviction
+            ttl_seconds: Seconds a decision stays valid
+            max_bucket_size: Most recent entries kept per LSH bucket
+            context_fields: Guest context fields that must match exactly
+            seed: Seed of the MinHash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bucket_size = max_bucket_size
+        self.context_fields = context_fields
+        self.seed = seed
+        self.hits = 0
+        self.misses = 0
+
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: odd 64-bit multipliers, arithmetic modulo
+        # 2**64, keeping the high 32 bits, which mix every input bit
+        self._a = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        self._entries: "OrderedDict[int, Tuple[float, Tuple, np.ndarray, Dict[str, Any]]]" = OrderedDict()
+        self._buckets: Dict[Tuple, List[int]] = {}
+        self._ids = itertools.count()
+        self._routes_version = routes_version()
+        self._lock = threading.Lock()
+
+    def signature(self, guest_query: str) -> Optional[np.ndarray]:
+        """
+        Compute the MinHash signature of a query.
+
+        Args:
+            guest_query: The guest's question or request
+
+        Returns:
+            Array of num_perm minimum hash values, or None when the query has no words
+        """
+        tokens = _tokens(guest_query)
+        if not tokens:
+            return None
+        hashes = np.array([zlib.crc32(token.encode()) for token in tokens], dtype=np.uint64)
+        return ((hashes[:, None] * self._a + self._b) >> np.uint64(32)).min(axis=0)
+
+    def _context_key(self, guest_context: Dict[str, Any] = None) -> Tuple:
+        """Return the routing-relevant part of the guest context."""
+        guest_context = guest_context or {}
+        return tuple((field, _freeze(guest_context.get(field))) for field in self.context_fields)
+
+    def _band_keys(self, context_key: Tuple, signature: np.ndarray) -> List[Tuple]:
+        """Return the LSH bucket key of every band of a signature."""
+        return [
+            (context_key, band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _check_routes_version(self) -> None:
+        """Drop every entry when the routes configuration has changed."""
+        current_version = routes_version()
+        if current_version != self._routes_version:
+            logger.info("Routes configuration changed, invalidating near-duplicate index")
+            self._entries.clear()
+            self._buckets.clear()
+            self._routes_version = current_version
+
+    def _remove(self, entry_id: int) -> None:
+        """Remove an entry and its bucket references."""
+        _, context_key, signature, _ = self._entries.pop(entry_id)
+        for band_key in self._band_keys(context_key, signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is None:
+                continue
+            if entry_id in bucket:
+                bucket.remove(entry_id)
+            if not bucket:
+                del self._buckets[band_key]
+
+    def get(self, guest_query: str, guest_context: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up the decision of the most similar earlier query.
+
+        Args:
+            guest_query: The guest's question or request
+            guest_context: Optional context about the guest
+
+        Returns:
+            Copy of the matching routing result with its "similarity", or None
+        """
+        signature = self.signature(guest_query)
+        if signature is None:
+            return None
+        context_key = self._context_key(guest_context)
+        now = time.time()
+        with self._lock:
+            self._check_routes_version()
+            candidates = set()
+            for band_key in self._band_keys(context_key, signature):
+                candidates.update(self._buckets.get(band_key, ()))
+
+            best_id, best_similarity = None, 0.0
+            for entry_id in candidates:
+                stored_at, _, candidate, _ = self._entries[entry_id]
+                if now - stored_at > self.ttl_seconds:
+                    self._remove(entry_id)
+                    continue
+                similarity = float(np.mean(candidate == signature))
+                if similarity > best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+            if best_id is None or best_similarity < self.threshold:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return dict(self._entries[best_id][3], similarity=round(best_similarity, 2))
+
+    def put(self, guest_query: str, guest_context: Dict[str, Any], route_info: Dict[str, Any]) -> None:
+        """
+        Store a routing decision.
+
+        Args:
+            guest_query: The guest's question or request
+            guest_context: Optional context about the guest
+            route_info: Routing result to store
+        """
+        signature = self.signature(guest_query)
+        if signature is None:
+            return
+        with self._lock:
+            self._check_routes_version()
+            self._insert(time.time(), self._context_key(guest_context), signature, route_info)
+
+    def _insert(
+        self,
+        stored_at: float,
+        context_key: Tuple,
+        signature: np.ndarray,
+        route_info: Dict[str, Any]
+    ) -> None:
+        """Add an entry, trimming full buckets and evicting least recently used entries."""
+        entry_id = next(self._ids)
+        self._entries[entry_id] = (stored_at, context_key, signature, {
+            key: route_info[key] for key in ("route", "reason", "confidence") if key in route_info
+        })
+        for band_key in self._band_keys(context_key, signature):
+            bucket = self._buckets.setdefault(band_key, [])
+            bucket.append(entry_id)
+            if len(bucket) > self.max_bucket_size:
+                del bucket[0]
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """Remove all stored decisions."""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit and miss counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "buckets": len(self._buckets),
+        }
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to a JSON file, replacing it atomically.
+
+        Args:
+            path: Destination file
+        """
+        with self._lock:
+            version = self._routes_version
+            entries = list(self._entries.values())
+        payload = {
+            "routes_version": version,
+            "signature_version": SIGNATURE_VERSION,
+            "num_perm": self.num_perm,
+            "seed": self.seed,
+            "entries": [
+                {
+                    "stored_at": stored_at,
+                    "context": context_key,
+                    "signature": signature.tolist(),
+                    "route_info": route_info,
+                }
+                for stored_at, context_key, signature, route_info in entries
+            ],
+        }
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(payload, f)
+        os.replace(temporary_path, path)
+
+    def load(self, path: str) -> int:
+        """
+        Add the still valid entries of a file written by save().
+
+        Files written for other routes or signature parameters are ignored.
+
+        Args:
+            path: File written by save()
+
+        Returns:
+            Number of entries loaded
+        """
+        try:
+            with open(path) as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load near-duplicate index from {path}: {e}")
+            return 0
+
+        if (
+            payload.get("routes_version"), payload.get("signature_version"),
+            payload.get("num_perm"), payload.get("seed")
+        ) != (routes_version(), SIGNATURE_VERSION, self.num_perm, self.seed):
+            logger.info(f"Ignoring stale near-duplicate index at {path}")
+            return 0
+
+        now = time.time()
+        loaded = 0
+        with self._lock:
+            self._check_routes_version()
+            for entry in payload.get("entries", []):
+                if now - entry["stored_at"] > self.ttl_seconds:
+                    continue
+                self._insert(
+                    entry["stored_at"],
+                    _freeze(entry["context"]),
+                    np.array(entry["signature"], dtype=np.uint64),
+                    entry["route_info"],
+                )
+                loaded += 1
+        logger.info(f"Loaded {loaded} routing decisions from {path}")
+        return loaded
@@ -112,5 +112,12 @@ ROUTE_KEYWORDS = {
     ]
 }
 
+# Keywords common in questions for every route; they weigh half a word in
+# the keyword matcher, so they cannot decide a route on their own
+GENERIC_KEYWORDS = frozenset({
+    "fun", "exciting", "line", "open", "time", "where is", "help",
+    "information", "assistance", "location"
+})
+
 # Fallback route when classification is uncertain
 DEFAULT_ROUTE = "guest_services" 
\ No newline at end of file
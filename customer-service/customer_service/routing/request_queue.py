@@ -0,0 +1,90 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Priority request queue for pending guest queries."""
+
+import asyncio
+import itertools
+import time
+from typing import Dict, Any, Optional
+
+EMERGENCY_PRIORITY = 0
+NORMAL_PRIORITY = 1
+
+
+class GuestRequest:
+    """A guest query waiting to be handled."""
+
+    def __init__(
+        self,
+        guest_query: str,
+        guest_id: str,
+        priority: int,
+        future: asyncio.Future,
+        emergency_route: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Create a pending request.
+
+        Args:
+            guest_query: The guest's question or request
+            guest_id: Guest identifier
+            priority: EMERGENCY_PRIORITY or NORMAL_PRIORITY
+            future: Resolved with the response once the request is handled
+            emergency_route: Emergency fast lane result computed when the
+                request was queued, None when the lane did not fire
+        """
+        self.guest_query = guest_query
+        self.guest_id = guest_id
+        self.priority = priority
+        self.future = future
+        self.emergency_route = emergency_route
+        self.enqueued_at = time.perf_counter()
+
+    @property
+    def is_emergency(self) -> bool:
+        return self.priority == EMERGENCY_PRIORITY
+
+
+class GuestRequestQueue:
+    """
+    Asyncio priority queue where emergencies are served before everything else.
+
+    Requests of equal priority keep their arrival order.
+    """
+
+    def __init__(self):
+        """Initialize an empty queue."""
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+
+    async def put(self, request: GuestRequest) -> None:
+        """Enqueue a request behind others of the same priority."""
+        await self._queue.put((request.priority, next(self._sequence), request))
+
+    async def get(self) -> GuestRequest:
+        """Wait for the most urgent pending request."""
+        _, _, request = await self._queue.get()
+        return request
+
+    def task_done(self) -> None:
+        """Mark the last request returned by get() as handled."""
+        self._queue.task_done()
+
+    async def join(self) -> None:
+        """Wait until every queued request has been handled."""
+        await self._queue.join()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
@@ -0,0 +1,167 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Precompiled router prompt.
+
+The router prompt is split into a static system instruction, compiled once
+per routes version and identical byte for byte across calls so the model
+backend can cache it as a prefix, and a compact JSON message per query that
+carries only the guest context fields that affect routing.
+"""
+
+import json
+import threading
+from typing import Dict, Any, Iterable, Tuple
+
+from .park_routes_config import PARK_AGENT_ROUTES
+from .routing_cache import CONTEXT_KEY_FIELDS, routes_version
+
+# Guest context fields sent to the router model
+ROUTER_CONTEXT_FIELDS = CONTEXT_KEY_FIELDS
+
+_INSTRUCTION_HEADER = """You are a query classification agent for ThrillZone Adventure Park customer service.
+Select the most appropriate specialist agent for each guest query.
+
+Available specialist agents and their capabilities:
+"""
+
+_SINGLE_MESSAGE_FORMAT = """
+Each message is a JSON object with the guest "query" and optional guest "context".
+"""
+
+_BATCH_MESSAGE_FORMAT = """
+Each message lists several guest queries, one JSON object per line with its "index",
+the guest "query" and optional guest "context".
+"""
+
+_GUIDELINES = """
+Classification Guidelines:
+1. Analyze the guest's query for key topics, intent, and urgency
+2. Consider multiple aspects - a query might have secondary topics
+3. Choose the MOST RELEVANT specialist based on the primary intent
+4. For emergency or safety-related queries, ALWAYS route to emergency_responder
+5. When uncertain, route to guest_services as the general support agent
+6. Provide a confidence score: 0.9+ for clear matches, 0.7+ for likely matches, below 0.7 for uncertain
+"""
+
+_SINGLE_RESPONSE_FORMAT = """
+Respond ONLY with a valid JSON object matching the RouteSelection schema."""
+
+_BATCH_RESPONSE_FORMAT = """
+Classify each query independently. Respond ONLY with a valid JSON array holding one
+object per query, each with the "index" of its query and the RouteSelection fields."""
+
+_BATCH_HEADER = (
+    "Classify each of the following guest queries independently. Respond ONLY with a "
+    "JSON array containing one object per query with the fields index, route, reason "
+    "and confidence.\n"
+)
+
+_compiled: Dict[Tuple[str, bool], str] = {}
+_compiled_lock = threading.Lock()
+
+
+def _format_routes(routes: Dict[str, str]) -> str:
+    """Format route descriptions with their indentation removed."""
+    sections = []
+    for route_name, description in routes.items():
+        lines = [line.strip() for line in description.strip().splitlines()]
+        sections.append(f"**{route_name}**:\n" + "\n".join(line for line in lines if line))
+    return "\n\n".join(sections)
+
+
+def router_instruction(routes: Dict[str, str] = None, batch: bool = False) -> str:
+    """
+    Return the router system instruction for a routes configuration.
+
+    The instruction is compiled once per routes version and the same string
+    object is returned afterwards.
+
+    Args:
+        routes: Route descriptions, defaults to PARK_AGENT_ROUTES
+        batch: Compile the instruction of the batch router, which answers
+            with a JSON array of indexed route selections
+
+    Returns:
+        The static system instruction
+    """
+    routes = PARK_AGENT_ROUTES if routes is None else routes
+    key = (routes_version(routes), batch)
+    instruction = _compiled.get(key)
+    if instruction is None:
+        with _compiled_lock:
+            instruction = _compiled.get(key)
+            if instruction is None:
+                if batch:
+                    footer = _BATCH_MESSAGE_FORMAT + _GUIDELINES + _BATCH_RESPONSE_FORMAT
+                else:
+                    footer = _SINGLE_MESSAGE_FORMAT + _GUIDELINES + _SINGLE_RESPONSE_FORMAT
+                instruction = _INSTRUCTION_HEADER + _format_routes(routes) + "\n" + footer
+                _compiled[key] = instruction
+    return instruction
+
+
+def compact_context(guest_context: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Keep only the guest context fields the router uses, dropping unset values and false flags."""
+    guest_context = guest_context or {}
+    context = {}
+    for field in ROUTER_CONTEXT_FIELDS:
+        value = guest_context.get(field)
+        if value is not None and value is not False:
+            context[field] = value
+    return context
+
+
+def _serialize(message: Dict[str, Any]) -> str:
+    """Serialize a message compactly with a stable key order."""
+    return json.dumps(message, separators=(",", ":"), sort_keys=True, ensure_ascii=False, default=str)
+
+
+def routing_message(guest_query: str, guest_context: Dict[str, Any] = None) -> str:
+    """
+    Build the per-query router message.
+
+    Args:
+        guest_query: The guest's question or request
+        guest_context: Optional context about the guest
+
+    Returns:
+        Compact JSON with the query and its routing-relevant context
+    """
+    message: Dict[str, Any] = {"query": guest_query}
+    context = compact_context(guest_context)
+    if context:
+        message["context"] = context
+    return _serialize(message)
+
+
+def batch_routing_message(items: Iterable[Tuple[str, Dict[str, Any]]]) -> str:
+    """
+    Build one router message covering several guest queries.
+
+    Args:
+        items: (query, context) pairs; positions become the "index" of each line
+
+    Returns:
+        Batch instructions followed by one compact JSON line per query
+    """
+    lines = []
+    for position, (guest_query, guest_context) in enumerate(items):
+        entry: Dict[str, Any] = {"index": position, "query": guest_query}
+        context = compact_context(guest_context)
+        if context:
+            entry["context"] = context
+        lines.append(_serialize(entry))
+    return _BATCH_HEADER + "\n".join(lines)
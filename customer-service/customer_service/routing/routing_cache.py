@@ -0,0 +1,212 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Routing decision cache for repeated guest queries."""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from .park_routes_config import PARK_AGENT_ROUTES
+from .routing_context import ROUTING_CONTEXT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Filler words that never change which specialist should answer
+STOPWORDS = frozenset([
+    "a", "an", "the", "is", "are", "am", "was", "be", "i", "me", "my", "we",
+    "our", "us", "you", "your", "it", "its", "this", "that", "to", "of",
+    "for", "in", "on", "at", "and", "or", "please", "can", "could", "would",
+    "will", "do", "does", "there", "any", "some", "hi", "hello", "hey",
+    "thanks", "thank"
+])
+
+# Guest context fields that can change the routing decision
+CONTEXT_KEY_FIELDS = ROUTING_CONTEXT_FIELDS
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a guest query into a cache key.
+
+    Args:
+        query: The guest's question or request
+
+    Returns:
+        Case-folded query with punctuation and whitespace collapsed and stopwords dropped
+    """
+    words = _NON_WORD.sub(" ", query.casefold()).split()
+    return " ".join(word for word in words if word not in STOPWORDS)
+
+
+# Most routes configurations whose fingerprint is kept between calls
+_MAX_VERSIONED_ROUTES = 8
+
+# Fingerprints keyed by routes object id: (routes object, shallow copy, fingerprint)
+_route_versions: Dict[int, Tuple[Dict[str, str], Dict[str, str], str]] = {}
+
+
+def routes_version(routes: Dict[str, str] = None) -> str:
+    """
+    Return a fingerprint of the routes configuration.
+
+    The fingerprint is computed once per routes object and reused while the
+    object's contents still equal the copy taken at that time; comparing
+    the unchanged entries only checks string identity, so lookups on the
+    request path stay cheap while in-place edits are still picked up.
+
+    Args:
+        routes: Route descriptions, defaults to PARK_AGENT_ROUTES
+
+    Returns:
+        Hex digest over the sorted route names and descriptions
+    """
+    routes = PARK_AGENT_ROUTES if routes is None else routes
+    entry = _route_versions.get(id(routes))
+    if entry is not None and entry[0] is routes and entry[1] == routes:
+        return entry[2]
+    version = _hash_routes(routes)
+    if len(_route_versions) >= _MAX_VERSIONED_ROUTES:
+        _route_versions.clear()
+    _route_versions[id(routes)] = (routes, dict(routes), version)
+    return version
+
+
+def _hash_routes(routes: Dict[str, str]) -> str:
+    """Hash the sorted route names and descriptions."""
+    digest = hashlib.sha1()
+    for route_name, description in sorted(routes.items()):
+        digest.update(route_name.encode())
+        digest.update(b"\0")
+        digest.update(description.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _freeze(value: Any) -> Any:
+    """Convert context values into hashable equivalents."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class RoutingCache:
+    """Bounded LRU cache of routing decisions with a time-to-live."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 300.0,
+        context_fields: Tuple[str, ...] = CONTEXT_KEY_FIELDS,
+    ):
+        """
+        Initialize an empty routing cache.
+
+        Args:
+            max_entries: Maximum number of cached decisions before LRU eviction
+            ttl_seconds: Seconds a cached decision stays valid
+            context_fields: Guest context fields that are part of the cache key
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.context_fields = context_fields
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._routes_version = routes_version()
+        self._lock = threading.Lock()
+
+    def make_key(self, guest_query: str, guest_context: Dict[str, Any] = None) -> Tuple:
+        """Build the cache key for a query and its routing-relevant context."""
+        guest_context = guest_context or {}
+        context_key = tuple(
+            (field, _freeze(guest_context.get(field))) for field in self.context_fields
+        )
+        return (normalize_query(guest_query), context_key)
+
+    def _check_routes_version(self) -> None:
+        """Drop every entry when the routes configuration has changed."""
+        current_version = routes_version()
+        if current_version != self._routes_version:
+            logger.info("Routes configuration changed, invalidating routing cache")
+            self._entries.clear()
+            self._routes_version = current_version
+
+    def get(self, guest_query: str, guest_context: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached routing decision.
+
+        Args:
+            guest_query: The guest's question or request
+            guest_context: Optional context about the guest
+
+        Returns:
+            Copy of the cached routing result, or None on a miss
+        """
+        key = self.make_key(guest_query, guest_context)
+        with self._lock:
+            self._check_routes_version()
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, guest_query: str, guest_context: Dict[str, Any], route_info: Dict[str, Any]) -> None:
+        """
+        Store a routing decision.
+
+        Args:
+            guest_query: The guest's question or request
+            guest_context: Optional context about the guest
+            route_info: Routing result to cache
+        """
+        key = self.make_key(guest_query, guest_context)
+        with self._lock:
+            self._check_routes_version()
+            self._entries[key] = (time.monotonic(), dict(route_info))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached decisions."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit and miss counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
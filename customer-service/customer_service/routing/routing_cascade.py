@@ -0,0 +1,254 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Confidence-gated routing cascade for ThrillZone Adventure Park."""
+
+import logging
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Stage name recorded when the router model makes the decision
+MODEL_STAGE = "router_model"
+
+
+class CascadeStage:
+    """A routing stage and the confidence its answers need to be accepted."""
+
+    def __init__(
+        self,
+        name: str,
+        predict: Callable[[str, Dict[str, Any]], Optional[Dict[str, Any]]],
+        threshold: float = 0.0,
+        route_thresholds: Dict[str, float] = None,
+        predict_batch: Callable[[List[str], List[Dict[str, Any]]], List[Optional[Dict[str, Any]]]] = None,
+        predict_async: Callable[[str, Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]] = None,
+    ):
+        """
+        Create a cascade stage.
+
+        Args:
+            name: Stage name recorded on the decisions it makes
+            predict: Returns a candidate route selection for (query, context), or None
+            threshold: Minimum candidate confidence for the stage to decide
+            route_thresholds: Per-route overrides of the threshold
+            predict_batch: Optional vectorized predict over lists of queries and contexts
+            predict_async: Optional coroutine version of predict, used by
+                run_async() for stages that wait on I/O
+        """
+        self.name = name
+        self.predict = predict
+        self.threshold = threshold
+        self.route_thresholds = route_thresholds or {}
+        self.predict_batch = predict_batch
+        self.predict_async = predict_async
+
+    def threshold_for(self, route: str) -> float:
+        """Return the confidence a candidate for route needs at this stage."""
+        return self.route_thresholds.get(route, self.threshold)
+
+    def accepts(self, route_info: Optional[Dict[str, Any]]) -> bool:
+        """Check whether a candidate is confident enough to end the cascade."""
+        if route_info is None:
+            return False
+        return route_info.get("confidence", 0.0) >= self.threshold_for(route_info["route"])
+
+
+class RoutingCascade:
+    """
+    Runs routing stages cheapest first until one is confident enough.
+
+    Every decision is tagged with the stage that made it and the time spent
+    in each stage that ran. Per-stage invocation, decision and latency totals
+    are kept so the accuracy/latency trade of each threshold can be measured.
+    """
+
+    def __init__(self, stages: List[CascadeStage]):
+        """
+        Initialize the cascade.
+
+        Args:
+            stages: Stages in the order they should run
+        """
+        self.stages = stages
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get_stage(self, name: str) -> CascadeStage:
+        """Return the stage with the given name."""
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    def record(self, stage_name: str, elapsed_ms: float, decided: bool) -> None:
+        """Add one stage run to the stage statistics."""
+        with self._lock:
+            stats = self._stats.setdefault(
+                stage_name, {"invocations": 0, "decisions": 0, "total_ms": 0.0}
+            )
+            stats["invocations"] += 1
+            stats["decisions"] += int(decided)
+            stats["total_ms"] += elapsed_ms
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return per-stage invocation, decision and latency totals."""
+        with self._lock:
+            return {
+                name: dict(
+                    stats,
+                    avg_ms=stats["total_ms"] / stats["invocations"] if stats["invocations"] else 0.0,
+                )
+                for name, stats in self._stats.items()
+            }
+
+    @staticmethod
+    def tag(route_info: Dict[str, Any], stage_name: str, timings: Dict[str, float]) -> Dict[str, Any]:
+        """Record the deciding stage and per-stage timings on a decision."""
+        route_info["stage"] = stage_name
+        route_info["stage_timings_ms"] = timings
+        return route_info
+
+    def run(
+        self,
+        guest_query: str,
+        guest_context: Dict[str, Any] = None,
+        precomputed: Dict[str, Optional[Dict[str, Any]]] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Dict[str, float]]:
+        """
+        Run the stages for one query.
+
+        Args:
+            guest_query: The guest's question or request
+            guest_context: Optional context about the guest
+            precomputed: Candidates the caller already computed, by stage name;
+                those stages use them instead of predicting again
+
+        Returns:
+            The accepted decision or None, and the milliseconds spent per stage
+        """
+        timings: Dict[str, float] = {}
+        precomputed = precomputed or {}
+        for stage in self.stages:
+            start = time.perf_counter()
+            if stage.name in precomputed:
+                route_info = precomputed[stage.name]
+            else:
+                route_info = stage.predict(guest_query, guest_context)
+            if self._finish_stage(stage, route_info, start, timings):
+                return self.tag(route_info, stage.name, timings), timings
+        return None, timings
+
+    async def run_async(
+        self,
+        guest_query: str,
+        guest_context: Dict[str, Any] = None,
+        precomputed: Dict[str, Optional[Dict[str, Any]]] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Dict[str, float]]:
+        """
+        Run the stages for one query, awaiting stages that have predict_async.
+
+        Args:
+            guest_query: The guest's question or request
+            guest_context: Optional context about the guest
+            precomputed: Candidates the caller already computed, by stage name;
+                those stages use them instead of predicting again
+
+        Returns:
+            The accepted decision or None, and the milliseconds spent per stage
+        """
+        timings: Dict[str, float] = {}
+        precomputed = precomputed or {}
+        for stage in self.stages:
+            start = time.perf_counter()
+            if stage.name in precomputed:
+                route_info = precomputed[stage.name]
+            elif stage.predict_async is not None:
+                route_info = await stage.predict_async(guest_query, guest_context)
+            else:
+                route_info = stage.predict(guest_query, guest_context)
+            if self._finish_stage(stage, route_info, start, timings):
+                return self.tag(route_info, stage.name, timings), timings
+        return None, timings
+
+    def _finish_stage(
+        self,
+        stage: CascadeStage,
+        route_info: Optional[Dict[str, Any]],
+        start: float,
+        timings: Dict[str, float]
+    ) -> bool:
+        """Time and record one stage run and return whether it decided the route."""
+        accepted = stage.accepts(route_info)
+        timings[stage.name] = (time.perf_counter() - start) * 1000
+        self.record(stage.name, timings[stage.name], accepted)
+        if accepted:
+            logger.info(
+                f"{stage.name} stage routed query to {route_info['route']} "
+                f"(confidence: {route_info.get('confidence')})"
+            )
+        return accepted
+
+    def run_batch(
+        self,
+        queries: Sequence[str],
+        contexts: Sequence[Dict[str, Any]]
+    ) -> Tuple[List[Optional[Dict[str, Any]]], List[Dict[str, float]]]:
+        """
+        Run the stages over a batch, using vectorized stages where available.
+
+        A query that makes a stage fail is left undecided by that stage and
+        continues down the cascade.
+
+        Args:
+            queries: Guest questions or requests
+            contexts: Guest context per query
+
+        Returns:
+            Accepted decision or None per query, and per-query stage timings
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        timings: List[Dict[str, float]] = [{} for _ in queries]
+        pending = list(range(len(queries)))
+        for stage in self.stages:
+            if not pending:
+                break
+            start = time.perf_counter()
+            if stage.predict_batch is not None:
+                candidates = stage.predict_batch(
+                    [queries[i] for i in pending], [contexts[i] for i in pending]
+                )
+            else:
+                candidates = []
+                for index in pending:
+                    try:
+                        candidates.append(stage.predict(queries[index], contexts[index]))
+                    except Exception as e:
+                        logger.warning(f"{stage.name} stage failed on batch item {index}: {e}")
+                        candidates.append(None)
+            elapsed_ms = (time.perf_counter() - start) * 1000 / len(pending)
+
+            still_pending = []
+            for index, route_info in zip(pending, candidates):
+                timings[index][stage.name] = elapsed_ms
+                accepted = stage.accepts(route_info)
+                self.record(stage.name, elapsed_ms, accepted)
+                if accepted:
+                    results[index] = self.tag(route_info, stage.name, timings[index])
+                else:
+                    still_pending.append(index)
+            pending = still_pending
+        return results, timings
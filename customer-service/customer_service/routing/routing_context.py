@@ -0,0 +1,148 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Precomputed per-guest routing context fingerprints."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from ..entities.guest import Guest
+
+
+class RoutingContext(NamedTuple):
+    """
+    Compact, hashable summary of the guest fields that affect routing.
+
+    Supports get() like a context dictionary, so the router, its caches and
+    the prompt builder accept it wherever a guest context is expected.
+    """
+
+    membership_type: Optional[str] = None
+    party_size: int = 1
+    accessibility_needs: bool = False
+    dietary_restrictions: bool = False
+    special_occasion: bool = False
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """Return a field value, or default for fields outside the fingerprint."""
+        return getattr(self, field, default) if field in self._fields else default
+
+
+# Guest context fields that can change the routing decision
+ROUTING_CONTEXT_FIELDS: Tuple[str, ...] = RoutingContext._fields
+
+
+def routing_context_for(guest: Guest) -> RoutingContext:
+    """
+    Summarize a guest profile into its routing fingerprint.
+
+    Args:
+        guest: Guest profile
+
+    Returns:
+        The guest's routing context
+    """
+    needs = guest.accessibility_needs
+    visit = guest.current_visit
+    return RoutingContext(
+        membership_type=guest.membership_type,
+        party_size=visit.party_size if visit else 1,
+        accessibility_needs=any((
+            needs.wheelchair_access,
+            needs.mobility_assistance,
+            needs.visual_assistance,
+            needs.hearing_assistance,
+            bool(needs.special_accommodations),
+        )),
+        dietary_restrictions=bool(needs.dietary_restrictions),
+        special_occasion=bool(visit and visit.special_occasion),
+    )
+
+
+class RoutingContextStore:
+    """
+    Routing fingerprints computed once per guest profile version.
+
+    A fingerprint is served from memory until the guest's profile version
+    changes, so routing a message does not load or dump the guest profile.
+    """
+
+    def __init__(self, load_guest: Callable[[str], Guest] = None, max_entries: int = 10000):
+        """
+        Initialize an empty store.
+
+        Args:
+            load_guest: Loads a guest profile by ID, defaults to Guest.get_guest
+            max_entries: Maximum number of guests kept before LRU eviction
+        """
+        self.load_guest = load_guest or Guest.get_guest
+        self.max_entries = max_entries
+        self.computed = 0
+        self._entries: "OrderedDict[str, Tuple[int, RoutingContext]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, guest_id: str, profile_version: int = None) -> RoutingContext:
+        """
+        Return a guest's routing context.
+
+        Args:
+            guest_id: Guest identifier
+            profile_version: Current profile version when known by the caller;
+                a different cached version is recomputed
+
+        Returns:
+            The guest's routing context
+        """
+        with self._lock:
+            entry = self._entries.get(guest_id)
+            if entry is not None and profile_version in (None, entry[0]):
+                self._entries.move_to_end(guest_id)
+                return entry[1]
+        return self.update(self.load_guest(guest_id))
+
+    def update(self, guest: Guest) -> RoutingContext:
+        """
+        Store the fingerprint of a guest profile unless its version is already stored.
+
+        Args:
+            guest: Guest profile, typically right after it was changed
+
+        Returns:
+            The guest's routing context
+        """
+        with self._lock:
+            entry = self._entries.get(guest.guest_id)
+            if entry is not None and entry[0] == guest.profile_version:
+                return entry[1]
+        context = routing_context_for(guest)
+        with self._lock:
+            self.computed += 1
+            self._entries[guest.guest_id] = (guest.profile_version, context)
+            self._entries.move_to_end(guest.guest_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return context
+
+    def invalidate(self, guest_id: str) -> None:
+        """Forget a guest's fingerprint so the next lookup reloads the profile."""
+        with self._lock:
+            self._entries.pop(guest_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of stored and computed fingerprints."""
+        return {"entries": len(self._entries), "computed": self.computed}
@@ -0,0 +1,261 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Routing feedback log and online retuning of the local routing stages."""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from .keyword_matcher import KeywordRouteMatcher, default_keyword_weight
+from .park_routes_config import ROUTE_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+# Keyword weight of the classifier stage before any feedback
+CLASSIFIER_KEYWORD_WEIGHT = 2.0
+
+
+class RoutingFeedbackLog:
+    """Append-only JSONL log of routing outcomes."""
+
+    def __init__(self, path: str):
+        """
+        Open a feedback log.
+
+        Args:
+            path: JSONL file the outcomes are appended to
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(
+        self,
+        guest_query: str,
+        predicted_route: str,
+        final_route: str,
+        stage: str = None
+    ) -> None:
+        """
+        Record how a routed query was finally handled.
+
+        Args:
+            guest_query: The guest's question or request
+            predicted_route: Route selected by the router
+            final_route: Route of the specialist that finally handled the query
+            stage: Cascade stage that made the prediction
+        """
+        record = {
+            "timestamp": time.time(),
+            "query": guest_query,
+            "predicted_route": predicted_route,
+            "final_route": final_route,
+            "stage": stage,
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def read(self, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Read the complete records written after a byte offset.
+
+        Args:
+            offset: Byte offset returned by a previous read
+
+        Returns:
+            The new records and the offset to continue from; a partially
+            written last line is left for the next read
+        """
+        if not os.path.exists(self.path):
+            return [], offset
+        records = []
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Skipping malformed feedback record in {self.path}")
+        return records, offset
+
+
+class KeywordOutcomeCounts:
+    """Per route and keyword counts of how often a match ended at that route."""
+
+    def __init__(self, route_keywords: Dict[str, List[str]] = None):
+        """
+        Initialize empty counts.
+
+        Args:
+            route_keywords: Route keywords being tuned, defaults to ROUTE_KEYWORDS
+        """
+        self.route_keywords = route_keywords or ROUTE_KEYWORDS
+        self.matcher = KeywordRouteMatcher(route_keywords=self.route_keywords)
+        self.records = 0
+        self.seen: Dict[Tuple[str, str], int] = {}
+        self.correct: Dict[Tuple[str, str], int] = {}
+
+    def add(self, records: List[Dict[str, Any]]) -> None:
+        """Count the keyword matches of feedback records against their final routes."""
+        for record in records:
+            self.records += 1
+            matched = self.matcher.score(record["query"])["matched_keywords"]
+            for route_name, keywords in matched.items():
+                for keyword in set(keywords):
+                    key = (route_name, keyword)
+                    self.seen[key] = self.seen.get(key, 0) + 1
+                    if record["final_route"] == route_name:
+                        self.correct[key] = self.correct.get(key, 0) + 1
+
+    def weight_factors(
+        self,
+        smoothing: float = 2.0,
+        min_factor: float = 0.1,
+        max_factor: float = 2.0
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Turn the counts into per route keyword weight factors.
+
+        A keyword's factor is twice the smoothed share of its matches that
+        ended at its route, so an even record keeps the default weight, a
+        keyword that always led to the right specialist doubles and a
+        misleading one shrinks towards min_factor.
+
+        Args:
+            smoothing: Pseudo-observations pulling the share towards one half
+            min_factor: Lowest factor, so no keyword is switched off entirely
+            max_factor: Highest factor
+
+        Returns:
+            Factor per route and keyword; keywords without feedback are omitted
+        """
+        factors: Dict[str, Dict[str, float]] = {}
+        for (route_name, keyword), seen in self.seen.items():
+            share = (self.correct.get((route_name, keyword), 0) + smoothing / 2) / (seen + smoothing)
+            factors.setdefault(route_name, {})[keyword] = round(
+                min(max_factor, max(min_factor, 2 * share)), 4
+            )
+        return factors
+
+
+def keyword_weights(factors: Dict[str, Dict[str, float]], base_weight: float = None) -> Dict[str, Dict[str, float]]:
+    """
+    Scale per route keyword factors into stage keyword weights.
+
+    Args:
+        factors: Output of KeywordOutcomeCounts.weight_factors()
+        base_weight: Default weight of the stage; None uses the keyword
+            matcher default, default_keyword_weight()
+
+    Returns:
+        Keyword weights per route
+    """
+    return {
+        route_name: {
+            keyword: factor * (base_weight if base_weight is not None else default_keyword_weight(keyword))
+            for keyword, factor in route_factors.items()
+        }
+        for route_name, route_factors in factors.items()
+    }
+
+
+class FeedbackRetuner:
+    """
+    Background job that retunes a router's keyword and classifier stages.
+
+    New feedback records are read incrementally; once enough records have
+    been seen the keyword weights are recomputed, new stage objects are built
+    off to the side and swapped into the router in one step, so in-flight
+    queries keep using the objects they started with.
+    """
+
+    def __init__(
+        self,
+        router: Any,
+        feedback_log: RoutingFeedbackLog,
+        interval_seconds: float = 300.0,
+        min_records: int = 50,
+        smoothing: float = 2.0
+    ):
+        """
+        Create the retuner.
+
+        Args:
+            router: GuestQueryRouter whose local stages are retuned
+            feedback_log: Log the outcomes are read from
+            interval_seconds: Seconds between retuning runs
+            min_records: Records needed before the first retune
+            smoothing: Pseudo-observations used when computing weights
+        """
+        self.router = router
+        self.feedback_log = feedback_log
+        self.interval_seconds = interval_seconds
+        self.min_records = min_records
+        self.smoothing = smoothing
+        self.counts = KeywordOutcomeCounts(router.keyword_matcher.route_keywords)
+        self.retunes = 0
+        self._offset = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def retune_once(self) -> bool:
+        """
+        Read new feedback and swap in retuned stages.
+
+        Returns:
+            True when the router stages were replaced
+        """
+        records, self._offset = self.feedback_log.read(self._offset)
+        self.counts.add(records)
+        if not records or self.counts.records < self.min_records:
+            return False
+
+        factors = self.counts.weight_factors(self.smoothing)
+        self.router.retune_local_stages(
+            keyword_weights(factors),
+            keyword_weights(factors, CLASSIFIER_KEYWORD_WEIGHT)
+        )
+        self.retunes += 1
+        logger.info(f"Retuned keyword weights from {self.counts.records} feedback records")
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.retune_once()
+            except Exception as e:
+                logger.error(f"Routing feedback retune failed: {e}")
+
+    def start(self) -> None:
+        """Start retuning periodically in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="routing-feedback-retuner", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
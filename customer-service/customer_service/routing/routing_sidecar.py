@@ -0,0 +1,531 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Out-of-process routing sidecar.
+
+One sidecar process holds the compiled keyword automaton and classifier and
+serves them to every conversation worker over a Unix domain socket:
+
+    python -m customer_service.routing.routing_sidecar --socket /tmp/thrillzone-router.sock
+
+Protocol, all integers big-endian:
+- on connect the server sends a 4-byte length and a JSON handshake with the
+  routes version, route names and stage names
+- request: request id (u32), query length (u32), UTF-8 query
+- response: request id (u32), route index (u8, 255 when undecided), stage
+  index (u8), confidence (f32), reason length (u16), UTF-8 reason
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import weakref
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from .routing_cache import routes_version
+from .routing_cascade import RoutingCascade
+
+logger = logging.getLogger(__name__)
+
+# Cascade stages served by the sidecar; the emergency fast lane and the
+# caches stay in each worker
+SIDECAR_STAGES = ("keyword", "classifier")
+
+UNDECIDED = 255
+MAX_QUERY_BYTES = 16384
+
+_HANDSHAKE = struct.Struct("!I")
+_REQUEST = struct.Struct("!II")
+_RESPONSE = struct.Struct("!IBBfH")
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """Read exactly size bytes from a blocking socket."""
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("Routing sidecar closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class RoutingSidecarServer:
+    """
+    Serves the local routing stages to many workers with micro-batching.
+
+    Requests from all connections go into one queue. A batch is closed when
+    it reaches max_batch queries or max_wait_ms after its first query, and is
+    classified with one vectorized cascade pass.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        router: Any = None,
+        max_batch: int = 64,
+        max_wait_ms: float = 2.0
+    ):
+        """
+        Create the server.
+
+        Args:
+            socket_path: Unix domain socket path to listen on
+            router: GuestQueryRouter whose local stages are served; a
+                local-mode router is built by default
+            max_batch: Maximum queries classified together
+            max_wait_ms: Longest a query waits for its batch to fill
+        """
+        if router is None:
+            from .guest_query_router import GuestQueryRouter
+            router = GuestQueryRouter(use_sidecar=False)
+        self.socket_path = socket_path
+        self.cascade = RoutingCascade(
+            [stage for stage in router.cascade.stages if stage.name in SIDECAR_STAGES]
+        )
+        self.routes = list(router.get_available_routes())
+        self.stage_names = [stage.name for stage in self.cascade.stages]
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.queries = 0
+        self._handshake = json.dumps({
+            "routes_version": routes_version(),
+            "routes": self.routes,
+            "stages": self.stage_names,
+        }).encode()
+        self._pending: Optional[asyncio.Queue] = None
+        self._writers: set = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._batcher: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start listening and batching."""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._pending = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batch_loop())
+        self._server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path)
+        logger.info(f"Routing sidecar listening on {self.socket_path}")
+
+    async def close(self) -> None:
+        """Stop listening, cancel batching and remove the socket."""
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            await asyncio.gather(self._batcher, return_exceptions=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def serve_forever(self) -> None:
+        """Run the server until cancelled."""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer the framed requests of one worker connection; requests may be pipelined."""
+        self._writers.add(writer)
+        writer.write(_HANDSHAKE.pack(len(self._handshake)) + self._handshake)
+        replies = set()
+        try:
+            while True:
+                request_id, length = _REQUEST.unpack(await reader.readexactly(_REQUEST.size))
+                if length > MAX_QUERY_BYTES:
+                    raise ValueError(f"Query of {length} bytes exceeds {MAX_QUERY_BYTES}")
+                query = (await reader.readexactly(length)).decode("utf-8", errors="replace")
+                future = asyncio.get_running_loop().create_future()
+                await self._pending.put((query, future))
+                reply = asyncio.create_task(self._reply(writer, request_id, future))
+                replies.add(reply)
+                reply.add_done_callback(replies.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError as e:
+            logger.warning(f"Dropping routing sidecar connection: {e}")
+        finally:
+            for reply in list(replies):
+                reply.cancel()
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _reply(self, writer: asyncio.StreamWriter, request_id: int, future: asyncio.Future) -> None:
+        """Write the response of one request once its batch is classified."""
+        route_info = await future
+        if route_info is None:
+            writer.write(_RESPONSE.pack(request_id, UNDECIDED, 0, 0.0, 0))
+            return
+        reason = route_info.get("reason", "").encode()[:65535]
+        writer.write(
+            _RESPONSE.pack(
+                request_id,
+                self.routes.index(route_info["route"]),
+                self.stage_names.index(route_info["stage"]),
+                float(route_info.get("confidence", 0.0)),
+                len(reason)
+            ) + reason
+        )
+
+    async def _batch_loop(self) -> None:
+        """Collect queued queries into batches and classify them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._pending.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._pending.get(), remaining))
+                except TimeoutError:
+                    break
+
+            try:
+                results, _ = self.cascade.run_batch([query for query, _ in batch], [None] * len(batch))
+            except Exception as e:
+                logger.error(f"Routing sidecar batch failed: {e}")
+                results = [None] * len(batch)
+            self.batches += 1
+            self.queries += len(batch)
+            for (_, future), route_info in zip(batch, results):
+                if not future.done():
+                    future.set_result(route_info)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batch counts and the average batch size."""
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "avg_batch_size": self.queries / self.batches if self.batches else 0.0,
+        }
+
+
+class _AsyncSidecarConnection:
+    """
+    Asyncio connection to the sidecar that pipelines requests.
+
+    Requests are written as they arrive and a reader task matches responses
+    to their waiting callers by request id, so concurrent coroutines share
+    one connection without waiting for each other's round trips.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        routes: List[str],
+        stages: List[str]
+    ):
+        """
+        Take over an open connection whose handshake has been read.
+
+        Args:
+            reader: Stream reader of the connection
+            writer: Stream writer of the connection
+            routes: Route names from the handshake
+            stages: Stage names from the handshake
+        """
+        self.writer = writer
+        self.routes = routes
+        self.stages = stages
+        self.closed = False
+        self._waiting: Dict[int, asyncio.Future] = {}
+        self._reader_task = asyncio.create_task(self._read_responses(reader))
+
+    async def request(self, request_id: int, data: bytes) -> Tuple[int, int, float, str]:
+        """Send one query and wait for its response fields."""
+        if self.closed:
+            raise ConnectionError("Routing sidecar connection is closed")
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        try:
+            self.writer.write(_REQUEST.pack(request_id, len(data)) + data)
+            await self.writer.drain()
+            return await future
+        finally:
+            self._waiting.pop(request_id, None)
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        """Resolve waiting requests as their responses arrive."""
+        error: Exception = ConnectionError("Routing sidecar closed the connection")
+        try:
+            while True:
+                response_id, route_index, stage_index, confidence, reason_length = _RESPONSE.unpack(
+                    await reader.readexactly(_RESPONSE.size)
+                )
+                reason = (await reader.readexactly(reason_length)).decode("utf-8", errors="replace")
+                future = self._waiting.get(response_id)
+                if future is not None and not future.done():
+                    future.set_result((route_index, stage_index, confidence, reason))
+        except (asyncio.IncompleteReadError, OSError) as e:
+            error = ConnectionError(f"Routing sidecar connection lost: {e}")
+        finally:
+            self.close()
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(error)
+
+    def close(self) -> None:
+        """Close the connection; waiting requests fail with ConnectionError."""
+        if self.closed:
+            return
+        self.closed = True
+        self.writer.close()
+        self._reader_task.cancel()
+
+
+class RoutingSidecarClient:
+    """
+    Worker-side connection to the routing sidecar.
+
+    Used as a cascade stage: predict() returns the sidecar decision or None,
+    and predict_async() does the same without blocking the event loop, over
+    one pipelined connection per loop. On any connection problem the query
+    is answered by the fallback, or left undecided, so routing continues
+    with the worker's remaining stages and the connection is retried on the
+    next query.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        timeout_seconds: float = 0.05,
+        fallback: Callable[[str, Dict[str, Any]], Optional[Dict[str, Any]]] = None
+    ):
+        """
+        Create the client; the connection is opened on first use.
+
+        Args:
+            socket_path: Unix domain socket of the sidecar
+            timeout_seconds: Deadline for one sidecar round trip
+            fallback: Local predict for (query, context) used while the
+                sidecar cannot be reached
+        """
+        self.socket_path = socket_path
+        self.timeout_seconds = timeout_seconds
+        self.fallback = fallback
+        self.failures = 0
+        self._socket: Optional[socket.socket] = None
+        self._routes: List[str] = []
+        self._stages: List[str] = []
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._connections = weakref.WeakKeyDictionary()
+
+    def _connect(self) -> socket.socket:
+        """Open the connection and check the sidecar serves the same routes."""
+        if self._socket is not None:
+            return self._socket
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout_seconds)
+        try:
+            sock.connect(self.socket_path)
+            (length,) = _HANDSHAKE.unpack(_recv_exact(sock, _HANDSHAKE.size))
+            handshake = json.loads(_recv_exact(sock, length))
+            if handshake["routes_version"] != routes_version():
+                raise ConnectionError("Routing sidecar serves a different routes configuration")
+        except BaseException:
+            sock.close()
+            raise
+        self._routes, self._stages = handshake["routes"], handshake["stages"]
+        self._socket = sock
+        return sock
+
+    def close(self) -> None:
+        """Close the blocking connection used by predict()."""
+        with self._lock:
+            self._close()
+
+    async def aclose(self) -> None:
+        """Close the running event loop's connection used by predict_async()."""
+        connecting = self._connections.pop(asyncio.get_running_loop(), None)
+        if connecting is not None and connecting.done() and not connecting.cancelled():
+            if connecting.exception() is None:
+                connecting.result().close()
+
+    def _close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _round_trip(self, guest_query: str) -> Tuple[int, int, float, str]:
+        """Send one query and read its response fields."""
+        sock = self._connect()
+        request_id = next(self._ids) & 0xFFFFFFFF
+        data = guest_query.encode()[:MAX_QUERY_BYTES]
+        sock.sendall(_REQUEST.pack(request_id, len(data)) + data)
+        response_id, route_index, stage_index, confidence, reason_length = _RESPONSE.unpack(
+            _recv_exact(sock, _RESPONSE.size)
+        )
+        reason = _recv_exact(sock, reason_length).decode("utf-8", errors="replace")
+        if response_id != request_id:
+            raise ConnectionError("Routing sidecar response does not match the request")
+        return route_index, stage_index, confidence, reason
+
+    async def _open_async(self) -> _AsyncSidecarConnection:
+        """Open an asyncio connection and check the sidecar serves the same routes."""
+        reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        try:
+            (length,) = _HANDSHAKE.unpack(await reader.readexactly(_HANDSHAKE.size))
+            handshake = json.loads(await reader.readexactly(length))
+            if handshake["routes_version"] != routes_version():
+                raise ConnectionError("Routing sidecar serves a different routes configuration")
+        except BaseException:
+            writer.close()
+            raise
+        return _AsyncSidecarConnection(reader, writer, handshake["routes"], handshake["stages"])
+
+    async def _connect_async(self) -> _AsyncSidecarConnection:
+        """Return the running loop's connection, opening it once for all waiting coroutines."""
+        loop = asyncio.get_running_loop()
+        connecting = self._connections.get(loop)
+        if connecting is not None and connecting.done():
+            if connecting.cancelled() or connecting.exception() is not None or connecting.result().closed:
+                connecting = None
+        if connecting is None:
+            connecting = loop.create_task(self._open_async())
+            self._connections[loop] = connecting
+        return await asyncio.shield(connecting)
+
+    async def predict_async(
+        self,
+        guest_query: str,
+        guest_context: Dict[str, Any] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Classify a query with the sidecar's stages without blocking the event loop.
+
+        Args:
+            guest_query: The guest's question or request
+            guest_context: Unused; the sidecar stages only look at the query
+
+        Returns:
+            Route selection accepted by a sidecar stage, or None
+        """
+        request_id = next(self._ids) & 0xFFFFFFFF
+        data = guest_query.encode()[:MAX_QUERY_BYTES]
+        try:
+            async with asyncio.timeout(self.timeout_seconds):
+                connection = await self._connect_async()
+                route_index, stage_index, confidence, reason = await connection.request(request_id, data)
+        except (OSError, ValueError, KeyError, struct.error, asyncio.IncompleteReadError) as e:
+            # TimeoutError is an OSError; a late response is simply dropped
+            self.failures += 1
+            logger.warning(f"Routing sidecar unavailable: {e!r}")
+            return self._fall_back(guest_query, guest_context)
+        return self._route_info(
+            route_index, stage_index, confidence, reason, connection.routes, connection.stages
+        )
+
+    def predict(self, guest_query: str, guest_context: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """
+        Classify a query with the sidecar's keyword and classifier stages.
+
+        Args:
+            guest_query: The guest's question or request
+            guest_context: Unused; the sidecar stages only look at the query
+
+        Returns:
+            Route selection accepted by a sidecar stage, or None
+        """
+        with self._lock:
+            try:
+                route_index, stage_index, confidence, reason = self._round_trip(guest_query)
+            except (OSError, ValueError, KeyError, struct.error) as e:
+                self._close()
+                self.failures += 1
+                logger.warning(f"Routing sidecar unavailable: {e}")
+                route_index = None
+            else:
+                routes, stages = self._routes, self._stages
+        if route_index is None:
+            return self._fall_back(guest_query, guest_context)
+        return self._route_info(route_index, stage_index, confidence, reason, routes, stages)
+
+    def _fall_back(self, guest_query: str, guest_context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Answer a query the sidecar could not be asked about with the fallback."""
+        if self.fallback is None:
+            return None
+        return self.fallback(guest_query, guest_context)
+
+    @staticmethod
+    def _route_info(
+        route_index: int,
+        stage_index: int,
+        confidence: float,
+        reason: str,
+        routes: List[str],
+        stages: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Build the route selection for a sidecar response, None when undecided."""
+        if route_index == UNDECIDED:
+            return None
+        return {
+            "route": routes[route_index],
+            "reason": reason,
+            "confidence": round(confidence, 2),
+            "sidecar_stage": stages[stage_index],
+        }
+
+
+def main(argv: List[str] = None) -> None:
+    from ..config import Config
+    from .guest_query_router import GuestQueryRouter
+    from .routing_feedback import FeedbackRetuner, RoutingFeedbackLog
+    settings = Config().routing_settings
+    parser = argparse.ArgumentParser(description="ThrillZone routing sidecar")
+    parser.add_argument("--socket", default=settings.sidecar_socket_path or "/tmp/thrillzone-router.sock")
+    parser.add_argument("--max-batch", type=int, default=settings.sidecar_max_batch)
+    parser.add_argument("--max-wait-ms", type=float, default=settings.sidecar_max_wait_ms)
+    args = parser.parse_args(argv)
+
+    router = GuestQueryRouter(use_sidecar=False)
+    retuner = None
+    if settings.feedback_log_path:
+        # Workers retune only their local fallback; the served stages are retuned here
+        retuner = FeedbackRetuner(
+            router,
+            RoutingFeedbackLog(settings.feedback_log_path),
+            interval_seconds=settings.feedback_retune_interval_seconds,
+            min_records=settings.feedback_min_records,
+            smoothing=settings.feedback_smoothing
+        )
+        retuner.start()
+    server = RoutingSidecarServer(args.socket, router, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if retuner is not None:
+            retuner.stop()
+
+
+if __name__ == "__main__":
+    main()
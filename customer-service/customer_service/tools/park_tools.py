@@ -14,19 +14,48 @@
 
 """Amusement park tools for ThrillZone Adventure Park customer service."""
 
+import heapq
+import itertools
 import logging
+import time as _time
 import uuid
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Tuple
+
+import numpy as np
+
+from ..catalog.park_catalog import CatalogSnapshot, dietary_tag, park_catalog
+from ..catalog.wait_time_forecast import horizon_slots, wait_time_forecasts
+from ..catalog.wait_time_store import live_wait_times
+from ..config import Config
+from ..entities.guest import guest_profile_versions
+from ..reservations.dining_inventory import dining_inventory
+from ..reservations.fast_pass_inventory import fast_pass_inventory
 
 logger = logging.getLogger(__name__)
+configs = Config()
+
+# Tools that book, charge, report or dispatch something on the guest's behalf;
+# speculative specialist runs must stop before calling any of them
+SIDE_EFFECT_TOOLS = frozenset([
+    "reserve_fast_pass",
+    "reserve_fast_pass_for_party",
+    "make_dining_reservation",
+    "upgrade_ticket",
+    "apply_promotional_discount",
+    "report_lost_item",
+    "request_accessibility_services",
+    "schedule_character_meet_greet",
+    "request_medical_assistance",
+    "report_safety_incident",
+])
 
 
 # ============= ATTRACTION EXPERT TOOLS =============
 
 def get_ride_wait_times(attraction_name: str = None, park_section: str = None) -> Dict[str, Any]:
     """
-    Get current wait times for attractions.
+    Get live wait times for attractions, with the recent average and trend.
     
     Args:
         attraction_name: Specific attraction name (optional)
@@ -37,23 +66,75 @@ def get_ride_wait_times(attraction_name: str = None, park_section: str = None) -
     """
     logger.info(f"Getting wait times for attraction: {attraction_name}, section: {park_section}")
     
-    # Mock wait times data
-    mock_wait_times = {
-        "Thunder Mountain Express": {"wait_minutes": 45, "status": "open", "fast_pass_available": True},
-        "Splash Safari": {"wait_minutes": 25, "status": "open", "fast_pass_available": True},
-        "Carousel Dreams": {"wait_minutes": 5, "status": "open", "fast_pass_available": False},
-        "Extreme Drop Tower": {"wait_minutes": 60, "status": "open", "fast_pass_available": True},
-        "Family Fun Coaster": {"wait_minutes": 15, "status": "open", "fast_pass_available": False},
-        "Haunted Mansion": {"wait_minutes": 30, "status": "temporary_closure", "fast_pass_available": False}
-    }
-    
+    catalog = park_catalog.current()
+    store = live_wait_times.store_for(catalog)
     if attraction_name:
-        if attraction_name in mock_wait_times:
-            return {"attraction": attraction_name, **mock_wait_times[attraction_name]}
-        else:
+        name = catalog.attraction_name(attraction_name)
+        if name is None:
             return {"error": f"Attraction '{attraction_name}' not found"}
+        return {"attraction": name, **store.current(name)}
+    
+    if park_section:
+        snapshot = store.snapshot(park_section)
+        if snapshot is None:
+            return {"error": f"Park section '{park_section}' not found"}
+        return {"park_section": park_section, **snapshot}
+    
+    return store.snapshot()
+
+
+def forecast_wait_times(attraction_names: List[str] = None, horizon: int = 3) -> Dict[str, Any]:
+    """
+    Forecast wait times for the next hours and find the best time to ride.
+    
+    Args:
+        attraction_names: Attractions to forecast (optional, all attractions when empty)
+        horizon: Number of hours ahead to forecast, up to 12
+    
+    Returns:
+        Dictionary with the forecast and best time per attraction
+    """
+    logger.info(f"Forecasting wait times for {attraction_names} over {horizon} hours")
+    
+    catalog = park_catalog.current()
+    store = live_wait_times.store_for(catalog)
+    forecaster = wait_time_forecasts.forecaster_for(store)
+    now = _time.time()
+    horizon = min(max(horizon, 1), 12)
+    steps = horizon_slots(horizon, configs.wait_time_forecast_slot_minutes)
+    current, predicted, now_slot = forecaster.forecast(steps, now)
+    
+    names = store.attractions
+    not_found = []
+    if attraction_names:
+        names = []
+        for attraction_name in attraction_names:
+            name = catalog.attraction_name(attraction_name)
+            if name is None:
+                not_found.append(attraction_name)
+            else:
+                names.append(name)
+    
+    slot_times = [forecaster.slot_start(now, now_slot, step).strftime("%H:%M") for step in range(1, steps + 1)]
+    _, statuses = store.latest()
+    forecasts = {}
+    for name in names:
+        row = forecaster.row_of(name)
+        waits = np.rint(predicted[row]).astype(int).tolist()
+        best = int(np.argmin(predicted[row]))
+        now_is_best = current[row] <= predicted[row, best]
+        forecasts[name] = {
+            "status": statuses[row],
+            "current_wait_minutes": int(round(current[row])),
+            "forecast": [{"time": slot_time, "wait_minutes": wait} for slot_time, wait in zip(slot_times, waits)],
+            "best_time": "now" if now_is_best else slot_times[best],
+            "best_wait_minutes": int(round(current[row])) if now_is_best else waits[best],
+        }
     
-    return {"wait_times": mock_wait_times, "last_updated": "2024-12-15 14:30:00"}
+    result = {"horizon_hours": horizon, "forecasts": forecasts}
+    if not_found:
+        result["not_found"] = not_found
+    return result
 
 
 def check_height_requirements(guest_age: str, attraction_name: str) -> Dict[str, Any]:
@@ -69,28 +150,20 @@ def check_height_requirements(guest_age: str, attraction_name: str) -> Dict[str,
     """
     logger.info(f"Checking height requirements for {guest_age} on {attraction_name}")
     
-    height_requirements = {
-        "Thunder Mountain Express": {"min_height_inches": 44, "max_age": None, "adult_supervision": "under_7"},
-        "Splash Safari": {"min_height_inches": 40, "max_age": None, "adult_supervision": "under_8"},
-        "Carousel Dreams": {"min_height_inches": None, "max_age": None, "adult_supervision": "under_3"},
-        "Extreme Drop Tower": {"min_height_inches": 52, "max_age": None, "adult_supervision": "never"},
-        "Family Fun Coaster": {"min_height_inches": 36, "max_age": None, "adult_supervision": "under_5"},
-        "Haunted Mansion": {"min_height_inches": None, "max_age": None, "adult_supervision": "under_6"}
-    }
-    
-    if attraction_name not in height_requirements:
+    catalog = park_catalog.current()
+    name = catalog.attraction_name(attraction_name)
+    if name is None:
         return {"error": f"Attraction '{attraction_name}' not found"}
     
-    req = height_requirements[attraction_name]
     return {
-        "attraction": attraction_name,
-        "requirements": req,
+        "attraction": name,
+        "requirements": catalog.height_requirements[name],
         "suitable_for_age": guest_age,
         "recommendation": "Check height at entrance for exact measurement"
     }
 
 
-def reserve_fast_pass(guest_id: str, attraction_name: str, time_slot: str) -> Dict[str, Any]:
+def reserve_fast_pass(guest_id: str, attraction_name: str, time_slot: str, request_key: str = "") -> Dict[str, Any]:
     """
     Reserve a Fast Pass for an attraction.
     
@@ -98,24 +171,61 @@ def reserve_fast_pass(guest_id: str, attraction_name: str, time_slot: str) -> Di
         guest_id: Guest identifier
         attraction_name: Name of the attraction
         time_slot: Preferred time slot (e.g., "14:00-15:00")
+        request_key: Identifier of this request; repeating a request with the
+            same key returns the original reservation (optional)
     
     Returns:
-        Dictionary with reservation confirmation
+        Dictionary with reservation confirmation, or alternative slots when sold out
     """
     logger.info(f"Reserving Fast Pass for guest {guest_id} on {attraction_name} at {time_slot}")
     
-    reservation_id = f"FP{uuid.uuid4().hex[:8].upper()}"
+    result = reserve_fast_pass_for_party([guest_id], attraction_name, time_slot, request_key)
+    if result.get("status") != "confirmed":
+        return result
     
     return {
         "status": "confirmed",
-        "reservation_id": reservation_id,
-        "attraction": attraction_name,
-        "time_slot": time_slot,
+        "reservation_id": result["reservations"][0]["reservation_id"],
+        "attraction": result["attraction"],
+        "time_slot": result["time_slot"],
         "guest_id": guest_id,
-        "instructions": "Present this confirmation at the Fast Pass entrance during your time slot"
+        "remaining": result["remaining"],
+        "instructions": result["instructions"]
     }
 
 
+def reserve_fast_pass_for_party(guest_ids: List[str], attraction_name: str, time_slot: str, request_key: str = "") -> Dict[str, Any]:
+    """
+    Reserve Fast Passes for a whole party in the same time slot, all or nothing.
+    
+    Args:
+        guest_ids: Identifiers of every guest in the party
+        attraction_name: Name of the attraction
+        time_slot: Preferred time slot (e.g., "14:00-15:00")
+        request_key: Identifier of this request; repeating a request with the
+            same key returns the original reservations (optional)
+    
+    Returns:
+        Dictionary with one reservation per guest, or alternative slots when sold out
+    """
+    logger.info(f"Reserving {len(guest_ids)} Fast Passes on {attraction_name} at {time_slot}")
+    
+    catalog = park_catalog.current()
+    name = catalog.attraction_name(attraction_name)
+    if name is None:
+        return {"error": f"Attraction '{attraction_name}' not found"}
+    
+    fast_pass_inventory.sync(catalog)
+    # Without a key, the same party asking for the same slot again is a retry
+    slot = fast_pass_inventory.slot_index(time_slot)
+    slot_label = fast_pass_inventory.slot_label(slot) if slot is not None else time_slot
+    request_key = request_key or f"{','.join(sorted(guest_ids))}:{name}:{slot_label}"
+    result = fast_pass_inventory.reserve(request_key, name, time_slot, guest_ids)
+    if result.get("status") == "confirmed":
+        result = {**result, "instructions": "Present this confirmation at the Fast Pass entrance during your time slot"}
+    return result
+
+
 def get_attraction_recommendations(guest_preferences: Dict[str, Any], party_composition: Dict[str, Any]) -> Dict[str, Any]:
     """
     Get personalized attraction recommendations based on guest preferences.
@@ -129,29 +239,26 @@ def get_attraction_recommendations(guest_preferences: Dict[str, Any], party_comp
     """
     logger.info(f"Getting recommendations for preferences: {guest_preferences}")
     
-    all_attractions = {
-        "Thunder Mountain Express": {"thrill_level": "moderate", "type": "roller_coaster", "family_friendly": True},
-        "Splash Safari": {"thrill_level": "mild", "type": "water_ride", "family_friendly": True},
-        "Carousel Dreams": {"thrill_level": "mild", "type": "classic_ride", "family_friendly": True},
-        "Extreme Drop Tower": {"thrill_level": "extreme", "type": "thrill_ride", "family_friendly": False},
-        "Family Fun Coaster": {"thrill_level": "mild", "type": "roller_coaster", "family_friendly": True},
-        "Haunted Mansion": {"thrill_level": "moderate", "type": "dark_ride", "family_friendly": True}
-    }
-    
+    catalog = park_catalog.current()
     thrill_level = guest_preferences.get("thrill_level", "moderate")
-    recommendations = []
-    
-    for attraction, details in all_attractions.items():
-        if details["thrill_level"] == thrill_level or (thrill_level == "moderate" and details["thrill_level"] == "mild"):
-            recommendations.append({
-                "attraction": attraction,
-                "match_reason": f"Matches {thrill_level} thrill preference",
-                "details": details
-            })
-    
+    matching_levels = (thrill_level, "mild") if thrill_level == "moderate" else (thrill_level,)
+    matches = heapq.merge(
+        *(catalog.attractions_by_thrill.get(level, ()) for level in matching_levels),
+        key=catalog.attraction_rank.__getitem__
+    )
+    names = list(matches)
+    
+    recommendations = [
+        {
+            "attraction": name,
+            "match_reason": f"Matches {thrill_level} thrill preference",
+            "details": catalog.attraction_details[name]
+        }
+        for name in names[:5]  # Top 5
+    ]
     return {
-        "recommendations": recommendations[:5],  # Top 5
-        "total_matches": len(recommendations)
+        "recommendations": recommendations,
+        "total_matches": len(names)
     }
 
 
@@ -171,30 +278,32 @@ def check_restaurant_availability(restaurant_name: str, party_size: int, preferr
     """
     logger.info(f"Checking availability for {restaurant_name}, party of {party_size} at {preferred_time}")
     
-    restaurants = {
-        "Adventurer's Grill": {"cuisine": "american", "capacity": 200, "reservations": True},
-        "Sweet Treats Cafe": {"cuisine": "desserts", "capacity": 50, "reservations": False},
-        "Pizza Planet": {"cuisine": "italian", "capacity": 100, "reservations": True},
-        "Tropical Tiki Bar": {"cuisine": "hawaiian", "capacity": 80, "reservations": True},
-        "Character Dining Hall": {"cuisine": "buffet", "capacity": 150, "reservations": True}
-    }
-    
-    if restaurant_name not in restaurants:
+    catalog = park_catalog.current()
+    name = catalog.restaurant_name(restaurant_name)
+    if name is None:
         return {"error": f"Restaurant '{restaurant_name}' not found"}
     
-    # Mock availability
-    available_times = ["11:30", "12:00", "12:30", "13:00", "13:30", "17:30", "18:00", "18:30"]
+    dining_inventory.sync(catalog)
+    available_times = dining_inventory.available_times(
+        name, party_size, preferred_time, configs.reservation_settings.dining_times_offered
+    )
+    if available_times is None:
+        return {"error": f"No seating is set up for '{name}'"}
     
-    return {
-        "restaurant": restaurant_name,
+    restaurant_info = catalog.restaurant_info[name]
+    result = {
+        "restaurant": name,
         "party_size": party_size,
         "available_times": available_times,
-        "restaurant_info": restaurants[restaurant_name],
-        "booking_required": restaurants[restaurant_name]["reservations"]
+        "restaurant_info": restaurant_info,
+        "booking_required": restaurant_info["reservations"]
     }
+    if not available_times:
+        result["message"] = f"No seating times remain for a party of {party_size} from {preferred_time}"
+    return result
 
 
-def make_dining_reservation(guest_id: str, restaurant: str, time: str, party_size: int, special_requests: str = "") -> Dict[str, Any]:
+def make_dining_reservation(guest_id: str, restaurant: str, time: str, party_size: int, special_requests: str = "", request_key: str = "") -> Dict[str, Any]:
     """
     Make a dining reservation for a guest.
     
@@ -204,21 +313,29 @@ def make_dining_reservation(guest_id: str, restaurant: str, time: str, party_siz
         time: Reservation time
         party_size: Number of people
         special_requests: Special dietary needs or requests
+        request_key: Identifier of this request; repeating a request with the
+            same key returns the original reservation (optional)
     
     Returns:
-        Dictionary with reservation confirmation
+        Dictionary with reservation confirmation, or alternative times when the time is taken
     """
     logger.info(f"Making reservation for guest {guest_id} at {restaurant} for {party_size} people")
     
-    reservation_id = f"RES{uuid.uuid4().hex[:8].upper()}"
+    catalog = park_catalog.current()
+    name = catalog.restaurant_name(restaurant)
+    if name is None:
+        return {"error": f"Restaurant '{restaurant}' not found"}
+    
+    dining_inventory.sync(catalog)
+    # Without a key, the same guest asking for the same table again is a retry
+    request_key = request_key or f"{guest_id}:{name}:{time}:{party_size}"
+    result = dining_inventory.reserve(request_key, name, party_size, time)
+    if result.get("status") != "confirmed":
+        return result
     
     return {
-        "status": "confirmed",
-        "reservation_id": reservation_id,
-        "restaurant": restaurant,
+        **result,
         "date": "2024-12-15",
-        "time": time,
-        "party_size": party_size,
         "special_requests": special_requests,
         "confirmation_sent": True
     }
@@ -237,30 +354,27 @@ def get_menu_recommendations(dietary_restrictions: List[str], cuisine_preference
     """
     logger.info(f"Getting menu recommendations for restrictions: {dietary_restrictions}")
     
-    menu_items = {
-        "Adventurer's Grill": {
-            "vegetarian": ["Garden Veggie Burger", "Quinoa Power Bowl", "Margherita Flatbread"],
-            "gluten_free": ["Grilled Salmon", "Caesar Salad (no croutons)", "Rice Bowl"],
-            "vegan": ["Buddha Bowl", "Veggie Wrap", "Fruit Smoothie"]
-        },
-        "Pizza Planet": {
-            "vegetarian": ["Veggie Supreme Pizza", "Caprese Salad", "Garlic Bread"],
-            "gluten_free": ["Gluten-Free Margherita Pizza", "Italian Salad"],
-            "vegan": ["Vegan Cheese Pizza", "Mediterranean Salad"]
-        }
-    }
+    catalog = park_catalog.current()
+    # Each tag index is ordered by restaurant, so merging yields the items of
+    # each restaurant grouped by restriction and stops after the first 10
+    matches = heapq.merge(
+        *(
+            _tagged_menu_items(catalog, position, restriction)
+            for position, restriction in enumerate(dietary_restrictions)
+        )
+    )
+    recommendations = [
+        {"restaurant": restaurant, "item": item, "dietary_info": restriction}
+        for _, _, _, restaurant, item, restriction in itertools.islice(matches, 10)
+    ]
     
-    recommendations = []
-    for restaurant, items in menu_items.items():
-        for restriction in dietary_restrictions:
-            restriction_key = restriction.replace("-", "_").lower()
-            if restriction_key in items:
-                recommendations.extend([
-                    {"restaurant": restaurant, "item": item, "dietary_info": restriction}
-                    for item in items[restriction_key]
-                ])
-    
-    return {"recommendations": recommendations[:10]}
+    return {"recommendations": recommendations}
+
+
+def _tagged_menu_items(catalog: CatalogSnapshot, position: int, restriction: str) -> Iterator[Tuple]:
+    """Yield the catalog items of a restriction as merge keys ordered by restaurant."""
+    for restaurant_rank, item_rank, restaurant, item in catalog.menu_by_tag.get(dietary_tag(restriction), ()):
+        yield restaurant_rank, position, item_rank, restaurant, item, restriction
 
 
 # ============= TICKET MANAGER TOOLS =============
@@ -279,13 +393,7 @@ def upgrade_ticket(guest_id: str, current_ticket: str, target_ticket: str) -> Di
     """
     logger.info(f"Upgrading ticket for guest {guest_id} from {current_ticket} to {target_ticket}")
     
-    ticket_prices = {
-        "Day Pass": 89.99,
-        "VIP Pass": 149.99,
-        "Season Pass": 299.99,
-        "Family Package": 319.99
-    }
-    
+    ticket_prices = park_catalog.current().ticket_prices
     if current_ticket not in ticket_prices or target_ticket not in ticket_prices:
         return {"error": "Invalid ticket type"}
     
@@ -312,12 +420,7 @@ def apply_promotional_discount(promo_code: str, guest_id: str) -> Dict[str, Any]
     """
     logger.info(f"Applying promo code {promo_code} for guest {guest_id}")
     
-    valid_codes = {
-        "BIRTHDAY20": {"discount_percent": 20, "description": "Birthday Special"},
-        "FAMILY15": {"discount_percent": 15, "description": "Family Fun Discount"},
-        "SEASON10": {"discount_percent": 10, "description": "Season Pass Holder Discount"}
-    }
-    
+    valid_codes = park_catalog.current().promo_codes
     if promo_code not in valid_codes:
         return {"status": "invalid", "message": "Promotional code not found"}
     
@@ -373,6 +476,8 @@ def request_accessibility_services(guest_id: str, service_type: str, location: s
     logger.info(f"Accessibility service requested: {service_type} at {location}")
     
     service_id = f"ACC{uuid.uuid4().hex[:8].upper()}"
+    # The request records an accessibility need, a routing context field
+    guest_profile_versions.bump(guest_id)
     
     return {
         "service_id": service_id,
@@ -398,18 +503,12 @@ def get_show_schedule(date: str, show_type: str = None) -> Dict[str, Any]:
     """
     logger.info(f"Getting show schedule for {date}, type: {show_type}")
     
-    shows = {
-        "Magical Parade": {"times": ["11:00", "15:00"], "location": "Main Street", "duration": "30 min"},
-        "Fireworks Spectacular": {"times": ["20:00"], "location": "Central Plaza", "duration": "20 min"},
-        "Character Meet & Greet": {"times": ["10:00", "12:00", "14:00", "16:00"], "location": "Fantasy Forest", "duration": "15 min"},
-        "Acrobatic Show": {"times": ["13:00", "17:00"], "location": "Adventure Theater", "duration": "45 min"}
-    }
-    
+    catalog = park_catalog.current()
     if show_type:
-        filtered_shows = {k: v for k, v in shows.items() if show_type.lower() in k.lower()}
+        filtered_shows = {name: catalog.shows[name] for name in catalog.shows_matching(show_type)}
         return {"date": date, "shows": filtered_shows}
     
-    return {"date": date, "shows": shows}
+    return {"date": date, "shows": catalog.shows}
 
 
 def schedule_character_meet_greet(guest_id: str, character: str, preferred_time: str) -> Dict[str, Any]:
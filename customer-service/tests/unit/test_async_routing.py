@@ -0,0 +1,130 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+
+import pytest
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from customer_service.dispatch.specialist_dispatcher import SpecialistResponse
+from customer_service.main_agent import ThrillZoneParkService
+from customer_service.routing.guest_query_router import GuestQueryRouter
+from customer_service.routing.park_routes_config import DEFAULT_ROUTE
+
+
+class FakeRouterLlm(BaseLlm):
+    """Router model that answers every query with ticket_manager after an optional delay."""
+
+    delay: float = 0.0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        await asyncio.sleep(self.delay)
+        selection = {"route": "ticket_manager", "reason": "test", "confidence": 0.9}
+        yield LlmResponse(content=types.Content(
+            role="model", parts=[types.Part(text=json.dumps(selection))]
+        ))
+
+
+@pytest.fixture
+def router():
+    return GuestQueryRouter()
+
+
+def router_sessions(router):
+    sessions = router._session_service.sessions
+    return sum(len(by_id) for by_user in sessions.values() for by_id in by_user.values())
+
+
+@pytest.mark.asyncio
+async def test_route_query_async_uses_model(router, mocker):
+    mocker.patch.object(
+        router, "_call_router_model_async", return_value="ticket manager"
+    )
+    result = await router.route_query_async("something unusual")
+    assert result["route"] == "ticket_manager"
+
+
+@pytest.mark.asyncio
+async def test_router_model_sessions_are_deleted(router):
+    router.router_agent.model = FakeRouterLlm(model="fake-router")
+    for i in range(3):
+        result = await router.route_query_async(f"something unusual {i}")
+        assert result["route"] == "ticket_manager"
+    assert router_sessions(router) == 0
+
+    router.router_agent.model = FakeRouterLlm(model="fake-router", delay=1.0)
+    result = await router.route_query_async("xyzzy plugh", timeout=0.05)
+    assert "deadline" in result["error"]
+    assert router_sessions(router) == 0
+
+
+@pytest.mark.asyncio
+async def test_route_query_async_deadline(router, mocker):
+    async def slow_model(prompt):
+        await asyncio.sleep(1)
+        return "ticket manager"
+
+    mocker.patch.object(router, "_call_router_model_async", side_effect=slow_model)
+    result = await router.route_query_async("something unusual", timeout=0.01)
+    assert result["route"] == DEFAULT_ROUTE
+    assert "deadline" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_route_query_async_bounds_in_flight_calls(router, mocker):
+    mocker.patch(
+        "customer_service.routing.guest_query_router.configs.routing_settings.max_concurrent_model_calls",
+        2,
+    )
+    in_flight, peak = 0, 0
+
+    async def fake_model(prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return "guest services"
+
+    mocker.patch.object(router, "_call_router_model_async", side_effect=fake_model)
+    await asyncio.gather(*(router.route_query_async(f"vague {i}") for i in range(8)))
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_route_query_async_cancellation(router, mocker):
+    async def hanging_model(prompt):
+        await asyncio.sleep(10)
+
+    mocker.patch.object(router, "_call_router_model_async", side_effect=hanging_model)
+    task = asyncio.create_task(router.route_query_async("something unusual"))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_handle_guest_query_async(mocker):
+    service = ThrillZoneParkService()
+
+    async def fake_specialist(route, guest_query, guest_id, usage=None):
+        return SpecialistResponse(route, f"answer from {route}", 1.0)
+
+    mocker.patch.object(service.dispatcher, "run_async", side_effect=fake_specialist)
+    result = await service.handle_guest_query_async("When is the fireworks show?")
+    assert result == "answer from entertainment_coordinator"
@@ -0,0 +1,109 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import typing
+
+import pytest
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from customer_service.routing.guest_query_router import GuestQueryRouter
+from customer_service.routing.park_routes_config import DEFAULT_ROUTE
+from customer_service.routing.routing_cascade import MODEL_STAGE
+
+
+class SchemaConstrainedLlm(BaseLlm):
+    """Router model that, like constrained decoding, only answers in the requested schema shape."""
+
+    schema_shapes: list = []
+
+    async def generate_content_async(self, llm_request, stream=False):
+        schema = llm_request.config.response_schema
+        is_array = typing.get_origin(schema) is list or getattr(schema, "type", None) == types.Type.ARRAY
+        self.schema_shapes.append("array" if is_array else "object")
+        entries = [
+            json.loads(line)
+            for line in llm_request.contents[-1].parts[0].text.splitlines()
+            if line.startswith("{")
+        ]
+        selections = [
+            {
+                "index": entry.get("index", 0),
+                "route": "ticket_manager" if "plans" in entry["query"] else "guest_services",
+                "reason": "test",
+                "confidence": 0.8,
+            }
+            for entry in entries
+        ]
+        answer = selections if is_array else selections[0]
+        yield LlmResponse(content=types.Content(
+            role="model", parts=[types.Part(text=json.dumps(answer))]
+        ))
+
+
+@pytest.fixture
+def router():
+    return GuestQueryRouter()
+
+
+def test_route_queries_keeps_order_and_batches_model_calls(router, mocker):
+    response = json.dumps([
+        {"index": 1, "route": "ticket_manager", "reason": "annual plans", "confidence": 0.8},
+        {"index": 0, "route": "guest_services", "reason": "general", "confidence": 0.7},
+    ])
+    call = mocker.patch.object(router, "_call_router_model", return_value=response)
+    results = router.route_queries([
+        "something vague",
+        "wait time for Splash Safari",
+        "tell me about yearly plans",
+    ])
+    assert [r["route"] for r in results] == [
+        "guest_services", "attraction_expert", "ticket_manager"
+    ]
+    assert call.call_count == 1
+
+
+def test_route_queries_isolates_bad_items(router, mocker):
+    response = json.dumps([
+        {"index": 0, "route": "not_a_route", "reason": "?", "confidence": 0.8},
+        {"index": 1, "route": "dining_specialist", "reason": "food", "confidence": 0.9},
+    ])
+    mocker.patch.object(router, "_call_router_model", return_value=response)
+    results = router.route_queries(["one vague thing", "another vague thing", None])
+    assert results[0]["route"] == DEFAULT_ROUTE and "error" in results[0]
+    assert results[1]["route"] == "dining_specialist"
+    assert results[2]["route"] == DEFAULT_ROUTE and "error" in results[2]
+
+
+def test_route_queries_survives_model_failure(router, mocker):
+    mocker.patch.object(router, "_call_router_model", side_effect=RuntimeError("down"))
+    results = router.route_queries(["vague", "dinner reservation please"])
+    assert results[0]["error"] == "down"
+    assert results[1]["route"] == "dining_specialist"
+
+
+def test_route_queries_through_schema_constrained_agents(router):
+    model = SchemaConstrainedLlm(model="fake-router", schema_shapes=[])
+    router.router_agent.model = model
+    router.batch_router_agent.model = model
+    results = router.route_queries(["something vague", "tell me about yearly plans"])
+    assert [r["route"] for r in results] == ["guest_services", "ticket_manager"]
+    assert all(r["stage"] == MODEL_STAGE and "error" not in r for r in results)
+    assert model.schema_shapes == ["array"]
+
+    result = router.route_query("another vague request")
+    assert result["route"] == "guest_services" and "error" not in result
+    assert model.schema_shapes[-1] == "object"
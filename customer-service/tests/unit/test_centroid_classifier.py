@@ -0,0 +1,97 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+from benchmarks.routing_benchmark import DEFAULT_CORPUS, load_corpus
+from customer_service.config import Config
+from customer_service.routing.centroid_classifier import CentroidRouteClassifier
+from customer_service.routing.guest_query_router import GuestQueryRouter
+
+configs = Config()
+
+LABELLED = [
+    ("how much is a season pass renewal", "ticket_manager"),
+    ("my child is feeling sick and needs medical help", "emergency_responder"),
+    ("can you help me find vegetarian food options", "dining_specialist"),
+    ("meet the characters at the parade", "entertainment_coordinator"),
+    ("where can I find a wheelchair", "guest_services"),
+    ("is the roller coaster open", "attraction_expert"),
+]
+
+
+@pytest.fixture
+def classifier():
+    return CentroidRouteClassifier()
+
+
+def test_predicts_labelled_queries(classifier):
+    for query, route in LABELLED:
+        assert classifier.predict(query)["route"] == route
+
+
+def test_batch_scores_match_single_scores(classifier):
+    queries = [query for query, _ in LABELLED]
+    batch = classifier.score_batch(queries)
+    assert batch.shape == (len(queries), len(classifier.routes))
+    np.testing.assert_allclose(batch[2], classifier.score_batch([queries[2]])[0], rtol=1e-5)
+    probabilities = classifier.predict_proba(queries)
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0, rtol=1e-5)
+
+
+def test_unknown_query_has_no_prediction(classifier):
+    assert classifier.predict("zzzz qqqq") is None
+    assert classifier.classify_batch(["zzzz", "how much is a season pass renewal"])[0] is None
+
+
+def test_calibrate_fits_temperature(classifier):
+    queries, routes = zip(*LABELLED)
+    temperature = classifier.calibrate(queries, routes)
+    assert temperature == classifier.temperature
+    for route_info in classifier.classify_batch(queries):
+        assert route_info is None or 0.0 <= route_info["confidence"] <= 1.0
+
+
+def test_router_falls_back_to_classifier_when_model_fails(mocker):
+    router = GuestQueryRouter(keyword_margin_threshold=100)
+    call = mocker.patch.object(router, "_call_router_model", side_effect=RuntimeError("down"))
+    result = router.route_query("refund for the show")
+    call.assert_called_once()
+    assert result["route"] == "ticket_manager"
+    assert result["error"] == "down"
+
+
+def test_configured_temperature_matches_benchmark_calibration(tmp_path):
+    settings = configs.routing_settings
+    classifier = CentroidRouteClassifier(
+        temperature=settings.classifier_temperature,
+        confidence_threshold=settings.classifier_confidence_threshold
+    )
+    fitted = CentroidRouteClassifier().calibrate_file(DEFAULT_CORPUS)
+    assert abs(fitted - settings.classifier_temperature) / fitted < 0.1
+    assert GuestQueryRouter().classifier.temperature == settings.classifier_temperature
+
+    # Confidences at the gate are about as reliable as the router model
+    corpus = load_corpus(DEFAULT_CORPUS)
+    decided = [
+        (route_info["route"], item["route"])
+        for item, route_info in zip(corpus, classifier.classify_batch([item["query"] for item in corpus]))
+        if route_info is not None
+    ]
+    assert decided
+    assert sum(route == truth for route, truth in decided) / len(decided) >= 0.95
+
+    missing = CentroidRouteClassifier(temperature=0.2)
+    assert missing.calibrate_file(str(tmp_path / "missing.jsonl")) == 0.2
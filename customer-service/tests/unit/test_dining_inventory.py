@@ -0,0 +1,145 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from customer_service.catalog.park_catalog import ParkCatalog, DEFAULT_CATALOG_PATH
+from customer_service.reservations.dining_inventory import DiningInventory, RestaurantTimeline
+from customer_service.tools import park_tools
+
+
+@pytest.fixture
+def inventory():
+    timelines = {
+        "Pizza Planet": RestaurantTimeline("Pizza Planet", {2: 1, 4: 1, 8: 1}, "17:00", "20:00"),
+        "Sweet Treats Cafe": RestaurantTimeline("Sweet Treats Cafe", {2: 2}, "11:00", "15:00"),
+    }
+    return DiningInventory(timelines, {"Pizza Planet": True, "Sweet Treats Cafe": False}, duration_minutes=60)
+
+
+def test_availability_respects_party_size_and_hours(inventory):
+    assert inventory.available_times("Pizza Planet", 2, "17:00", limit=3) == ["17:00", "17:15", "17:30"]
+    # The last seating leaves a full hour before closing
+    assert inventory.available_times("Pizza Planet", 4, "18:50")[-1] == "19:00"
+    assert inventory.available_times("Pizza Planet", 9) == []
+    assert inventory.available_times("Pizza Planet", 2, "dinner", limit=1) == ["17:00"]
+    assert inventory.available_times("Pizza Planet", 2, "16:00", limit=1) == ["17:00"]
+    # No seating starts after the last one, instead of wrapping back to opening
+    assert inventory.available_times("Pizza Planet", 2, "19:45") == []
+    assert inventory.available_times("Pizza Planet", 2, "21:45") == []
+    assert inventory.available_times("Nowhere", 2) is None
+
+
+def test_reservation_blocks_overlapping_times(inventory):
+    first = inventory.reserve("k1", "Pizza Planet", 4, "18:00")
+    assert first["status"] == "confirmed"
+    assert first["table_seats"] == 4
+    assert first["until"] == "19:00"
+
+    # A party of four may not take the eight-top, so 17:15-18:45 starts are gone
+    times = inventory.available_times("Pizza Planet", 4, "17:00", limit=20)
+    assert times == ["17:00", "19:00"]
+    # Couples can still use the two-top and the four-top only outside 18:00-19:00
+    assert "18:00" in inventory.available_times("Pizza Planet", 2, "17:00", limit=20)
+
+    taken = inventory.reserve("k2", "Pizza Planet", 3, "18:30")
+    assert taken["status"] == "unavailable"
+    assert taken["alternative_times"] == ["19:00"]
+
+
+def test_retries_and_cancellation(inventory):
+    first = inventory.reserve("k1", "Pizza Planet", 8, "17:30")
+    assert inventory.reserve("k1", "Pizza Planet", 8, "17:30") is first
+    assert inventory.reserve("k2", "Pizza Planet", 7, "17:30")["status"] == "unavailable"
+    assert inventory.cancel(first["reservation_id"])
+    assert not inventory.cancel(first["reservation_id"])
+    assert inventory.reserve("k2", "Pizza Planet", 7, "17:30")["status"] == "confirmed"
+
+
+def test_invalid_requests(inventory):
+    assert "walk-ins" in inventory.reserve("k", "Sweet Treats Cafe", 2, "12:00")["error"]
+    assert "error" in inventory.reserve("k", "Pizza Planet", 2, "17:10")
+    assert "error" in inventory.reserve("k", "Pizza Planet", 12, "17:00")
+    assert "error" in inventory.reserve("k", "Nowhere", 2, "17:00")
+
+
+def test_concurrent_reservations_never_double_book(inventory):
+    def reserve(i):
+        return inventory.reserve(f"guest-{i}", "Pizza Planet", 2, "18:00")
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(reserve, range(200)))
+    confirmed = [result for result in results if result["status"] == "confirmed"]
+    # The two-top and the four-top; the eight-top leaves too many seats empty
+    assert sorted(result["table_seats"] for result in confirmed) == [2, 4]
+
+
+def test_tools_use_inventory(mocker):
+    inventory = DiningInventory.from_catalog(ParkCatalog(DEFAULT_CATALOG_PATH).current())
+    mocker.patch.object(park_tools, "dining_inventory", inventory)
+
+    availability = park_tools.check_restaurant_availability("pizza planet", 8, "18:00")
+    assert availability["available_times"][0] == "18:00"
+    booking = park_tools.make_dining_reservation("g1", "Pizza Planet", "18:00", 8)
+    assert booking["status"] == "confirmed"
+    assert park_tools.make_dining_reservation("g1", "Pizza Planet", "18:00", 8)["reservation_id"] == booking["reservation_id"]
+    availability = park_tools.check_restaurant_availability("Pizza Planet", 8, "18:00")
+    assert availability["available_times"][0] == "19:30"
+
+
+def test_inventory_follows_catalog_reload(mocker, tmp_path):
+    catalog = ParkCatalog(DEFAULT_CATALOG_PATH)
+    inventory = DiningInventory.from_catalog(catalog.current())
+    mocker.patch.object(park_tools, "park_catalog", catalog)
+    mocker.patch.object(park_tools, "dining_inventory", inventory)
+    kept = park_tools.make_dining_reservation("g1", "Pizza Planet", "18:00", 8)
+
+    with open(DEFAULT_CATALOG_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    pizza = next(restaurant for restaurant in data["restaurants"] if restaurant["name"] == "Pizza Planet")
+    data["restaurants"].append(dict(pizza, name="Moonlight Noodles"))
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    catalog.reload(str(path))
+
+    availability = park_tools.check_restaurant_availability("Moonlight Noodles", 8, "18:00")
+    assert availability["available_times"][0] == "18:00"
+    assert park_tools.make_dining_reservation("g2", "Moonlight Noodles", "18:00", 8)["status"] == "confirmed"
+    # Bookings made before the reload still hold their table
+    assert park_tools.check_restaurant_availability("Pizza Planet", 8, "18:00")["available_times"][0] == "19:30"
+    assert inventory.cancel(kept["reservation_id"])
+
+    late = park_tools.check_restaurant_availability("Pizza Planet", 2, "23:30")
+    assert late["available_times"] == []
+    assert "No seating times remain" in late["message"]
+
+
+def test_availability_across_all_restaurants_is_fast():
+    inventory = DiningInventory.from_catalog(ParkCatalog(DEFAULT_CATALOG_PATH).current())
+    for timeline in inventory.timelines.values():
+        with timeline.lock:
+            for j in range(40):
+                timeline.book(2 + j % 3, (j * 3) % 30, 6)
+
+    started = time.perf_counter()
+    rounds = 200
+    for _ in range(rounds):
+        for name in inventory.timelines:
+            inventory.available_times(name, 4, "18:00")
+    per_round_ms = (time.perf_counter() - started) * 1000 / rounds
+    assert per_round_ms < 1.0
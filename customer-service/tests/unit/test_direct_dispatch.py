@@ -0,0 +1,87 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from customer_service.dispatch.specialist_dispatcher import SpecialistDispatcher
+from customer_service.main_agent import ThrillZoneParkService
+
+
+def model_event(text, partial, tokens=0):
+    return SimpleNamespace(
+        author="attraction_expert",
+        partial=partial,
+        usage_metadata=SimpleNamespace(total_token_count=tokens),
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+        is_final_response=lambda: not partial,
+    )
+
+
+class StreamingRunner:
+    def __init__(self):
+        self.calls = []
+
+    async def run_async(self, user_id, session_id, new_message, run_config=None):
+        self.calls.append((user_id, session_id, new_message.parts[0].text))
+        yield model_event("Space Loop ", partial=True)
+        yield model_event("has a 20 minute wait.", partial=True)
+        yield model_event("Space Loop has a 20 minute wait.", partial=False, tokens=25)
+
+
+@pytest.fixture
+def service(mocker):
+    service = ThrillZoneParkService()
+    runner = StreamingRunner()
+    mocker.patch.object(service.dispatcher, "_get_runner", return_value=runner)
+    mocker.patch.object(service.router, "predict_route_early", return_value=None)
+    mocker.patch.object(
+        service.router, "route_query_async",
+        return_value={"route": "attraction_expert", "reason": "Wait times", "confidence": 0.9}
+    )
+    service.runner = runner
+    return service
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_partial_chunks_once():
+    dispatcher = SpecialistDispatcher()
+    dispatcher._get_runner = lambda route: StreamingRunner()
+    usage = {}
+    chunks = [
+        chunk async for chunk in dispatcher.stream_async("attraction_expert", "wait?", "g1", usage)
+    ]
+    assert chunks == ["Space Loop ", "has a 20 minute wait."]
+    assert usage["text"] == "Space Loop has a 20 minute wait."
+    assert usage["total_tokens"] == 25
+    assert usage["handled_by"] == "attraction_expert"
+
+
+@pytest.mark.asyncio
+async def test_handle_guest_query_async_runs_specialist_directly(service):
+    reply = await service.handle_guest_query_async("How long is the line?", "g1")
+    assert reply == "Space Loop has a 20 minute wait."
+    assert service.runner.calls == [("g1", "g1:attraction_expert", "How long is the line?")]
+
+
+@pytest.mark.asyncio
+async def test_stream_guest_query_async(service):
+    chunks = [chunk async for chunk in service.stream_guest_query_async("How long is the line?", "g1")]
+    assert "".join(chunks) == "Space Loop has a 20 minute wait."
+
+
+def test_handle_guest_query_sync(service):
+    assert service.handle_guest_query("How long is the line?", "g1") == "Space Loop has a 20 minute wait."
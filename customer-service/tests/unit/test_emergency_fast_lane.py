@@ -0,0 +1,98 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from customer_service.dispatch.specialist_dispatcher import SpecialistResponse
+from customer_service.main_agent import ThrillZoneParkService
+from customer_service.routing.emergency_fast_lane import EmergencyFastLane
+from customer_service.routing.guest_query_router import GuestQueryRouter
+
+
+def test_fast_lane_matches_emergencies_only():
+    lane = EmergencyFastLane()
+    assert lane.check("My daughter fainted near the carousel")["route"] == "emergency_responder"
+    assert lane.check("I lost my child by the parade route") is not None
+    assert lane.check("Can you help me find the restroom?") is None
+    assert lane.check("Is Splash Safari closed today?") is None
+    assert lane.stats()["fired"] == 2
+
+
+def test_fast_lane_ignores_ride_and_facility_names():
+    lane = EmergencyFastLane()
+    for query in (
+        "Is Dragon Fire coaster open?",
+        "Is the fire show tonight?",
+        "do you have a first aid station",
+        "Is the Dangerous Drop ride worth the wait?",
+    ):
+        assert lane.check(query) is None, query
+    assert lane.check("There's a fire behind the food court")["route"] == "emergency_responder"
+    assert lane.check("My son needs first aid, he fell") is not None
+    assert lane.stats()["fired"] == 2
+
+
+def test_latency_slo_metric():
+    lane = EmergencyFastLane(slo_ms=100)
+    for elapsed in (10, 20, 30, 250):
+        lane.record_latency(elapsed)
+    stats = lane.stats()
+    assert stats["slo_violations"] == 1
+    assert stats["latency_max_ms"] == 250
+    assert stats["latency_p50_ms"] == 30
+
+
+def test_router_fast_lane_skips_model(mocker):
+    router = GuestQueryRouter()
+    call = mocker.patch.object(router, "_call_router_model")
+    result = router.route_query("Someone is not breathing at the food court")
+    assert result["route"] == "emergency_responder"
+    assert result["stage"] == "emergency_fast_lane"
+    call.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_emergency_jumps_request_queue(mocker):
+    service = ThrillZoneParkService()
+
+    async def fake_specialist(route, guest_query, guest_id, usage=None):
+        return SpecialistResponse(route, f"answer from {route}", 1.0)
+
+    mocker.patch.object(service.dispatcher, "run_async", side_effect=fake_specialist)
+    order = []
+    original = service._handle_guest_query_async
+
+    async def tracking_handle(guest_query, *args, **kwargs):
+        order.append(guest_query)
+        return await original(guest_query, *args, **kwargs)
+
+    service._handle_guest_query_async = tracking_handle
+    fired_before = service.router.emergency_lane.stats()["fired"]
+    routine = [await service.submit_guest_query(f"dinner reservation {i}") for i in range(3)]
+    emergency = await service.submit_guest_query("There is a medical emergency on the coaster")
+
+    worker = asyncio.create_task(service.process_requests())
+    try:
+        response = await emergency
+        await asyncio.gather(*routine)
+    finally:
+        worker.cancel()
+
+    assert order[0] == "There is a medical emergency on the coaster"
+    assert response == "answer from emergency_responder"
+    stats = service.router.emergency_lane.stats()
+    assert stats["latency_max_ms"] > 0
+    assert stats["fired"] == fired_before + 1
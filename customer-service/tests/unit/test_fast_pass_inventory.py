@@ -0,0 +1,135 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from customer_service.catalog.park_catalog import ParkCatalog, DEFAULT_CATALOG_PATH
+from customer_service.catalog.wait_time_store import LiveWaitTimes
+from customer_service.reservations.fast_pass_inventory import FastPassInventory
+from customer_service.tools import park_tools
+
+
+@pytest.fixture
+def inventory():
+    return FastPassInventory(
+        {"Splash Safari": 100, "Extreme Drop Tower": 4},
+        park_open="09:00",
+        park_close="12:00",
+        shards=8
+    )
+
+
+def test_slot_parsing(inventory):
+    assert inventory.slot_index("09:00-10:00") == 0
+    assert inventory.slot_index("10:30") == 1
+    assert inventory.slot_index("12:00") is None
+    assert inventory.slot_index("soon") is None
+    assert inventory.slot_label(2) == "11:00-12:00"
+
+
+def test_flash_crowd_never_oversells(inventory):
+    barrier = threading.Barrier(32)
+
+    def reserve(guest):
+        if guest < 32:
+            barrier.wait()
+        return inventory.reserve(f"request-{guest}", "Splash Safari", "10:00", [f"guest-{guest}"])
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(reserve, range(3000)))
+
+    confirmed = [result for result in results if result["status"] == "confirmed"]
+    assert len(confirmed) == 100
+    assert inventory.remaining("Splash Safari", 1) == 0
+    assert len({result["reservations"][0]["reservation_id"] for result in confirmed}) == 100
+    assert inventory.stats()["sold_out"] == 2900
+    sold_out = next(result for result in results if result["status"] == "sold_out")
+    assert sold_out["alternative_slots"] == ["09:00-10:00", "11:00-12:00"]
+
+
+def test_retries_are_idempotent(inventory):
+    first = inventory.reserve("retry-key", "Splash Safari", "09:00", ["g1"])
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        retries = list(pool.map(
+            lambda _: inventory.reserve("retry-key", "Splash Safari", "09:00", ["g1"]), range(50)
+        ))
+    assert all(retry is first for retry in retries)
+    assert inventory.remaining("Splash Safari", 0) == 99
+    assert inventory.stats()["replayed"] == 50
+
+
+def test_party_reservation_is_all_or_nothing(inventory):
+    party = inventory.reserve("party-1", "Extreme Drop Tower", "11:00", ["a", "b", "c"])
+    assert party["status"] == "confirmed"
+    assert [item["guest_id"] for item in party["reservations"]] == ["a", "b", "c"]
+
+    too_big = inventory.reserve("party-2", "Extreme Drop Tower", "11:00", ["d", "e"])
+    assert too_big["status"] == "sold_out"
+    assert inventory.remaining("Extreme Drop Tower", 2) == 1
+
+    assert inventory.cancel(party["reservations"][0]["reservation_id"])
+    assert not inventory.cancel(party["reservations"][0]["reservation_id"])
+    assert inventory.reserve("party-2", "Extreme Drop Tower", "11:00", ["d", "e"])["status"] == "confirmed"
+
+
+def test_unknown_attraction_and_slot(inventory):
+    assert "error" in inventory.reserve("k1", "Carousel Dreams", "10:00", ["g1"])
+    assert "error" in inventory.reserve("k2", "Splash Safari", "23:00", ["g1"])
+    assert "error" in inventory.reserve("k3", "Splash Safari", "10:00", [])
+
+
+def test_tool_treats_repeated_call_as_retry(mocker, inventory):
+    mocker.patch.object(park_tools, "fast_pass_inventory", inventory)
+    first = park_tools.reserve_fast_pass("g1", "splash safari", "10:00")
+    again = park_tools.reserve_fast_pass("g1", "Splash Safari", "10:00-11:00")
+    assert first["status"] == "confirmed"
+    assert again["reservation_id"] == first["reservation_id"]
+    assert inventory.remaining("Splash Safari", 1) == 99
+
+    party = park_tools.reserve_fast_pass_for_party(["g2", "g3"], "Splash Safari", "10:00")
+    assert len(party["reservations"]) == 2
+    assert park_tools.reserve_fast_pass("g1", "Haunted Mansion", "10:00")["error"]
+
+
+def test_inventory_follows_catalog_reload(mocker, tmp_path):
+    catalog = ParkCatalog(DEFAULT_CATALOG_PATH)
+    inventory = FastPassInventory.from_catalog(catalog.current())
+    mocker.patch.object(park_tools, "park_catalog", catalog)
+    mocker.patch.object(park_tools, "live_wait_times", LiveWaitTimes(catalog))
+    mocker.patch.object(park_tools, "fast_pass_inventory", inventory)
+    kept = park_tools.reserve_fast_pass("g1", "Splash Safari", "10:00")
+
+    with open(DEFAULT_CATALOG_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    new_ride = dict(data["attractions"][0], name="Comet Loop", fast_pass_capacity=2)
+    data["attractions"].append(new_ride)
+    for attraction in data["attractions"]:
+        if attraction["name"] == "Thunder Mountain Express":
+            attraction["fast_pass_available"] = False
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    catalog.reload(str(path))
+
+    assert park_tools.get_ride_wait_times("Comet Loop")["fast_pass_available"]
+    booked = park_tools.reserve_fast_pass_for_party(["g2", "g3"], "Comet Loop", "10:00")
+    assert booked["status"] == "confirmed"
+    assert booked["remaining"] == 0
+    assert "error" in park_tools.reserve_fast_pass("g4", "Thunder Mountain Express", "10:00")
+    # Passes handed out before the reload are untouched
+    assert inventory.remaining("Splash Safari", inventory.slot_index("10:00")) == 119
+    assert inventory.cancel(kept["reservation_id"])
@@ -0,0 +1,77 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from customer_service.routing.guest_query_router import GuestQueryRouter
+from customer_service.routing.keyword_matcher import KeywordRouteMatcher
+
+
+@pytest.fixture
+def matcher():
+    return KeywordRouteMatcher()
+
+
+def test_classify_unambiguous_query(matcher):
+    result = matcher.classify("wait time for Thunder Mountain Express")
+    assert result["route"] == "attraction_expert"
+    assert result["matched_keywords"] == ["wait time"]
+    assert 0.0 <= result["confidence"] <= 1.0
+
+
+def test_longer_phrase_suppresses_nested_keyword(matcher):
+    result = matcher.score("what is the wait time")
+    assert result["scores"]["attraction_expert"] == 2.0
+    assert result["scores"]["entertainment_coordinator"] == 0.0
+
+
+def test_matches_respect_word_boundaries(matcher):
+    result = matcher.score("great override")
+    assert result["matched_keywords"] == {}
+    result = matcher.score("which rides are open")
+    assert "ride" in result["matched_keywords"]["attraction_expert"]
+
+
+def test_classify_returns_none_below_margin(matcher):
+    assert matcher.classify("tell me something") is None
+    assert KeywordRouteMatcher(margin_threshold=5.0).classify("I lost my wallet") is None
+
+
+def test_confidence_grows_with_keyword_evidence(matcher):
+    # A single one-word keyword stays below the default 0.7 cascade gate
+    assert matcher.classify("Is Splash Safari wheelchair accessible to board?")["confidence"] < 0.7
+    assert matcher.classify("Can I get a fast pass for Dragon Coaster?")["confidence"] == 0.95
+    assert matcher.classify("Cancel my dinner reservation")["confidence"] == 0.95
+
+
+def test_generic_keywords_never_decide_alone(matcher):
+    for query in ("is it fun", "how long is the line", "is it open", "what time", "where is first aid?"):
+        assert matcher.classify(query) is None
+    assert matcher.classify("what time is the parade")["route"] == "entertainment_coordinator"
+
+
+def test_custom_keyword_weights():
+    matcher = KeywordRouteMatcher(
+        keyword_weights={"guest_services": {"help": 3.0}}
+    )
+    result = matcher.classify("help")
+    assert result["route"] == "guest_services"
+
+
+def test_router_skips_model_for_keyword_match(mocker):
+    router = GuestQueryRouter()
+    run = mocker.patch.object(router, "_call_router_model")
+    result = router.route_query("Can I make a dinner reservation?")
+    assert result["route"] == "dining_specialist"
+    run.assert_not_called()
@@ -0,0 +1,66 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from customer_service.dispatch.specialist_dispatcher import SpecialistResponse
+from customer_service.main_agent import ThrillZoneParkService
+from customer_service.routing.guest_query_router import GuestQueryRouter
+
+
+@pytest.fixture
+def router(mocker):
+    router = GuestQueryRouter()
+    mocker.patch.object(router, "_call_router_model", return_value="[]")
+    return router
+
+
+def test_route_query_multi_returns_ranked_routes(router):
+    routes = router.route_query_multi("book a dinner reservation at Pizza Planet and what time is the parade?")
+    assert {item["route"] for item in routes} == {"dining_specialist", "entertainment_coordinator"}
+    assert routes[0]["confidence"] >= routes[1]["confidence"]
+    sub_queries = {item["route"]: item["sub_query"] for item in routes}
+    assert sub_queries["dining_specialist"] == "book a dinner reservation at Pizza Planet"
+
+
+def test_route_query_multi_single_intent(router):
+    routes = router.route_query_multi("Pizza Planet and Tiki Bar lunch menus")
+    assert [item["route"] for item in routes] == ["dining_specialist"]
+
+
+def test_route_query_multi_emergency_short_circuits(router):
+    routes = router.route_query_multi("my son is bleeding and where is the parade")
+    assert [item["route"] for item in routes] == ["emergency_responder"]
+
+
+@pytest.mark.asyncio
+async def test_service_fans_out_concurrently(mocker):
+    service = ThrillZoneParkService()
+    mocker.patch.object(service.router, "_call_router_model", return_value="[]")
+
+    async def fake_specialist(route, guest_query, guest_id):
+        await asyncio.sleep(0.05)
+        return SpecialistResponse(route, f"answer from {route}", 50.0)
+
+    mocker.patch.object(service.dispatcher, "run_async", side_effect=fake_specialist)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    reply = await service.handle_multi_intent_query_async(
+        "book a dinner reservation at Pizza Planet and what time is the parade?"
+    )
+    assert loop.time() - started < 0.09
+    assert "answer from dining_specialist" in reply
+    assert "answer from entertainment_coordinator" in reply
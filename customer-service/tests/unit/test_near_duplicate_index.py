@@ -0,0 +1,113 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+
+from customer_service.routing.guest_query_router import GuestQueryRouter
+from customer_service.routing.near_duplicate_index import NearDuplicateRouteIndex
+
+ROUTE = {"route": "attraction_expert", "reason": "Wait times", "confidence": 0.9}
+
+
+def test_paraphrase_hits_and_unrelated_query_misses():
+    index = NearDuplicateRouteIndex()
+    index.put("how long is the line for Splash Safari?", None, ROUTE)
+    match = index.get("How long is the wait for splash safari")
+    assert match["route"] == ROUTE["route"]
+    assert match["similarity"] >= index.threshold
+    assert index.get("how long is the line for Pizza Planet") is None
+    assert index.stats()["hits"] == 1
+
+
+def test_short_paraphrase_hits():
+    index = NearDuplicateRouteIndex()
+    index.put("how long is the line for Splash Safari", None, ROUTE)
+    assert index.get("Splash Safari wait?")["route"] == ROUTE["route"]
+    assert index.get("Splash Safari menu?") is None
+
+
+def test_estimated_similarity_tracks_jaccard():
+    index = NearDuplicateRouteIndex(num_perm=256, bands=64)
+    # Word sets sharing two of five words: Jaccard similarity 0.4
+    first = index.signature("lost wallet sky swing")
+    second = index.signature("wet sky swing")
+    assert abs((first == second).mean() - 0.4) < 0.1
+
+
+def test_context_fields_must_match():
+    index = NearDuplicateRouteIndex()
+    index.put("upgrade my pass options", {"membership_type": "VIP"}, ROUTE)
+    assert index.get("upgrade pass options", {"membership_type": "Day Pass"}) is None
+    assert index.get("upgrade pass options", {"membership_type": "VIP"}) is not None
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    index = NearDuplicateRouteIndex(max_entries=2, ttl_seconds=10)
+    now = [1000.0]
+    monkeypatch.setattr("customer_service.routing.near_duplicate_index.time.time", lambda: now[0])
+    index.put("dragon coaster height limit", None, ROUTE)
+    index.put("pizza planet opening hours", None, ROUTE)
+    index.get("dragon coaster height limit")
+    index.put("lost and found location", None, ROUTE)
+    assert index.get("pizza planet opening hours") is None
+    assert index.get("dragon coaster height limit") is not None
+    now[0] += 11
+    assert index.get("dragon coaster height limit") is None
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "index.json")
+    index = NearDuplicateRouteIndex()
+    index.put("how long is the line for Splash Safari?", {"party_size": 2}, ROUTE)
+    index.save(path)
+
+    restored = NearDuplicateRouteIndex()
+    assert restored.load(path) == 1
+    assert restored.get("how long is the wait for splash safari", {"party_size": 2})["route"] == ROUTE["route"]
+    assert NearDuplicateRouteIndex(seed=2).load(path) == 0
+
+
+def test_router_reuses_decision_for_paraphrase(mocker):
+    router = GuestQueryRouter(near_duplicate_index=NearDuplicateRouteIndex())
+    model = mocker.patch.object(
+        router, "_call_router_model",
+        return_value='{"route": "guest_services", "reason": "Mobility aids", "confidence": 0.8}'
+    )
+    first = router.route_query("can my grandmother bring her scooter inside")
+    second = router.route_query("can my grandmother bring her scooter inside the park?")
+    assert model.call_count == 1
+    assert first["stage"] == "router_model"
+    assert second["stage"] == "near_duplicate"
+    assert second["route"] == "guest_services"
+
+
+def test_router_saves_index_off_the_request_path(mocker, tmp_path):
+    settings = "customer_service.routing.guest_query_router.configs.routing_settings"
+    mocker.patch(f"{settings}.near_duplicate_save_every", 1)
+    mocker.patch(f"{settings}.near_duplicate_index_path", str(tmp_path / "index.json"))
+    router = GuestQueryRouter(near_duplicate_index=NearDuplicateRouteIndex())
+    saved_on = []
+
+    def slow_save(path):
+        time.sleep(0.2)
+        saved_on.append(threading.current_thread().name)
+
+    mocker.patch.object(router.near_duplicate_index, "save", side_effect=slow_save)
+    started = time.perf_counter()
+    router._remember_model_route("can I bring my scooter", None, ROUTE)
+    router._remember_model_route("can I bring my wheelchair", None, ROUTE)
+    assert time.perf_counter() - started < 0.1
+    router._save_thread.join()
+    assert saved_on == ["near-duplicate-index-save"]
@@ -0,0 +1,113 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import pytest
+
+from customer_service.catalog.park_catalog import ParkCatalog, DEFAULT_CATALOG_PATH
+from customer_service.tools import park_tools
+
+
+def write_catalog(path, data):
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+def large_catalog(attractions=300, restaurants=100, items_per_restaurant=30):
+    return {
+        "last_updated": "2025-01-01 09:00:00",
+        "attractions": [
+            {
+                "name": f"Ride {i}",
+                "section": f"Section {i % 12}",
+                "wait_minutes": i % 90,
+                "status": "open",
+                "fast_pass_available": i % 2 == 0,
+                "thrill_level": ("mild", "moderate", "extreme")[i % 3],
+            }
+            for i in range(attractions)
+        ],
+        "restaurants": [{"name": f"Diner {r}", "cuisine": "american"} for r in range(restaurants)],
+        "menu_items": [
+            {"restaurant": f"Diner {r}", "item": f"Dish {r}-{i}", "dietary_tags": ["vegan"] if i % 3 == 0 else ["vegetarian"]}
+            for r in range(restaurants)
+            for i in range(items_per_restaurant)
+        ],
+    }
+
+
+@pytest.fixture
+def catalog(mocker, tmp_path):
+    catalog = ParkCatalog(write_catalog(tmp_path / "catalog.json", large_catalog()))
+    mocker.patch.object(park_tools, "park_catalog", catalog)
+    return catalog
+
+
+def test_packaged_catalog_indexes():
+    snapshot = ParkCatalog(DEFAULT_CATALOG_PATH).current()
+    assert snapshot.attraction_name("splash  SAFARI") == "Splash Safari"
+    assert snapshot.attractions_in_section("fantasy forest") == (
+        "Carousel Dreams", "Family Fun Coaster", "Haunted Mansion"
+    )
+    assert "Extreme Drop Tower" in snapshot.attractions_by_thrill["extreme"]
+    assert snapshot.ticket_prices["VIP Pass"] == 149.99
+    assert snapshot.stats()["menu_items"] == 16
+
+
+def test_tools_read_from_catalog(catalog):
+    assert park_tools.get_ride_wait_times("ride 7")["wait_minutes"] == 7
+    section = park_tools.get_ride_wait_times(park_section="Section 3")
+    assert len(section["wait_times"]) == 25
+    assert park_tools.get_ride_wait_times(park_section="Nowhere")["error"]
+
+    recommendations = park_tools.get_attraction_recommendations({"thrill_level": "moderate"}, {})
+    assert recommendations["total_matches"] == 200
+    assert [item["attraction"] for item in recommendations["recommendations"]] == [
+        "Ride 0", "Ride 1", "Ride 3", "Ride 4", "Ride 6"
+    ]
+
+    menu = park_tools.get_menu_recommendations(["Vegan", "vegetarian"])["recommendations"]
+    assert len(menu) == 10
+    assert menu[0] == {"restaurant": "Diner 0", "item": "Dish 0-0", "dietary_info": "Vegan"}
+    assert all(item["restaurant"] == "Diner 0" for item in menu)
+
+
+def test_lookups_do_not_rebuild_reference_data(catalog):
+    first = park_tools.get_ride_wait_times()
+    second = park_tools.get_ride_wait_times()
+    assert first["wait_times"] is second["wait_times"]
+
+
+def test_reload_swaps_snapshot_atomically(catalog, tmp_path):
+    before = catalog.current()
+    updated = large_catalog(attractions=5)
+    updated["attractions"][0]["wait_minutes"] = 75
+    path = write_catalog(tmp_path / "updated.json", updated)
+
+    after = catalog.reload(path)
+    assert after is catalog.current()
+    assert after.version == before.version + 1
+    assert after.wait_times["Ride 0"]["wait_minutes"] == 75
+    assert before.wait_times["Ride 0"]["wait_minutes"] == 0
+    assert len(park_tools.get_ride_wait_times()["wait_times"]) == 5
+
+
+def test_failed_reload_keeps_current_snapshot(catalog, tmp_path):
+    before = catalog.current()
+    broken = large_catalog(attractions=2)
+    broken["attractions"].append(dict(broken["attractions"][0]))
+    with pytest.raises(ValueError):
+        catalog.reload(write_catalog(tmp_path / "broken.json", broken))
+    assert catalog.current() is before
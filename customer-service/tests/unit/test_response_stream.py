@@ -0,0 +1,126 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from customer_service.dispatch.response_stream import StreamEvent, buffered_events, TEXT
+from customer_service.main_agent import ThrillZoneParkService
+
+
+def model_event(parts, partial=False, final=False):
+    return SimpleNamespace(
+        author="attraction_expert",
+        partial=partial,
+        usage_metadata=None,
+        content=types.Content(role="model", parts=parts),
+        is_final_response=lambda: final,
+    )
+
+
+class ToolUsingRunner:
+    def __init__(self):
+        self.finished = False
+
+    async def run_async(self, user_id, session_id, new_message, run_config=None):
+        try:
+            yield model_event([types.Part(function_call=types.FunctionCall(name="get_wait_times", args={}))])
+            yield model_event([types.Part(function_response=types.FunctionResponse(name="get_wait_times", response={}))])
+            yield model_event([types.Part(text="The wait ")], partial=True)
+            yield model_event([types.Part(text="is 20 minutes.")], partial=True)
+            yield model_event([types.Part(text="The wait is 20 minutes.")], final=True)
+        finally:
+            self.finished = True
+
+
+@pytest.fixture
+def service(mocker):
+    service = ThrillZoneParkService()
+    service.runner = ToolUsingRunner()
+    mocker.patch.object(service.dispatcher, "_get_runner", return_value=service.runner)
+    mocker.patch.object(
+        service.router, "route_query_async",
+        return_value={"route": "attraction_expert", "reason": "Wait times", "confidence": 0.9}
+    )
+    return service
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_progress_events(service):
+    events = [event async for event in service.stream_guest_events_async("How long is the line?", "g1")]
+
+    types_seen = [event.type for event in events]
+    assert types_seen[:3] == ["routing_decided", "tool_call_started", "tool_call_finished"]
+    assert set(types_seen[3:-1]) == {"text"}
+    assert types_seen[-1] == "done"
+    assert events[0].data["route"] == "attraction_expert"
+    assert events[1].data["tool"] == "get_wait_times"
+    assert "".join(event.text for event in events if event.type == TEXT) == "The wait is 20 minutes."
+    assert events[-1].data["handled_by"] == "attraction_expert"
+    assert events[-1].data["ttfb_ms"] <= events[-1].data["latency_ms"]
+
+    stats = service.stream_ttfb.stats()
+    assert stats["streams"] == 1
+    assert stats["ttfb_max_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_closing_stream_stops_specialist(service):
+    events = service.stream_guest_events_async("How long is the line?", "g1")
+    assert (await events.__anext__()).type == "routing_decided"
+    assert (await events.__anext__()).type == "tool_call_started"
+    await events.aclose()
+    assert service.runner.finished
+    assert service.stream_ttfb.stats()["without_text"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_error_event(service, mocker):
+    service.router.route_query_async.side_effect = RuntimeError("router down")
+    events = [event async for event in service.stream_guest_events_async("How long is the line?")]
+    assert [event.type for event in events] == ["error"]
+
+
+@pytest.mark.asyncio
+async def test_slow_client_gets_coalesced_text_and_pauses_source():
+    produced = []
+
+    async def source():
+        for i in range(10):
+            produced.append(i)
+            yield StreamEvent(TEXT, str(i))
+        yield StreamEvent("done")
+
+    events = buffered_events(source(), max_buffered=3)
+    first = await events.__anext__()
+    await asyncio.sleep(0.01)
+    assert len(produced) <= len(first.text) + 3 + 1
+
+    rest = [event async for event in events]
+    assert first.text + "".join(event.text for event in rest) == "0123456789"
+    assert len(rest) < 10
+    assert rest[-1].type == "done"
+
+
+@pytest.mark.asyncio
+async def test_buffered_events_reraises_source_errors():
+    async def source():
+        yield StreamEvent(TEXT, "partial")
+        raise ValueError("model failed")
+
+    with pytest.raises(ValueError):
+        [event async for event in buffered_events(source())]
@@ -0,0 +1,61 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import pytest
+
+from customer_service.routing.guest_query_router import GuestQueryRouter
+from customer_service.routing.park_routes_config import DEFAULT_ROUTE
+
+
+@pytest.fixture
+def router():
+    return GuestQueryRouter()
+
+
+def test_parses_schema_json(router):
+    response = json.dumps({
+        "route": "guest_services",
+        "reason": "Guest needs help finding the restroom",
+        "confidence": 0.92,
+    })
+    result = router._parse_route_response(response)
+    assert result["route"] == "guest_services"
+    assert result["confidence"] == 0.92
+    assert result["reason"] == "Guest needs help finding the restroom"
+
+
+def test_parses_fenced_json(router):
+    response = '```json\n{"route": "ticket_manager", "reason": "upgrade", "confidence": 0.9}\n```'
+    assert router._parse_route_response(response)["route"] == "ticket_manager"
+
+
+def test_fallback_extracts_route_from_malformed_output(router):
+    result = router._parse_route_response('{"route": "dining_specialist", "reason": ')
+    assert result["route"] == "dining_specialist"
+    assert result["confidence"] == 0.8
+    assert router._parse_route_response("Send this to the Attraction Expert")["route"] == "attraction_expert"
+
+
+def test_fallback_only_scans_response_head(router):
+    response = "x" * 100_000 + " emergency responder"
+    assert router._parse_route_response(response)["route"] == DEFAULT_ROUTE
+
+
+def test_invalid_schema_values_use_fallback(router):
+    response = json.dumps({"route": "guest_services", "reason": "help", "confidence": 7})
+    result = router._parse_route_response(response)
+    assert result["route"] == "guest_services"
+    assert result["confidence"] == 0.8
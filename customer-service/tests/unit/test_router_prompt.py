@@ -0,0 +1,71 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+from customer_service.routing import park_routes_config
+from customer_service.routing.guest_query_router import GuestQueryRouter
+from customer_service.routing.router_prompt import (
+    batch_routing_message,
+    router_instruction,
+    routing_message
+)
+
+
+def test_instruction_compiled_once_per_routes_version():
+    first = router_instruction()
+    assert router_instruction() is first
+    for route_name in park_routes_config.PARK_AGENT_ROUTES:
+        assert f"**{route_name}**" in first
+    assert "{" not in first
+
+    routes = dict(park_routes_config.PARK_AGENT_ROUTES, valet_service="Parking help")
+    changed = router_instruction(routes)
+    assert changed is not first
+    assert "**valet_service**" in changed
+
+
+def test_message_keeps_only_routing_context_in_stable_order():
+    context = {
+        "party_size": 4,
+        "preferences": {"thrill_level": "high", "favorite_rides": ["Dragon Coaster"]},
+        "membership_type": "VIP",
+    }
+    message = routing_message("Can we upgrade?", context)
+    assert message == '{"context":{"membership_type":"VIP","party_size":4},"query":"Can we upgrade?"}'
+    assert routing_message("Can we upgrade?", dict(reversed(list(context.items())))) == message
+    assert routing_message("Hi", None) == '{"query":"Hi"}'
+
+
+def test_batch_message_lines():
+    message = batch_routing_message([("first", None), ("second", {"party_size": 2})])
+    lines = message.splitlines()
+    assert json.loads(lines[-2]) == {"index": 0, "query": "first"}
+    assert json.loads(lines[-1]) == {"index": 1, "query": "second", "context": {"party_size": 2}}
+
+
+def test_batch_instruction_asks_for_an_indexed_array():
+    single, batch = router_instruction(), router_instruction(batch=True)
+    assert router_instruction(batch=True) is batch
+    assert "valid JSON object matching the RouteSelection schema" in single
+    assert "JSON array" not in single
+    assert "JSON array" in batch and '"index"' in batch
+    assert "valid JSON object" not in batch
+
+
+def test_router_agent_uses_precompiled_instruction():
+    router = GuestQueryRouter()
+    assert router.router_agent.instruction is router_instruction()
+    assert router.batch_router_agent.instruction is router_instruction(batch=True)
+    assert router._build_routing_prompt("hello") == '{"query":"hello"}'
@@ -0,0 +1,42 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+
+from customer_service.routing import park_routes_config
+from customer_service.routing.guest_query_router import RouterRegistry
+
+
+def test_registry_reuses_router_per_model():
+    registry = RouterRegistry()
+    router = registry.get()
+    assert registry.get() is router
+    assert registry.get("gemini-2.0-flash-lite") is not router
+    assert registry.get("gemini-2.0-flash-lite").model == "gemini-2.0-flash-lite"
+
+
+def test_registry_is_shared_across_threads():
+    registry = RouterRegistry()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        routers = list(pool.map(lambda _: registry.get(), range(32)))
+    assert all(router is routers[0] for router in routers)
+
+
+def test_warm_up_and_routes_change(monkeypatch):
+    registry = RouterRegistry()
+    warmed = registry.warm_up()
+    assert registry.get() is warmed[0]
+    routes = dict(park_routes_config.PARK_AGENT_ROUTES, valet_service="Parking help")
+    monkeypatch.setattr("customer_service.routing.routing_cache.PARK_AGENT_ROUTES", routes)
+    assert registry.get() is not warmed[0]
@@ -0,0 +1,78 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+from benchmarks.routing_benchmark import (
+    DEFAULT_CORPUS,
+    FakeRouterModel,
+    benchmark_cascade,
+    benchmark_stages,
+    classification_report,
+    load_corpus,
+    percentiles,
+    run_benchmark
+)
+
+
+def test_classification_report_counts_abstentions_against_recall():
+    report = classification_report(
+        ["dining_specialist", "dining_specialist", "ticket_manager"],
+        ["dining_specialist", None, "dining_specialist"],
+        routes=["dining_specialist", "ticket_manager"]
+    )
+    assert report["coverage"] == round(2 / 3, 4)
+    assert report["per_route"]["dining_specialist"] == {
+        "precision": 0.5, "recall": 0.5, "f1": 0.5, "support": 2
+    }
+    assert report["per_route"]["ticket_manager"]["recall"] == 0.0
+    assert report["confusion_matrix"]["dining_specialist"]["none"] == 1
+
+
+def test_percentiles():
+    stats = percentiles([float(value) for value in range(1, 101)])
+    assert (stats["p50"], stats["p95"], stats["p99"]) == (51.0, 96.0, 100.0)
+
+
+def test_fake_model_is_deterministic():
+    labels = {f"query {i}": "ticket_manager" for i in range(200)}
+    first = FakeRouterModel(labels, accuracy=0.9, latency_ms=0)
+    second = FakeRouterModel(labels, accuracy=0.9, latency_ms=0)
+    answers = [first(json.dumps({"query": query})) for query in labels]
+    assert answers == [second(json.dumps({"query": query})) for query in labels]
+    correct = sum(json.loads(answer)["route"] == "ticket_manager" for answer in answers)
+    assert 160 <= correct < 200
+
+
+def test_run_benchmark_report_shape(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text(
+        '{"query": "What time does the parade start?", "route": "entertainment_coordinator"}\n'
+        '{"query": "Can my grandmother bring her scooter inside?", "route": "guest_services"}\n'
+    )
+    report = run_benchmark(str(corpus), model_latency_ms=0, concurrency_levels=[1, 2])
+    json.dumps(report)
+    assert report["corpus"]["queries"] == 2
+    assert {"keyword", "classifier", "router_model"} <= set(report["stages"])
+    assert report["cascade"]["model_calls"] >= 1
+    assert [run["concurrency"] for run in report["throughput"]] == [1, 2]
+
+
+def test_cascade_is_not_less_accurate_than_the_model():
+    corpus = load_corpus(DEFAULT_CORPUS)
+    labels = {item["query"]: item["route"] for item in corpus}
+    stages = benchmark_stages(corpus, FakeRouterModel(labels, latency_ms=0))
+    cascade = benchmark_cascade(corpus, FakeRouterModel(labels, latency_ms=0))
+    assert stages["keyword"]["precision_when_decided"] >= stages["router_model"]["accuracy"]
+    assert cascade["accuracy"] >= stages["router_model"]["accuracy"]
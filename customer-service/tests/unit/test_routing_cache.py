@@ -0,0 +1,85 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from customer_service.routing import park_routes_config, routing_cache
+from customer_service.routing.guest_query_router import GuestQueryRouter
+from customer_service.routing.routing_cache import RoutingCache, normalize_query
+
+ROUTE = {"route": "entertainment_coordinator", "reason": "test", "confidence": 0.9}
+
+
+def test_normalize_query():
+    assert normalize_query("  When are the FIREWORKS?! ") == "when fireworks"
+    assert normalize_query("when are the fireworks") == normalize_query("When, are the fireworks")
+
+
+def test_hit_and_miss_counters():
+    cache = RoutingCache()
+    assert cache.get("when are the fireworks") is None
+    cache.put("when are the fireworks", None, ROUTE)
+    assert cache.get("When are the fireworks?")["route"] == ROUTE["route"]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_context_fields_are_part_of_key():
+    cache = RoutingCache()
+    cache.put("upgrade options", {"membership_type": "VIP", "party_size": 2}, ROUTE)
+    assert cache.get("upgrade options", {"membership_type": "Day Pass", "party_size": 2}) is None
+    assert cache.get("upgrade options", {"membership_type": "VIP", "party_size": 2}) is not None
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = RoutingCache(max_entries=2, ttl_seconds=10)
+    now = [100.0]
+    monkeypatch.setattr("customer_service.routing.routing_cache.time.monotonic", lambda: now[0])
+    cache.put("first", None, ROUTE)
+    cache.put("second", None, ROUTE)
+    cache.get("first")
+    cache.put("third", None, ROUTE)
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    now[0] += 11
+    assert cache.get("first") is None
+
+
+def test_routes_change_invalidates(monkeypatch):
+    cache = RoutingCache()
+    cache.put("parking info", None, ROUTE)
+    routes = dict(park_routes_config.PARK_AGENT_ROUTES, valet_service="Parking help")
+    monkeypatch.setattr("customer_service.routing.routing_cache.PARK_AGENT_ROUTES", routes)
+    assert cache.get("parking info") is None
+
+
+def test_routes_version_hashed_once_per_change(mocker, monkeypatch):
+    routes = dict(park_routes_config.PARK_AGENT_ROUTES)
+    monkeypatch.setattr("customer_service.routing.routing_cache.PARK_AGENT_ROUTES", routes)
+    hash_routes = mocker.spy(routing_cache, "_hash_routes")
+    first = routing_cache.routes_version()
+    for _ in range(5):
+        assert routing_cache.routes_version() == first
+    assert hash_routes.call_count == 1
+    routes["valet_service"] = "Parking help"
+    assert routing_cache.routes_version() != first
+    assert hash_routes.call_count == 2
+
+
+def test_router_caches_model_decisions(mocker):
+    router = GuestQueryRouter()
+    run = mocker.patch.object(router, "_call_router_model", return_value="ticket manager")
+    first = router.route_query("something unusual")
+    second = router.route_query("Something unusual!")
+    assert first["route"] == second["route"] == "ticket_manager"
+    assert second["cache_hit"] is True
+    assert run.call_count == 1
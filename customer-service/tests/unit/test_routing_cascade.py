@@ -0,0 +1,86 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from customer_service.routing.guest_query_router import GuestQueryRouter
+from customer_service.routing.routing_cascade import CascadeStage, RoutingCascade
+
+
+def fixed(route, confidence):
+    return lambda query, context: {"route": route, "reason": "test", "confidence": confidence}
+
+
+def test_cascade_stops_at_first_confident_stage():
+    cascade = RoutingCascade([
+        CascadeStage("cheap", fixed("guest_services", 0.5), threshold=0.7),
+        CascadeStage("better", fixed("ticket_manager", 0.8), threshold=0.7),
+        CascadeStage("never", fixed("dining_specialist", 1.0)),
+    ])
+    route_info, timings = cascade.run("query")
+    assert route_info["route"] == "ticket_manager"
+    assert route_info["stage"] == "better"
+    assert set(timings) == {"cheap", "better"}
+    stats = cascade.stats()
+    assert stats["cheap"]["decisions"] == 0
+    assert stats["better"]["decisions"] == 1
+    assert "never" not in stats
+
+
+def test_per_route_thresholds():
+    stage = CascadeStage(
+        "classifier", fixed("emergency_responder", 0.45),
+        threshold=0.6, route_thresholds={"emergency_responder": 0.4}
+    )
+    assert stage.accepts(stage.predict("q", None))
+    assert not stage.accepts({"route": "guest_services", "confidence": 0.45})
+
+
+def test_run_batch_uses_vectorized_stage():
+    calls = []
+
+    def predict_batch(queries, contexts):
+        calls.append(list(queries))
+        return [{"route": "guest_services", "confidence": 0.9} if q == "b" else None for q in queries]
+
+    cascade = RoutingCascade([
+        CascadeStage("first", lambda q, c: {"route": "ticket_manager", "confidence": 0.9} if q == "a" else None),
+        CascadeStage("second", None, predict_batch=predict_batch),
+    ])
+    results, timings = cascade.run_batch(["a", "b", "c"], [None] * 3)
+    assert [r and r["stage"] for r in results] == ["first", "second", None]
+    assert calls == [["b", "c"]]
+    assert "second" in timings[2]
+
+
+def test_router_records_deciding_stage(mocker):
+    router = GuestQueryRouter()
+    result = router.route_query("wait time for Thunder Mountain Express")
+    assert result["stage"] == "keyword"
+    mocker.patch.object(router, "_call_router_model", return_value="ticket manager")
+    result = router.route_query("something unusual")
+    assert result["stage"] == "router_model"
+    assert {"keyword", "classifier", "cache", "router_model"} <= set(result["stage_timings_ms"])
+    assert router.route_query("something unusual")["stage"] == "cache"
+    assert router.cascade.stats()["router_model"]["decisions"] == 1
+
+
+def test_emergency_threshold_is_recall_biased(mocker):
+    router = GuestQueryRouter(keyword_margin_threshold=100)
+    call = mocker.patch.object(router, "_call_router_model", return_value="guest services")
+    classified = router.classifier.predict("hazard near the gate")
+    assert classified["route"] == "emergency_responder"
+    assert classified["confidence"] < router.cascade.get_stage("classifier").threshold
+    result = router.route_query("hazard near the gate")
+    assert result["route"] == "emergency_responder"
+    assert result["stage"] == "classifier"
+    call.assert_not_called()
@@ -0,0 +1,105 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from customer_service.entities.guest import AccessibilityNeeds, Guest, guest_profile_versions
+from customer_service.main_agent import ThrillZoneParkService
+from customer_service.routing.router_prompt import routing_message
+from customer_service.routing.routing_cache import RoutingCache
+from customer_service.routing.routing_context import (
+    RoutingContext,
+    RoutingContextStore,
+    routing_context_for
+)
+from customer_service.reservations.dining_inventory import DiningInventory
+from customer_service.reservations.fast_pass_inventory import FastPassInventory
+from customer_service.tools import park_tools
+from customer_service.tools.park_tools import request_accessibility_services
+
+
+def test_fingerprint_summarizes_routing_fields():
+    context = routing_context_for(Guest.get_guest("123"))
+    assert context == RoutingContext(
+        membership_type="Season Pass",
+        party_size=3,
+        accessibility_needs=False,
+        dietary_restrictions=True,
+        special_occasion=True,
+    )
+    assert hash(context) == hash(routing_context_for(Guest.get_guest("123")))
+    assert context.get("party_size") == 3
+    assert context.get("preferences", "unset") == "unset"
+
+
+def test_store_computes_once_per_profile_version(mocker):
+    load_guest = mocker.Mock(side_effect=Guest.get_guest)
+    store = RoutingContextStore(load_guest=load_guest)
+    first = store.get("123")
+    assert store.get("123") is first
+    assert store.get("123", profile_version=0) is first
+    assert load_guest.call_count == 1
+
+    changed = Guest.get_guest("123").model_copy(update={"membership_type": "VIP", "profile_version": 1})
+    store.update(changed)
+    assert store.get("123").membership_type == "VIP"
+    assert store.stats() == {"entries": 1, "computed": 2}
+
+
+def test_profile_change_refreshes_service_routing_context(mocker):
+    profile = Guest.get_guest("guest-316")
+    load_guest = mocker.Mock(return_value=profile)
+    service = ThrillZoneParkService()
+    service.routing_contexts = RoutingContextStore(load_guest=load_guest)
+    assert service._get_guest_context("guest-316").accessibility_needs is False
+    assert service._get_guest_context("guest-316").accessibility_needs is False
+    assert load_guest.call_count == 1
+
+    request_accessibility_services("guest-316", "wheelchair", "Adventure Land")
+    load_guest.return_value = profile.model_copy(update={
+        "accessibility_needs": AccessibilityNeeds(wheelchair_access=True),
+        "profile_version": guest_profile_versions.get("guest-316"),
+    })
+    assert service._get_guest_context("guest-316").accessibility_needs is True
+    assert service._get_guest_context("guest-316").accessibility_needs is True
+    assert load_guest.call_count == 2
+
+
+def test_bookings_keep_the_cached_routing_context(mocker):
+    load_guest = mocker.Mock(side_effect=Guest.get_guest)
+    service = ThrillZoneParkService()
+    service.routing_contexts = RoutingContextStore(load_guest=load_guest)
+    catalog = park_tools.park_catalog.current()
+    mocker.patch.object(park_tools, "fast_pass_inventory", FastPassInventory.from_catalog(catalog))
+    mocker.patch.object(park_tools, "dining_inventory", DiningInventory.from_catalog(catalog))
+    context = service._get_guest_context("guest-416")
+
+    assert park_tools.reserve_fast_pass("guest-416", "Splash Safari", "10:00")["status"] == "confirmed"
+    assert park_tools.make_dining_reservation("guest-416", "Pizza Planet", "18:00", 4)["status"] == "confirmed"
+    park_tools.upgrade_ticket("guest-416", "Day Pass", "Season Pass")
+    park_tools.schedule_character_meet_greet("guest-416", "Captain Thrill", "14:00")
+
+    assert guest_profile_versions.get("guest-416") == 0
+    assert service._get_guest_context("guest-416") is context
+    assert load_guest.call_count == 1
+
+
+def test_fingerprint_is_a_routing_cache_and_prompt_context():
+    context = RoutingContext(membership_type="VIP", party_size=2, special_occasion=True)
+    cache = RoutingCache()
+    cache.put("upgrade options", context, {"route": "ticket_manager", "reason": "test", "confidence": 0.9})
+    assert cache.get("upgrade options", context)["route"] == "ticket_manager"
+    assert cache.get("upgrade options", context._replace(membership_type="Day Pass")) is None
+    assert routing_message("upgrade options", context) == (
+        '{"context":{"membership_type":"VIP","party_size":2,"special_occasion":true},'
+        '"query":"upgrade options"}'
+    )
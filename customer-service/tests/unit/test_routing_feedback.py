@@ -0,0 +1,63 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from customer_service.routing.guest_query_router import GuestQueryRouter
+from customer_service.routing.routing_feedback import (
+    FeedbackRetuner,
+    KeywordOutcomeCounts,
+    RoutingFeedbackLog
+)
+
+
+def test_log_reads_incrementally_and_skips_partial_lines(tmp_path):
+    log = RoutingFeedbackLog(str(tmp_path / "feedback.jsonl"))
+    log.append("is the coaster closed", "emergency_responder", "attraction_expert", "router_model")
+    records, offset = log.read()
+    assert [record["final_route"] for record in records] == ["attraction_expert"]
+
+    with open(log.path, "a") as f:
+        f.write('{"query": "half written')
+    assert log.read(offset) == ([], offset)
+
+
+def test_weight_factors_follow_final_routes():
+    counts = KeywordOutcomeCounts()
+    counts.add([
+        {"query": "Is the ride closed?", "final_route": "attraction_expert"}
+        for _ in range(8)
+    ])
+    factors = counts.weight_factors(smoothing=2.0)
+    assert factors["attraction_expert"]["closed"] == 1.8
+    assert factors["emergency_responder"]["closed"] == 0.2
+    assert factors["attraction_expert"]["ride"] == 1.8
+
+
+def test_retuner_hot_swaps_keyword_stage(tmp_path):
+    router = GuestQueryRouter()
+    query = "Why is Splash Safari closed?"
+    assert router.keyword_matcher.classify(query) is None
+
+    log = RoutingFeedbackLog(str(tmp_path / "feedback.jsonl"))
+    retuner = FeedbackRetuner(router, log, min_records=5)
+    for _ in range(4):
+        log.append("Is the water park closed today", "emergency_responder", "attraction_expert")
+    assert retuner.retune_once() is False
+
+    old_matcher, old_classifier = router.keyword_matcher, router.classifier
+    log.append("Is the water park closed today", "emergency_responder", "attraction_expert")
+    assert retuner.retune_once() is True
+    assert router.keyword_matcher is not old_matcher
+    assert router.classifier is not old_classifier
+    assert router.keyword_matcher.classify(query)["route"] == "attraction_expert"
+    assert router.cascade.get_stage("keyword").predict(query, None)["route"] == "attraction_expert"
@@ -0,0 +1,163 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from customer_service.routing import guest_query_router, routing_feedback, routing_sidecar
+from customer_service.routing.guest_query_router import GuestQueryRouter
+from customer_service.routing.routing_sidecar import RoutingSidecarClient, RoutingSidecarServer
+
+
+@pytest.fixture
+def sidecar(tmp_path):
+    server = RoutingSidecarServer(str(tmp_path / "router.sock"), max_wait_ms=20.0)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait(5)
+    yield server
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+
+def test_client_gets_sidecar_decisions(sidecar):
+    client = RoutingSidecarClient(sidecar.socket_path, timeout_seconds=1.0)
+    decision = client.predict("What time is the parade?")
+    assert decision["route"] == "entertainment_coordinator"
+    assert decision["sidecar_stage"] == "keyword"
+    assert client.predict("hello there") is None
+    client.close()
+
+
+def test_concurrent_workers_are_micro_batched(sidecar):
+    queries = ["I want a refund for my ticket", "Where is the restroom?"] * 8
+
+    def ask(query):
+        client = RoutingSidecarClient(sidecar.socket_path, timeout_seconds=2.0)
+        try:
+            return client.predict(query)["route"]
+        finally:
+            client.close()
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        routes = list(pool.map(ask, queries))
+    assert routes == ["ticket_manager", "guest_services"] * 8
+    assert sidecar.stats()["queries"] == len(queries)
+    assert sidecar.stats()["batches"] < len(queries)
+
+
+@pytest.mark.asyncio
+async def test_async_client_pipelines_one_connection(sidecar):
+    client = RoutingSidecarClient(sidecar.socket_path, timeout_seconds=2.0)
+    queries = ["I want a refund for my ticket", "Where is the restroom?"] * 8
+    decisions = await asyncio.gather(*(client.predict_async(query) for query in queries))
+    assert [d["route"] for d in decisions] == ["ticket_manager", "guest_services"] * 8
+    assert await client.predict_async("hello there") is None
+    assert sidecar.stats()["batches"] <= 3
+    assert client.failures == 0
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_async_client_survives_missing_sidecar(tmp_path):
+    client = RoutingSidecarClient(str(tmp_path / "missing.sock"), timeout_seconds=0.5)
+    assert await client.predict_async("I want a refund for my ticket") is None
+    assert client.failures == 1
+
+
+def use_sidecar_socket(monkeypatch, socket_path):
+    settings = guest_query_router.configs.routing_settings
+    monkeypatch.setattr(settings, "sidecar_socket_path", socket_path)
+    monkeypatch.setattr(settings, "sidecar_timeout_seconds", 1.0)
+
+
+def test_router_client_mode(sidecar, monkeypatch, mocker):
+    use_sidecar_socket(monkeypatch, sidecar.socket_path)
+    router = GuestQueryRouter()
+    assert [stage.name for stage in router.cascade.stages][:2] == ["emergency_fast_lane", "sidecar"]
+    assert [stage.name for stage in router.local_fallback.stages] == ["keyword", "classifier"]
+
+    model = mocker.patch.object(router, "_call_router_model")
+    result = router.route_query("I want a refund for my ticket")
+    assert (result["route"], result["stage"]) == ("ticket_manager", "sidecar")
+    model.assert_not_called()
+
+
+def test_router_falls_back_to_local_stages_when_sidecar_is_down(tmp_path, monkeypatch, mocker):
+    use_sidecar_socket(monkeypatch, str(tmp_path / "missing.sock"))
+    router = GuestQueryRouter()
+    model = mocker.patch.object(
+        router, "_call_router_model",
+        return_value='{"route": "guest_services", "reason": "Unclear", "confidence": 0.9}'
+    )
+    result = router.route_query("I want a refund for my ticket")
+    assert (result["route"], result["stage"], result["fallback_stage"]) == ("ticket_manager", "sidecar", "keyword")
+    assert router.sidecar.failures == 1
+    model.assert_not_called()
+
+    result = router.route_query("hello there")
+    assert (result["route"], result["stage"]) == ("guest_services", "router_model")
+    assert router.sidecar.failures == 2
+
+
+@pytest.mark.asyncio
+async def test_router_async_path_falls_back_when_sidecar_is_down(tmp_path, monkeypatch):
+    use_sidecar_socket(monkeypatch, str(tmp_path / "missing.sock"))
+    router = GuestQueryRouter()
+    result = await router.route_query_async("I want a refund for my ticket")
+    assert (result["route"], result["stage"], result["fallback_stage"]) == ("ticket_manager", "sidecar", "keyword")
+
+
+def test_sidecar_retunes_the_stages_it_serves(tmp_path, monkeypatch, mocker):
+    settings = guest_query_router.configs.routing_settings
+    monkeypatch.setattr(settings, "feedback_log_path", str(tmp_path / "feedback.jsonl"))
+    mocker.patch("customer_service.config.Config", return_value=guest_query_router.configs)
+    serve = mocker.patch.object(RoutingSidecarServer, "serve_forever", mocker.AsyncMock())
+    retuner = mocker.patch.object(routing_feedback, "FeedbackRetuner")
+
+    routing_sidecar.main(["--socket", str(tmp_path / "router.sock")])
+
+    serve.assert_awaited_once()
+    router = retuner.call_args.args[0]
+    assert router.sidecar is None
+    retuner.return_value.start.assert_called_once()
+    retuner.return_value.stop.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_router_async_path_does_not_block_on_sidecar(sidecar, monkeypatch):
+    use_sidecar_socket(monkeypatch, sidecar.socket_path)
+    router = GuestQueryRouter()
+    queries = [f"I want a refund for my ticket number {i}" for i in range(8)]
+    started = time.perf_counter()
+    results = await asyncio.gather(*(router.route_query_async(query) for query in queries))
+    elapsed = time.perf_counter() - started
+    assert all((r["route"], r["stage"]) == ("ticket_manager", "sidecar") for r in results)
+    # Serialized blocking round trips would each wait out the 20ms batch window
+    assert elapsed < 8 * sidecar.max_wait
+    assert sidecar.stats()["batches"] < len(queries)
@@ -0,0 +1,82 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from customer_service.agents import emergency_responder_agent, entertainment_coordinator_agent
+from customer_service.config import Config
+from customer_service.dispatch import specialist_dispatcher
+from customer_service.dispatch.specialist_dispatcher import SpecialistDispatcher
+
+
+def test_route_tiers_resolve_model_and_budget():
+    settings = Config().agent_settings
+    assert settings.tier_name_for("entertainment_coordinator") == "fast"
+    assert settings.tier_name_for("dining_specialist") == settings.default_tier
+    assert settings.tier_for("dining_specialist").model == settings.specialist_model
+    assert settings.tier_for("emergency_responder").priority
+    # Default routes keep the model's full output length for long answers
+    assert settings.tier_for("dining_specialist").max_output_tokens is None
+    assert settings.tier_for("dining_specialist").generate_content_config() is None
+
+    fast = settings.tier_for("entertainment_coordinator")
+    assert entertainment_coordinator_agent.model == fast.model
+    assert entertainment_coordinator_agent.generate_content_config.max_output_tokens == fast.max_output_tokens
+    assert emergency_responder_agent.generate_content_config.max_output_tokens == (
+        settings.tier_for("emergency_responder").max_output_tokens
+    )
+
+
+class FakeRunner:
+    def __init__(self, delay, tokens=30):
+        self.delay = delay
+        self.tokens = tokens
+
+    async def run_async(self, user_id, session_id, new_message, run_config=None):
+        await asyncio.sleep(self.delay)
+        yield SimpleNamespace(
+            author="dining_specialist",
+            partial=False,
+            usage_metadata=SimpleNamespace(total_token_count=self.tokens),
+            content=types.Content(role="model", parts=[types.Part(text="done")]),
+            is_final_response=lambda: True,
+        )
+
+
+@pytest.mark.asyncio
+async def test_priority_tier_skips_specialist_slots(mocker, monkeypatch):
+    monkeypatch.setattr(specialist_dispatcher.configs.agent_settings, "max_concurrent_specialist_runs", 1)
+    dispatcher = SpecialistDispatcher()
+    mocker.patch.object(dispatcher, "_get_runner", return_value=FakeRunner(delay=0.2))
+
+    blocking = [
+        asyncio.ensure_future(dispatcher.run_async("dining_specialist", "menu", "123"))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0.01)
+    emergency = await dispatcher.run_async("emergency_responder", "help", "123")
+    assert emergency.latency_ms < 300
+    assert emergency.tier == "priority"
+
+    responses = await asyncio.gather(*blocking)
+    assert max(response.latency_ms for response in responses) >= 390
+
+    stats = dispatcher.tier_stats()
+    assert stats["standard"]["runs"] == 2
+    assert stats["priority"]["total_tokens"] == 30
+    assert stats["priority"]["avg_ms"] == pytest.approx(emergency.latency_ms)
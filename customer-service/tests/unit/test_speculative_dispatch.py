@@ -0,0 +1,176 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+
+import pytest
+from google.adk import Agent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from customer_service.config import Config
+from customer_service.dispatch.specialist_dispatcher import SpecialistDispatcher, SpecialistResponse
+from customer_service.main_agent import ThrillZoneParkService
+
+APP_NAME = Config().app_name
+
+
+@pytest.fixture
+def service():
+    return ThrillZoneParkService()
+
+
+class BookingLlm(BaseLlm):
+    """Specialist model that books a table when asked to, and otherwise just answers."""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        last = llm_request.contents[-1].parts[0]
+        if last.function_response:
+            part = types.Part(text="Your table is booked.")
+        elif "book" in (last.text or ""):
+            part = types.Part(function_call=types.FunctionCall(
+                name="make_dining_reservation", args={"restaurant": "Pirate's Feast"}
+            ))
+        else:
+            part = types.Part(text="We serve pizza until 9pm.")
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+@pytest.fixture
+def booking_dispatcher():
+    bookings = []
+
+    def make_dining_reservation(restaurant: str) -> dict:
+        """Book a table."""
+        bookings.append(restaurant)
+        return {"status": "confirmed"}
+
+    agent = Agent(
+        model=BookingLlm(model="fake-specialist"),
+        name="dining_specialist",
+        instruction="Help with dining.",
+        tools=[make_dining_reservation]
+    )
+    return SpecialistDispatcher({"dining_specialist": agent}), bookings
+
+
+async def guest_sessions(dispatcher, guest_id):
+    listing = await dispatcher.session_service.list_sessions(app_name=APP_NAME, user_id=guest_id)
+    sessions = {}
+    for session in listing.sessions:
+        sessions[session.id] = await dispatcher.session_service.get_session(
+            app_name=APP_NAME, user_id=guest_id, session_id=session.id
+        )
+    return sessions
+
+
+def fake_specialist(calls, tokens=40, delay=0.05, delays=None):
+    async def run(route, guest_query, guest_id, usage=None, session_id=None):
+        calls.append(route)
+        if usage is not None:
+            usage["total_tokens"] = tokens
+        route_delay = (delays or {}).get(route, delay)
+        await asyncio.sleep(route_delay)
+        return SpecialistResponse(route, f"answer from {route}", route_delay * 1000, tokens)
+    return run
+
+
+@pytest.mark.asyncio
+async def test_speculation_committed_when_router_agrees(service, mocker):
+    calls = []
+    mocker.patch.object(service.dispatcher, "run_async", side_effect=fake_specialist(calls))
+    mocker.patch.object(service.router, "predict_route_early", return_value="ticket_manager")
+    mocker.patch.object(
+        service.router, "route_query_async",
+        return_value={"route": "ticket_manager", "reason": "Refund", "confidence": 0.9}
+    )
+
+    reply = await service.handle_guest_query_async("I want a refund for my ticket")
+
+    assert reply == "answer from ticket_manager"
+    assert calls == ["ticket_manager"]
+    stats = service.dispatcher.speculation_stats()
+    assert stats["committed"] == 1
+    assert stats["hit_rate"] == 1.0
+    assert stats["wasted_tokens"] == 0
+
+
+@pytest.mark.asyncio
+async def test_speculation_cancelled_when_router_disagrees(service, mocker):
+    calls = []
+    mocker.patch.object(service.router, "predict_route_early", return_value="ticket_manager")
+
+    async def route_later(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return {"route": "guest_services", "reason": "Lost item", "confidence": 0.9}
+
+    mocker.patch.object(service.router, "route_query_async", side_effect=route_later)
+    mocker.patch.object(
+        service.dispatcher, "run_async",
+        side_effect=fake_specialist(calls, delay=0.0, delays={"ticket_manager": 1.0})
+    )
+
+    reply = await service.handle_guest_query_async("I lost my ticket")
+
+    assert reply == "answer from guest_services"
+    assert calls == ["ticket_manager", "guest_services"]
+    stats = service.dispatcher.speculation_stats()
+    assert stats["cancelled"] == 1
+    assert stats["hit_rate"] == 0.0
+    assert stats["wasted_tokens"] == 40
+
+
+def test_predict_route_early_requires_strong_keywords(service):
+    assert service.router.predict_route_early("I want a refund for my ticket") == "ticket_manager"
+    assert service.router.predict_route_early("hello there") is None
+
+
+@pytest.mark.asyncio
+async def test_cancelled_speculation_leaves_real_session_untouched(booking_dispatcher):
+    dispatcher, bookings = booking_dispatcher
+    run = dispatcher.speculate("dining_specialist", "What pizza do you have?", "g1")
+    await asyncio.sleep(0.05)
+    await dispatcher.cancel_speculation(run)
+    sessions = await guest_sessions(dispatcher, "g1")
+    assert list(sessions) == ["g1:dining_specialist"]
+    assert sessions["g1:dining_specialist"].events == []
+
+
+@pytest.mark.asyncio
+async def test_committed_speculation_moves_turn_to_real_session(booking_dispatcher):
+    dispatcher, bookings = booking_dispatcher
+    run = dispatcher.speculate("dining_specialist", "What pizza do you have?", "g1")
+    response = await dispatcher.resolve_speculation(run, "dining_specialist")
+    assert response.text == "We serve pizza until 9pm."
+    sessions = await guest_sessions(dispatcher, "g1")
+    assert list(sessions) == ["g1:dining_specialist"]
+    texts = [event.content.parts[0].text for event in sessions["g1:dining_specialist"].events]
+    assert texts == ["What pizza do you have?", "We serve pizza until 9pm."]
+
+
+@pytest.mark.asyncio
+async def test_speculation_stops_before_side_effecting_tool(booking_dispatcher):
+    dispatcher, bookings = booking_dispatcher
+    run = dispatcher.speculate("dining_specialist", "Please book a table", "g1")
+    assert await dispatcher.resolve_speculation(run, "dining_specialist") is None
+    assert bookings == []
+    assert dispatcher.speculation_stats()["deferred"] == 1
+
+    response = await dispatcher.run_async("dining_specialist", "Please book a table", "g1")
+    assert response.text == "Your table is booked."
+    assert bookings == ["Pirate's Feast"]
+    sessions = await guest_sessions(dispatcher, "g1")
+    assert list(sessions) == ["g1:dining_specialist"]
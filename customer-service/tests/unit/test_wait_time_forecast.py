@@ -0,0 +1,142 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+import numpy as np
+import pytest
+
+from customer_service.catalog.park_catalog import ParkCatalog, DEFAULT_CATALOG_PATH
+from customer_service.catalog.wait_time_forecast import WaitTimeForecaster, WaitTimeForecasts
+from customer_service.catalog.wait_time_store import LiveWaitTimes, WaitTimeStore
+from customer_service.tools import park_tools
+
+MIDNIGHT = 1_700_006_400  # 2023-11-15 00:00 UTC
+HOUR = 3600
+
+
+@pytest.fixture
+def store():
+    return WaitTimeStore(["Splash Safari", "Carousel Dreams"], window=8)
+
+
+@pytest.fixture
+def forecaster(store):
+    forecaster = WaitTimeForecaster(store, slot_minutes=60, persistence=0.5, utc_offset_seconds=0)
+    # A week of history: Splash Safari peaks at 14:00, Carousel Dreams is flat
+    days = np.arange(7)[:, None] * 24 * HOUR
+    hours = np.arange(24)[None, :]
+    timestamps = (MIDNIGHT - 7 * 24 * HOUR + days + hours * HOUR).ravel()
+    splash = np.tile(np.where(np.arange(24) == 14, 60.0, 20.0), 7)
+    forecaster.fit(["Splash Safari"] * len(timestamps), timestamps, splash)
+    used = forecaster.fit(
+        ["Carousel Dreams"] * len(timestamps) + ["Unknown Ride"],
+        np.append(timestamps, MIDNIGHT),
+        np.full(len(timestamps) + 1, 5.0)
+    )
+    assert used == len(timestamps)
+    return forecaster
+
+
+def test_forecast_follows_time_of_day_profile(store, forecaster):
+    store.update("Splash Safari", 20, timestamp=MIDNIGHT + 12 * HOUR)
+    store.update("Carousel Dreams", 5, timestamp=MIDNIGHT + 12 * HOUR)
+    current, predicted, now_slot = forecaster.forecast(4, now=MIDNIGHT + 12 * HOUR + 60)
+
+    assert now_slot == 12
+    assert predicted.shape == (2, 4)
+    assert predicted[0].tolist() == pytest.approx([20.0, 60.0, 20.0, 20.0], abs=0.5)
+    assert predicted[1].tolist() == pytest.approx([5.0] * 4, abs=0.5)
+
+
+def test_current_deviation_fades(store, forecaster):
+    store.update("Carousel Dreams", 45, timestamp=MIDNIGHT + 12 * HOUR)
+    _, predicted, _ = forecaster.forecast(3, now=MIDNIGHT + 12 * HOUR + 60)
+    # The live sample also moved the 12:00 profile, so the deviation is a little under 40
+    deviation = predicted[1] - 5.0
+    assert deviation[0] > deviation[1] > deviation[2] > 0
+    assert deviation[1] / deviation[0] == pytest.approx(0.5, rel=0.05)
+
+
+def test_forecasts_are_cached_and_updated_incrementally(store, forecaster):
+    now = MIDNIGHT + 12 * HOUR + 60
+    forecaster.forecast(4, now=now)
+    forecaster.forecast(4, now=now + 60)
+    assert forecaster.stats()["full_fits"] == 1
+    assert forecaster.stats()["row_updates"] == 0
+
+    store.update("Splash Safari", 50, timestamp=now + 120)
+    _, predicted, _ = forecaster.forecast(4, now=now + 180)
+    assert forecaster.stats() == {"full_fits": 1, "row_updates": 1, "profiled_slots": 48}
+    assert predicted[0, 0] > 20
+
+    forecaster.forecast(4, now=now + HOUR)
+    assert forecaster.stats()["full_fits"] == 2
+
+
+def test_save_and_load_profiles(store, forecaster, tmp_path):
+    path = str(tmp_path / "profiles.npz")
+    forecaster.save(path)
+    other_store = WaitTimeStore(["Carousel Dreams", "Splash Safari", "New Ride"], window=8)
+    reloaded = WaitTimeForecaster(other_store, slot_minutes=60, utc_offset_seconds=0)
+    assert reloaded.load(path) == 2
+    other_store.update("Splash Safari", 20, timestamp=MIDNIGHT + 12 * HOUR)
+    _, predicted, _ = reloaded.forecast(2, now=MIDNIGHT + 12 * HOUR + 60)
+    assert predicted[reloaded.row_of("Splash Safari"), 1] == pytest.approx(60.0, abs=1.0)
+
+
+def test_forecast_tool_reports_best_time(mocker):
+    catalog = ParkCatalog(DEFAULT_CATALOG_PATH)
+    live = LiveWaitTimes(catalog, window=8)
+    forecasts = WaitTimeForecasts(live, slot_minutes=15)
+    mocker.patch.object(park_tools, "park_catalog", catalog)
+    mocker.patch.object(park_tools, "live_wait_times", live)
+    mocker.patch.object(park_tools, "wait_time_forecasts", forecasts)
+
+    forecaster = forecasts.current()
+    now = time.time()
+    later = [now + minutes * 60 for minutes in (-1440 + 30, -1440 + 45, -1440 + 60)]
+    forecaster.fit(["Extreme Drop Tower"] * 3, later, [20, 10, 30])
+    live.current().update("Extreme Drop Tower", 60)
+
+    result = park_tools.forecast_wait_times(["extreme drop tower", "Nope"], horizon=1)
+    forecast = result["forecasts"]["Extreme Drop Tower"]
+    assert forecast["current_wait_minutes"] == 60
+    assert len(forecast["forecast"]) == 4
+    assert forecast["best_wait_minutes"] < 60
+    assert forecast["best_time"] != "now"
+    assert result["not_found"] == ["Nope"]
+
+    everything = park_tools.forecast_wait_times(horizon=2)
+    assert len(everything["forecasts"]) == 6
+
+    clamped = park_tools.forecast_wait_times(["Extreme Drop Tower"], horizon=48)
+    assert clamped["horizon_hours"] == 12
+    assert len(clamped["forecasts"]["Extreme Drop Tower"]["forecast"]) == 48
+
+
+def test_samples_before_the_first_forecast_reach_the_profiles():
+    catalog = ParkCatalog(DEFAULT_CATALOG_PATH)
+    live = LiveWaitTimes(catalog, window=8)
+    forecasts = WaitTimeForecasts(live, slot_minutes=15)
+    live.current().update("Extreme Drop Tower", 45, timestamp=1_700_000_000)
+
+    forecaster = forecasts.current()
+    assert forecaster.stats()["profiled_slots"] == 1
+
+    reloaded = LiveWaitTimes(catalog, window=8)
+    reloaded.current()
+    late = WaitTimeForecasts(reloaded, slot_minutes=15)
+    reloaded.current().update("Extreme Drop Tower", 45, timestamp=1_700_000_000)
+    assert late.current().stats()["profiled_slots"] == 1
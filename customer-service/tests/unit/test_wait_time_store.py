@@ -0,0 +1,145 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import pytest
+
+from customer_service.catalog.park_catalog import ParkCatalog, DEFAULT_CATALOG_PATH
+from customer_service.catalog.wait_time_store import LiveWaitTimes, WaitTimeSimulator, WaitTimeStore
+from customer_service.tools import park_tools
+
+
+@pytest.fixture
+def store():
+    return WaitTimeStore(
+        ["Splash Safari", "Carousel Dreams"],
+        {"adventure land": ("Splash Safari",)},
+        {"Splash Safari": True},
+        window=4
+    )
+
+
+def test_current_value_and_windowed_stats(store):
+    for minute, wait in enumerate([10, 20, 30, 40, 50, 60]):
+        store.update("Splash Safari", wait, timestamp=1_700_000_000 + minute * 60)
+
+    info = store.current("Splash Safari")
+    assert info["wait_minutes"] == 60
+    assert info["average_wait_minutes"] == 45.0  # last four samples
+    assert info["trend_minutes_per_hour"] == pytest.approx(600.0)
+    assert info["fast_pass_available"] is True
+    assert [wait for _, wait in store.history("Splash Safari")] == [30, 40, 50, 60]
+
+
+def test_incremental_sums_match_recomputation(store):
+    waits = [12, 7, 33, 18, 25, 9, 41, 3, 27, 15, 22]
+    for i, wait in enumerate(waits):
+        store.update("Carousel Dreams", wait, timestamp=1_700_000_000 + i * 45 + (i % 3) * 7)
+        samples = store.history("Carousel Dreams")
+        times = [t for t, _ in samples]
+        values = [v for _, v in samples]
+        count = len(samples)
+        mean_t = sum(times) / count
+        mean_v = sum(values) / count
+        variance = sum((t - mean_t) ** 2 for t in times)
+        expected = (
+            sum((t - mean_t) * (v - mean_v) for t, v in samples) / variance * 3600 if count > 1 else 0.0
+        )
+        info = store.current("Carousel Dreams")
+        assert info["average_wait_minutes"] == round(mean_v, 1)
+        assert info["trend_minutes_per_hour"] == pytest.approx(round(expected, 1), abs=0.11)
+
+
+def test_snapshots_are_shared_until_next_update(store):
+    store.update("Splash Safari", 15, "open")
+    first = store.snapshot()
+    assert store.snapshot() is first
+    assert list(store.snapshot("Adventure Land")["wait_times"]) == ["Splash Safari"]
+    assert store.snapshot("Nowhere") is None
+
+    store.update("Carousel Dreams", 5, "temporary_closure")
+    second = store.snapshot()
+    assert second is not first
+    assert second["wait_times"]["Carousel Dreams"]["status"] == "temporary_closure"
+
+
+def test_unknown_attraction_rejected(store):
+    with pytest.raises(ValueError):
+        store.update("Nope", 10)
+    assert store.current("Nope") is None
+
+
+def test_concurrent_updates_and_reads(store):
+    errors = []
+
+    def writer():
+        for i in range(2000):
+            store.update("Splash Safari", i % 90, timestamp=1_700_000_000 + i)
+
+    def reader():
+        try:
+            for _ in range(2000):
+                assert 0 <= store.current("Splash Safari")["wait_minutes"] < 90
+                store.snapshot("adventure land")
+        except AssertionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert store.stats()["updates"] == 2000
+
+
+def test_tool_answers_from_live_store(mocker):
+    catalog = ParkCatalog(DEFAULT_CATALOG_PATH)
+    live = LiveWaitTimes(catalog, window=8)
+    mocker.patch.object(park_tools, "park_catalog", catalog)
+    mocker.patch.object(park_tools, "live_wait_times", live)
+
+    assert park_tools.get_ride_wait_times("Extreme Drop Tower")["wait_minutes"] == 60
+    live.current().update("Extreme Drop Tower", 75)
+    result = park_tools.get_ride_wait_times("Extreme Drop Tower")
+    assert result["wait_minutes"] == 75
+    # The catalog wait is only reported until the first sample
+    assert result["average_wait_minutes"] == 75.0
+    assert result["trend_minutes_per_hour"] == 0.0
+
+    section = park_tools.get_ride_wait_times(park_section="Fantasy Forest")
+    assert set(section["wait_times"]) == {"Carousel Dreams", "Family Fun Coaster", "Haunted Mansion"}
+
+
+def test_simulator_moves_open_attractions_only():
+    live = LiveWaitTimes(ParkCatalog(DEFAULT_CATALOG_PATH), window=8)
+    simulator = WaitTimeSimulator(live, seed=7)
+    for _ in range(3):
+        simulator.tick()
+    store = live.current()
+    assert len(store.history("Splash Safari")) == 3
+    assert store.history("Haunted Mansion") == []
+    assert store.current("Haunted Mansion")["wait_minutes"] == 30
+    assert all(0 <= wait <= 180 for _, wait in store.history("Splash Safari"))
+
+
+def test_simulator_small_steps_accumulate():
+    live = LiveWaitTimes(ParkCatalog(DEFAULT_CATALOG_PATH), window=8)
+    simulator = WaitTimeSimulator(live, step_minutes=0.4, seed=3)
+    for _ in range(6):
+        simulator.tick()
+    waits = [wait for _, wait in live.current().history("Splash Safari")]
+    assert any(wait != round(wait) for wait in waits)
+    assert all(abs(later - earlier) <= 0.4 for earlier, later in zip(waits, waits[1:]))